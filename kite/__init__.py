@@ -1,3 +1,13 @@
+__version__ = "0.1.0"
+
 __all__ = [
     "convert",
 ]
+
+
+def __getattr__(name):
+    # kite.convert without importing the converter for generated apps that only use kite.runtime
+    if name == "convert":
+        from .api import convert
+        return convert
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,27 @@
+import os
+from typing import Dict, Mapping, Optional, Union
+
+from .converter import Converter
+from .utils.fs import MemoryFS
+
+# Where sources and output sit inside the in-memory file system
+_SRC = os.path.join(os.sep, "kite", "src")
+_OUT = os.path.join(os.sep, "kite", "out")
+
+
+def _source_path(rel: str) -> str:
+    parts = rel.replace("\\", "/").split("/")
+    path = os.path.normpath(os.path.join(_SRC, *[p for p in parts if p]))
+    if not path.startswith(os.path.join(_SRC, "")):
+        raise ValueError(f"source path outside the project: {rel!r}")
+    return path
+
+
+def convert(sources: Mapping[str, Union[str, bytes]], main_window: Optional[str] = None, emit: str = "code", lazy_tabs: bool = False, shared_runtime: bool = False, epat: str = "json") -> Dict[str, bytes]:
+    # `kite convert` on a project held in memory: {project-relative path ("/" or "\\" separated): text or bytes} in,
+    # {output-relative path: bytes} out. Each call has its own file system and converter, so threads may call it
+    # at once. RuntimeError when no form is found.
+    fs = MemoryFS({_source_path(rel): data for rel, data in sources.items()})
+    fs.makedirs(_SRC)
+    Converter(jobs=1, emit=emit, lazy_tabs=lazy_tabs, shared_runtime=shared_runtime, epat=epat, fs=fs).convert(_SRC, _OUT, main_window)
+    return fs.export(_OUT)
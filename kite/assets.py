@@ -0,0 +1,113 @@
+import hashlib
+import itertools
+import os
+from typing import AbstractSet, Optional
+
+from .utils.fs import DISK, WRITE_BUFFER, FileSystem
+
+# Directory under the app package that generated windows load images from (widgets.image())
+ASSETS_DIR = "assets"
+
+# Leading bytes -> extension; Tk reads PNG and GIF itself, the rest need Pillow at runtime
+_MAGIC = (
+    (b"\x89PNG", ".png"),
+    (b"GIF8", ".gif"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"BM", ".bmp"),
+    (b"\x00\x00\x01\x00", ".ico"),
+)
+
+_tmp_ids = itertools.count()
+
+
+def _ext(head: bytes) -> str:
+    for magic, ext in _MAGIC:
+        if head.startswith(magic):
+            return ext
+    return ".bin"
+
+
+class AssetWriter:
+    # One asset being written: bytes are hashed as they go to a temporary file, named by content on commit
+    def __init__(self, store: "AssetStore") -> None:
+        self.store = store
+        self.tmp = os.path.join(store.root, f".{os.getpid()}-{next(_tmp_ids)}.tmp")
+        self.hash = hashlib.sha256()
+        self.head = b""
+        self.size = 0
+        self.out = store.fs.open_write(self.tmp)
+
+    def write(self, data: bytes) -> None:
+        if len(self.head) < 8:
+            self.head += data[:8]
+        self.hash.update(data)
+        self.size += len(data)
+        self.out.write(data)
+
+    def commit(self) -> Optional[str]:
+        # Asset file name, or None for an empty entry
+        self.out.close()
+        fs = self.store.fs
+        if not self.size:
+            fs.remove(self.tmp)
+            return None
+        name = self.hash.hexdigest()[:AssetStore.HASH_CHARS] + _ext(self.head)
+        path = os.path.join(self.store.root, name)
+        if fs.exists(path):
+            # Same content from another form (or an earlier run) is already there
+            fs.remove(self.tmp)
+        else:
+            fs.replace(self.tmp, path)
+        return name
+
+    def abort(self) -> None:
+        self.out.close()
+        try:
+            self.store.fs.remove(self.tmp)
+        except OSError:
+            pass
+
+
+class AssetStore:
+    # Content-addressed files under app/assets: every distinct image is written once, whichever forms use it.
+    # Names are a content hash, so worker processes can share a store without coordinating.
+    HASH_CHARS = 16
+
+    def __init__(self, root: str, fs: Optional[FileSystem] = None) -> None:
+        self.root = root
+        self.fs = fs or DISK
+
+    @classmethod
+    def for_app(cls, app_pkg_dir: str, fs: Optional[FileSystem] = None) -> "AssetStore":
+        return cls(os.path.join(app_pkg_dir, ASSETS_DIR), fs)
+
+    def writer(self) -> AssetWriter:
+        self.fs.ensure_dir(self.root)
+        return AssetWriter(self)
+
+    def add_file(self, path: str) -> Optional[str]:
+        w = self.writer()
+        try:
+            with self.fs.open_read(path) as f:
+                for block in iter(lambda: f.read(WRITE_BUFFER), b""):
+                    w.write(block)
+        except BaseException:
+            w.abort()
+            raise
+        return w.commit()
+
+    def prune(self, keep: AbstractSet[str]) -> int:
+        # Remove assets no window refers to any more; returns how many went
+        try:
+            names = self.fs.listdir(self.root)
+        except OSError:
+            return 0
+        removed = 0
+        for name in names:
+            if name not in keep and not name.startswith("."):
+                try:
+                    self.fs.remove(os.path.join(self.root, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
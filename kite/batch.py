@@ -0,0 +1,125 @@
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .converter import Converter, Project
+from .utils.fs import DISK, FileIndex, FileSystem
+from .utils.log import log
+
+_sln_project_pat = re.compile(r'^Project\("\{[^}]*\}"\)\s*=\s*"(?P<name>[^"]*)"\s*,\s*"(?P<path>[^"]*)"', re.MULTILINE)
+_unsafe_dir_pat = re.compile(r'[<>:"/\\|?*\s]+')
+
+
+def read_solution(path: str, fs: FileSystem = DISK) -> List[Tuple[str, str]]:
+    base = os.path.dirname(os.path.abspath(path))
+    projects = []
+    for m in _sln_project_pat.finditer(fs.read_text(path)):
+        rel = m.group("path").replace("\\", os.sep)
+        # Solution folders and non-C# projects have no WinForms/WPF sources we understand
+        if not rel.lower().endswith(".csproj"):
+            continue
+        projects.append((m.group("name"), os.path.normpath(os.path.join(base, rel))))
+    return projects
+
+
+def read_project_list(path: str, fs: FileSystem = DISK) -> List[Tuple[str, str]]:
+    base = os.path.dirname(os.path.abspath(path))
+    projects = []
+    for line in fs.read_text(path).splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        entry = os.path.normpath(os.path.join(base, line))
+        if entry.lower().endswith(".sln"):
+            projects.extend(read_solution(entry, fs))
+        else:
+            projects.append((os.path.splitext(os.path.basename(entry))[0], entry))
+    return projects
+
+
+def load_projects(input_path: str, fs: FileSystem = DISK, index: Optional[FileIndex] = None) -> List[Tuple[str, str]]:
+    # (name, project root) for a .sln, a list file of roots, or a directory holding several .csproj;
+    # a directory is searched through index when the caller already crawled it
+    input_path = os.path.abspath(input_path)
+    if fs.isdir(input_path):
+        if index is None:
+            index = fs.scan_tree(input_path)
+        entries = [(os.path.splitext(os.path.basename(p))[0], p) for p in index.find(["*.csproj"])]
+    elif input_path.lower().endswith(".sln"):
+        entries = read_solution(input_path, fs)
+    else:
+        entries = read_project_list(input_path, fs)
+    projects: List[Tuple[str, str]] = []
+    seen = set()
+    for name, entry in entries:
+        root = os.path.dirname(entry) if os.path.splitext(entry)[1].lower() == ".csproj" else entry
+        if root in seen:
+            log.warn("Project shares its directory with another one, skipped", name=name, root=root)
+            continue
+        seen.add(root)
+        projects.append((name, root))
+    return projects
+
+
+def _drive(path: str) -> str:
+    return os.path.splitdrive(path)[0].lower()
+
+
+def _group_by_drive(roots: List[str]) -> Dict[str, List[str]]:
+    groups: Dict[str, List[str]] = {}
+    for root in roots:
+        groups.setdefault(_drive(root), []).append(root)
+    return groups
+
+
+def convert_batch(converter: Converter, input_path: str, output_dir: str, overwrite: bool = False) -> List[Project]:
+    started = time.perf_counter()
+    input_path = os.path.abspath(input_path)
+    # A directory input is crawled once: the same index finds the .csproj files and holds every project
+    indexes: Dict[str, FileIndex] = {}
+    if converter.fs.isdir(input_path):
+        with converter.profiler.phase("discover", input=input_path):
+            indexes[_drive(input_path)] = converter.fs.scan_tree(input_path, prune=converter.prune_dirs)
+    entries = load_projects(input_path, converter.fs, indexes.get(_drive(input_path)))
+    if not entries:
+        raise RuntimeError("No projects found to convert.")
+    output_dir = os.path.abspath(output_dir)
+
+    # Otherwise one crawl of the common root per drive (roots on different drives have no common path),
+    # carved into per-project views; nested projects keep their own files
+    roots = [root for _, root in entries]
+    if not indexes:
+        for drive, group in _group_by_drive(roots).items():
+            top = os.path.commonpath(group)
+            with converter.profiler.phase("discover", input=top):
+                indexes[drive] = converter.fs.scan_tree(top, prune=converter.prune_dirs)
+    log.info("Indexed input", projects=len(entries), files=sum(len(index) for index in indexes.values()))
+
+    projects: List[Project] = []
+    used: Dict[str, int] = {}
+    for name, root in entries:
+        nested = [r for r in roots if r != root and r.startswith(os.path.join(root, ""))]
+        sub = _unsafe_dir_pat.sub("_", name).strip("._") or "project"
+        used[sub] = used.get(sub, 0) + 1
+        if used[sub] > 1:
+            sub = f"{sub}_{used[sub]}"
+        projects.append(converter.prepare(root, os.path.join(output_dir, sub), indexes[_drive(root)].subset(root, exclude=nested), overwrite))
+
+    converter.convert_projects(projects, strict=False)
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    results = [r for p in projects for r in p.results if r.fname]
+    fresh = [r for r in results if not r.reused]
+    controls = sum(r.controls for r in fresh)
+    log.info(
+        "Batch summary",
+        projects=len(projects),
+        forms=len(results),
+        regenerated=len(fresh),
+        controls=controls,
+        seconds=round(elapsed, 2),
+        forms_per_sec=round(len(fresh) / elapsed, 1),
+        controls_per_sec=round(controls / elapsed, 1),
+    )
+    return projects
@@ -0,0 +1 @@
+__all__ = ["code_scan", "corpus", "datagrid", "designer_scan", "lazy_tabs", "pipeline", "tree_memory", "values", "window_emit"]
@@ -0,0 +1,163 @@
+import argparse
+import os
+import re
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from ..model import UiNode
+from ..parsers import winforms
+from ..parsers.winforms import WinFormsParser
+from ..utils.fs import read_text
+from ..utils.naming import safe_name
+from .corpus import synth_code_form, synth_service, synth_unterminated
+from .designer_scan import tree_signature
+
+# The regex parse_code used before the brace-offset scanner; `\{.*?\}` under re.S rescans to the end of the
+# file for every initializer that never reaches `};`
+_inst_obj_pat = re.compile(r"(?P<name>\w+)\s*=\s*new\s+(?P<type>[\w\.]+)\s*(?:\((?P<args>[^)]*)\))?\s*(\{(?P<init>.*?)\})?\s*;", re.S)
+
+
+def _legacy_split_object_init(s: str):
+    parts = []
+    buf = ''
+    depth = 0
+    for ch in s:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth = max(0, depth-1)
+        if ch == ',' and depth == 0:
+            parts.append(buf.strip())
+            buf = ''
+        else:
+            buf += ch
+    if buf.strip():
+        parts.append(buf.strip())
+    kv = []
+    for p in parts:
+        if '=' in p:
+            k, v = p.split('=', 1)
+            kv.append((k.strip(), v.strip()))
+    return kv
+
+
+def legacy_parse_code(parser: WinFormsParser, text: str) -> Optional[UiNode]:
+    m = winforms._class_form_pat.search(text)
+    if not m:
+        return None
+    form_name = m.group("name")
+    root = UiNode(type="Form", name=safe_name(form_name), properties={}, children=[])
+    controls: Dict[str, Dict[str, Any]] = {}
+    for m in _inst_obj_pat.finditer(text):
+        name = m.group("name")
+        typ = m.group("type").split(".")[-1]
+        if name == "components" or typ not in winforms._ACCEPT_TYPES:
+            continue
+        controls.setdefault(name, {"type": typ, "props": {}, "children": []})
+        init = m.group("init")
+        if init:
+            for p, v in _legacy_split_object_init(init):
+                controls[name]["props"][p] = parser._parse_value(p, v)
+    for m in winforms._inst_pat.finditer(text):
+        name = m.group("name")
+        typ = m.group("type").split(".")[-1]
+        if name == "components" or typ not in winforms._ACCEPT_TYPES:
+            continue
+        controls.setdefault(name, {"type": typ, "props": {}, "children": []})
+    for m in winforms._prop_pat.finditer(text):
+        name, prop, val = m.group("name"), m.group("prop"), m.group("value").strip()
+        if name in ("this", "base"):
+            if prop in ("Text", "ClientSize", "Size", "Width", "Height", "BackColor", "ForeColor"):
+                root.set_property(prop, parser._parse_value(prop, val))
+            continue
+        if name in controls:
+            controls[name]["props"][prop] = parser._parse_value(prop, val)
+    for m in winforms._add_form_pat.finditer(text):
+        if m.group("child") in controls:
+            controls[m.group("child")]["parent"] = form_name
+    for m in winforms._addrange_form_pat.finditer(text):
+        for token in m.group("list").split(','):
+            nm = token.strip().replace('this.', '').strip()
+            if nm and nm in controls:
+                controls[nm]["parent"] = form_name
+    for m in winforms._add_parent_pat.finditer(text):
+        if m.group("child") in controls:
+            controls[m.group("child")]["parent"] = m.group("parent")
+    for m in winforms._addrange_parent_pat.finditer(text):
+        for token in m.group("list").split(','):
+            nm = token.strip().replace('this.', '').strip()
+            if nm and nm in controls:
+                controls[nm]["parent"] = m.group("parent")
+    name_to_node = {name: UiNode(type=d["type"], name=safe_name(name), properties=d["props"], children=[]) for name, d in controls.items()}
+    for name, data in controls.items():
+        parent = data.get("parent")
+        node = name_to_node[name]
+        if parent and parent in name_to_node:
+            name_to_node[parent].add_child(node)
+        else:
+            root.add_child(node)
+    return root
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def _signature(node: Optional[UiNode]):
+    return None if node is None else tree_signature(node)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m kite.bench.code_scan", description="Code-behind fallback: pre-filter and linear initializer scanning")
+    ap.add_argument("files", nargs="*", help="Real .cs files to check for identical trees")
+    ap.add_argument("--lines", type=int, default=50000, help="Length of the pathological and service files")
+    ap.add_argument("--legacy-lines", type=int, nargs="+", default=[250, 500, 1000], help="Pathological sizes to also run through the old regex (it is quadratic)")
+    ap.add_argument("--budget", type=float, default=2.0, help="Seconds a single pathological file may take before the run fails")
+    args = ap.parse_args(argv)
+    parser = WinFormsParser()
+    ok = True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def write(name: str, text: str) -> str:
+            path = os.path.join(tmp, name)
+            with open(path, "w", encoding="utf-8", newline="\n") as f:
+                f.write(text)
+            return path
+
+        form = write("CodeForm.cs", synth_code_form("CodeForm", 500))
+        service = write("OrderService.cs", synth_service(args.lines))
+        same = _signature(legacy_parse_code(parser, read_text(form))) == _signature(parser.parse_code(form))
+        ok &= same
+        print(f"code-built form (500 controls): {'same tree' if same else 'DIFFERENT tree'}")
+
+        legacy = _timed(lambda: legacy_parse_code(parser, read_text(service)))
+        new = _timed(lambda: parser.parse_code(service))
+        print(f"service class, {args.lines} lines: legacy {legacy * 1000:.1f} ms, pre-filtered {new * 1000:.2f} ms")
+
+        print(f"{'unterminated lines':>19} {'legacy ms':>10} {'scan ms':>9}")
+        for n in args.legacy_lines:
+            text = synth_unterminated(n)
+            path = write(f"Broken{n}.cs", text)
+            legacy = _timed(lambda: legacy_parse_code(parser, text))
+            new = _timed(lambda: parser.parse_code(path))
+            same = _signature(legacy_parse_code(parser, text)) == _signature(parser.parse_code(path))
+            ok &= same
+            print(f"{n:>19} {legacy * 1000:>10.1f} {new * 1000:>9.1f}{'' if same else '  DIFFERENT tree'}")
+        path = write("Broken.cs", synth_unterminated(args.lines))
+        new = _timed(lambda: parser.parse_code(path))
+        within = new <= args.budget
+        ok &= within
+        print(f"{args.lines:>19} {'-':>10} {new * 1000:>9.1f}  {'within' if within else 'OVER'} {args.budget:.1f}s budget")
+
+    for path in args.files:
+        same = _signature(legacy_parse_code(parser, read_text(path))) == _signature(parser.parse_code(path))
+        ok &= same
+        print(f"{path}: {'same tree' if same else 'DIFFERENT tree'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
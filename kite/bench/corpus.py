@@ -0,0 +1,295 @@
+import os
+import random
+from typing import List, Tuple
+
+# Synthetic WinForms designer sources and WPF windows shaped like what Visual Studio writes out
+
+_LEAF_TYPES = ["Button", "Label", "TextBox", "ComboBox", "CheckBox", "ListBox", "ProgressBar", "NumericUpDown"]
+_CONTAINER_TYPES = ["Panel", "GroupBox", "FlowLayoutPanel"]
+_COLORS = ["System.Drawing.Color.Transparent", "System.Drawing.SystemColors.Control", "System.Drawing.Color.FromArgb(((int)(((byte)(64)))), ((int)(((byte)(64)))), ((int)(((byte)(64)))))", "System.Drawing.Color.White"]
+
+
+def _props(lines: List[str], name: str, typ: str, i: int, density: int, rnd: random.Random) -> None:
+    lines.append("            // ")
+    lines.append(f"            // {name}")
+    lines.append("            // ")
+    lines.append(f"            this.{name}.Location = new System.Drawing.Point({(i * 7) % 600}, {(i * 13) % 400});")
+    lines.append(f"            this.{name}.Name = \"{name}\";")
+    lines.append(f"            this.{name}.Size = new System.Drawing.Size({rnd.choice((75, 100, 120, 200))}, {rnd.choice((23, 20, 100))});")
+    lines.append(f"            this.{name}.TabIndex = {i};")
+    extra = [
+        f"            this.{name}.Text = \"{typ} {i}\";",
+        f"            this.{name}.BackColor = {rnd.choice(_COLORS)};",
+        f"            this.{name}.Font = new System.Drawing.Font(\"Microsoft Sans Serif\", 8.25F, System.Drawing.FontStyle.Regular, System.Drawing.GraphicsUnit.Point, ((byte)(0)));",
+        f"            this.{name}.UseVisualStyleBackColor = true;",
+        f"            this.{name}.Margin = new System.Windows.Forms.Padding(3, 3, 3, 3);",
+        f"            this.{name}.Enabled = {rnd.choice(('true', 'false'))};",
+        f"            this.{name}.Dock = System.Windows.Forms.DockStyle.{rnd.choice(('Top', 'Fill', 'Left', 'None'))};",
+    ]
+    lines.extend(extra[:density])
+
+
+def _items(lines: List[str], name: str, count: int) -> None:
+    lines.append(f"            this.{name}.Items.AddRange(new object[] {{")
+    lines.append(",\n".join(f"            \"Item {k}\"" for k in range(count)) + "});")
+
+
+def synth_designer(form_name: str, controls: int, depth: int = 3, addrange: bool = True, density: int = 4, seed: int = 0, items: int = 0) -> str:
+    # items: entries given to every ListBox/ComboBox through Items.AddRange
+    rnd = random.Random(seed)
+    names: List[str] = []
+    types: List[str] = []
+    parents: List[int] = []  # -1 = form
+    open_containers: List[Tuple[int, int]] = []  # (control index, nesting level)
+    for i in range(controls):
+        if open_containers and rnd.random() < 0.7:
+            parent, level = rnd.choice(open_containers)
+            level += 1
+        else:
+            parent, level = -1, 0
+        is_container = level < depth - 1 and rnd.random() < 0.15
+        typ = rnd.choice(_CONTAINER_TYPES if is_container else _LEAF_TYPES)
+        names.append(f"{typ[0].lower()}{typ[1:]}{i + 1}")
+        types.append(typ)
+        parents.append(parent)
+        if is_container:
+            open_containers.append((i, level))
+
+    lines = [
+        f"namespace Synthetic",
+        "{",
+        f"    partial class {form_name}",
+        "    {",
+        "        private System.ComponentModel.IContainer components = null;",
+        "",
+        "        #region Windows Form Designer generated code",
+        "",
+        "        private void InitializeComponent()",
+        "        {",
+        "            this.components = new System.ComponentModel.Container();",
+    ]
+    for name, typ in zip(names, types):
+        lines.append(f"            this.{name} = new System.Windows.Forms.{typ}();")
+    lines.append("            this.SuspendLayout();")
+    children: List[List[int]] = [[] for _ in names]
+    top: List[int] = []
+    for i, p in enumerate(parents):
+        (top if p < 0 else children[p]).append(i)
+    for i, (name, typ) in enumerate(zip(names, types)):
+        kids = children[i]
+        if kids:
+            if addrange and len(kids) > 1:
+                lines.append(f"            this.{name}.Controls.AddRange(new System.Windows.Forms.Control[] {{")
+                lines.append(",\n".join(f"            this.{names[k]}" for k in kids) + "});")
+            else:
+                for k in kids:
+                    lines.append(f"            this.{name}.Controls.Add(this.{names[k]});")
+        _props(lines, name, typ, i, density, rnd)
+        if items and typ in ("ListBox", "ComboBox"):
+            _items(lines, name, items)
+    lines.append("            // ")
+    lines.append(f"            // {form_name}")
+    lines.append("            // ")
+    lines.append("            this.AutoScaleDimensions = new System.Drawing.SizeF(6F, 13F);")
+    lines.append("            this.AutoScaleMode = System.Windows.Forms.AutoScaleMode.Font;")
+    lines.append("            this.ClientSize = new System.Drawing.Size(800, 600);")
+    for k in top:
+        lines.append(f"            this.Controls.Add(this.{names[k]});")
+    lines.append(f"            this.Name = \"{form_name}\";")
+    lines.append(f"            this.Text = \"{form_name}\";")
+    lines.append("            this.ResumeLayout(false);")
+    lines.append("        }")
+    lines.append("")
+    lines.append("        #endregion")
+    lines.append("")
+    for name, typ in zip(names, types):
+        lines.append(f"        private System.Windows.Forms.{typ} {name};")
+    lines.append("    }")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def synth_tabbed(form_name: str, tabs: int, per_tab: int, density: int = 4, seed: int = 0) -> str:
+    # A TabControl filling the form, each page holding per_tab leaf controls
+    rnd = random.Random(seed)
+    pages = [f"tabPage{t + 1}" for t in range(tabs)]
+    leaves = [[(f"{typ[0].lower()}{typ[1:]}{t + 1}_{i + 1}", typ) for i, typ in enumerate(rnd.choice(_LEAF_TYPES) for _ in range(per_tab))] for t in range(tabs)]
+    lines = [
+        "namespace Synthetic",
+        "{",
+        f"    partial class {form_name}",
+        "    {",
+        "        private void InitializeComponent()",
+        "        {",
+        "            this.tabControl1 = new System.Windows.Forms.TabControl();",
+    ]
+    lines += [f"            this.{page} = new System.Windows.Forms.TabPage();" for page in pages]
+    lines += [f"            this.{name} = new System.Windows.Forms.{typ}();" for page in leaves for name, typ in page]
+    lines.append("            this.SuspendLayout();")
+    lines.append("            this.tabControl1.Controls.AddRange(new System.Windows.Forms.Control[] {")
+    lines.append(",\n".join(f"            this.{page}" for page in pages) + "});")
+    lines.append("            this.tabControl1.Dock = System.Windows.Forms.DockStyle.Fill;")
+    lines.append("            this.tabControl1.Name = \"tabControl1\";")
+    n = 0
+    for t, page in enumerate(pages):
+        lines.append(f"            this.{page}.Controls.AddRange(new System.Windows.Forms.Control[] {{")
+        lines.append(",\n".join(f"            this.{name}" for name, _ in leaves[t]) + "});")
+        lines.append(f"            this.{page}.Name = \"{page}\";")
+        lines.append(f"            this.{page}.Text = \"Page {t + 1}\";")
+        for name, typ in leaves[t]:
+            _props(lines, name, typ, n, density, rnd)
+            n += 1
+    lines.append("            this.ClientSize = new System.Drawing.Size(800, 600);")
+    lines.append("            this.Controls.Add(this.tabControl1);")
+    lines.append(f"            this.Name = \"{form_name}\";")
+    lines.append(f"            this.Text = \"{form_name}\";")
+    lines.append("            this.ResumeLayout(false);")
+    lines += ["        }", "    }", "}"]
+    return "\n".join(lines) + "\n"
+
+
+def synth_code_form(form_name: str, controls: int, seed: int = 0) -> str:
+    # A form built by hand in code-behind, with object initializers instead of a designer file
+    rnd = random.Random(seed)
+    lines = [
+        "using System.Drawing;",
+        "using System.Windows.Forms;",
+        "",
+        "namespace Synthetic",
+        "{",
+        f"    public partial class {form_name} : Form",
+        "    {",
+        f"        public {form_name}()",
+        "        {",
+        f"            this.Text = \"{form_name}\";",
+        "            this.ClientSize = new Size(800, 600);",
+        "            var panel = new Panel { Dock = DockStyle.Fill, BackColor = Color.White };",
+        "            this.Controls.Add(panel);",
+    ]
+    for i in range(controls):
+        typ = rnd.choice(("Button", "Label", "TextBox"))
+        name = f"{typ.lower()}{i + 1}"
+        lines.append(f"            var {name} = new {typ} {{ Text = \"{typ} {i}\", Location = new Point({(i * 7) % 600}, {(i * 13) % 400}), Size = new Size(100, 23) }};")
+        if typ == "Button":
+            lines.append(f"            {name}.Click += (s, e) => {{ var tip = new Label(); MessageBox.Show(\"{i}\"); }};")
+        lines.append(f"            panel.Controls.Add({name});")
+    lines += ["        }", "    }", "}"]
+    return "\n".join(lines) + "\n"
+
+
+def synth_service(lines_count: int, seed: int = 0) -> str:
+    # A large non-UI class of the kind that dominates code-behind fallback input
+    rnd = random.Random(seed)
+    lines = ["using System.Collections.Generic;", "", "namespace Synthetic.Services", "{", "    public class OrderService", "    {"]
+    i = 0
+    while len(lines) < lines_count:
+        lines += [
+            f"        public List<Order> Load{i}(int id)",
+            "        {",
+            f"            var query = new Query {{ Id = id, Limit = {rnd.randint(1, 500)}, Tags = new[] {{ \"a\", \"b\" }} }};",
+            "            var result = new List<Order>();",
+            "            foreach (var row in _db.Run(query)) { result.Add(new Order { Id = row.Id }); }",
+            "            return result;",
+            "        }",
+        ]
+        i += 1
+    lines += ["    }", "}"]
+    return "\n".join(lines) + "\n"
+
+
+def synth_unterminated(lines_count: int, form_name: str = "Broken") -> str:
+    # Worst case for the old `\{.*?\}` initializer regex: a form class full of initializers that never close
+    lines = [f"public partial class {form_name} : Form", "{", f"    public {form_name}()", "    {"]
+    i = 0
+    while len(lines) < lines_count:
+        lines.append(f"        var button{i} = new Button {{ Text = \"{i}\", Width = {i % 300}")
+        i += 1
+    return "\n".join(lines) + "\n"
+
+
+_XAML_LEAVES = ["Button", "TextBlock", "TextBox", "ComboBox", "CheckBox", "RadioButton", "ListBox"]
+_XAML_PANELS = ["StackPanel", "Grid", "DockPanel"]
+_XAML_BRUSHES = ["White", "#FF202020", "{StaticResource Accent}", "{DynamicResource Accent}"]
+
+
+def _xaml_attrs(typ: str, i: int, density: int, rnd: random.Random) -> str:
+    text = "Text" if typ in ("TextBlock", "TextBox") else "Content"
+    attrs = [
+        f'{text}="{typ} {i}"',
+        f'Width="{rnd.choice((75, 100, 120, 200))}"',
+        f'Background="{rnd.choice(_XAML_BRUSHES)}"',
+        f'Margin="{i % 8},4,4,4"',
+        f'Foreground="{rnd.choice(_XAML_BRUSHES)}"',
+        f'FontSize="{rnd.choice((11, 12, 14))}"',
+        f'IsEnabled="{rnd.choice(("True", "False"))}"',
+    ]
+    return " ".join(attrs[:density])
+
+
+def synth_xaml(window_name: str, controls: int, depth: int = 3, density: int = 4, seed: int = 0) -> str:
+    # A Window whose panels nest up to depth levels, with property density attributes per control
+    rnd = random.Random(seed)
+    lines = [
+        f'<Window x:Class="Synthetic.{window_name}"',
+        '        xmlns="http://schemas.microsoft.com/winfx/2006/xaml/presentation"',
+        '        xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml"',
+        f'        Title="{window_name}" Width="800" Height="600">',
+        "    <Window.Resources>",
+        '        <SolidColorBrush x:Key="Panel" Color="#FFF0F0F0" />',
+        "    </Window.Resources>",
+        '    <Grid x:Name="root">',
+    ]
+    # Open panels as (closing tag, indent); the root Grid is level 0
+    open_panels: List[Tuple[str, str]] = [("Grid", "    ")]
+    for i in range(controls):
+        # Close some panels so siblings spread across levels
+        while len(open_panels) > 1 and rnd.random() < 0.3:
+            tag, indent = open_panels.pop()
+            lines.append(f"{indent}</{tag}>")
+        indent = open_panels[-1][1] + "    "
+        if len(open_panels) < depth and rnd.random() < 0.15:
+            typ = rnd.choice(_XAML_PANELS)
+            lines.append(f'{indent}<{typ} x:Name="{typ[0].lower()}{typ[1:]}{i + 1}" Background="{{StaticResource Panel}}">')
+            open_panels.append((typ, indent))
+        else:
+            typ = rnd.choice(_XAML_LEAVES)
+            lines.append(f'{indent}<{typ} x:Name="{typ[0].lower()}{typ[1:]}{i + 1}" {_xaml_attrs(typ, i, density, rnd)} />')
+    while open_panels:
+        tag, indent = open_panels.pop()
+        lines.append(f"{indent}</{tag}>")
+    lines.append("</Window>")
+    return "\n".join(lines) + "\n"
+
+
+_APP_XAML = """<Application xmlns="http://schemas.microsoft.com/winfx/2006/xaml/presentation" xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">
+  <Application.Resources>
+    <SolidColorBrush x:Key="Accent" Color="#FF3366" />
+  </Application.Resources>
+</Application>
+"""
+
+
+def write_project(root: str, kind: str, forms: int, controls: int, depth: int = 3, addrange: bool = True, density: int = 4, items: int = 0, seed: int = 0) -> List[str]:
+    # A synthetic project on disk: a .csproj plus forms .Designer.cs files (kind "winforms") or .xaml windows
+    # (kind "wpf", with an App.xaml holding a shared brush); returns the form/window files written
+    os.makedirs(root, exist_ok=True)
+    wpf = kind == "wpf"
+    with open(os.path.join(root, "Synthetic.csproj"), "w", encoding="utf-8") as f:
+        f.write('<Project Sdk="Microsoft.NET.Sdk">\n  <PropertyGroup>\n    <OutputType>WinExe</OutputType>\n')
+        f.write(f"    <{'UseWPF' if wpf else 'UseWindowsForms'}>true</{'UseWPF' if wpf else 'UseWindowsForms'}>\n")
+        f.write("  </PropertyGroup>\n</Project>\n")
+    if wpf:
+        with open(os.path.join(root, "App.xaml"), "w", encoding="utf-8") as f:
+            f.write(_APP_XAML)
+    paths = []
+    for i in range(forms):
+        if wpf:
+            path = os.path.join(root, f"Window{i + 1}.xaml")
+            text = synth_xaml(f"Window{i + 1}", controls, depth=depth, density=density, seed=seed + i)
+        else:
+            path = os.path.join(root, f"Form{i + 1}.Designer.cs")
+            text = synth_designer(f"Form{i + 1}", controls, depth=depth, addrange=addrange, density=density, seed=seed + i, items=items)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        paths.append(path)
+    return paths
@@ -0,0 +1,72 @@
+import argparse
+import random
+import statistics
+import time
+from typing import Any, Callable, List
+
+from .. import runtime
+
+# Needs a display: every number here is Tk work (item creation, redraw), which a headless stand-in can't model
+
+
+def _rows(n: int) -> List[tuple]:
+    return [(i, f"customer {(i * 7919) % n}", (i * 31) % 1000, f"{i % 28 + 1:02d}/02/2024") for i in range(n)]
+
+
+def _timed(fn: Callable[[], Any]) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m kite.bench.datagrid", description="DataGrid fill time and scroll latency: plain Treeview inserts vs the virtual source")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Row counts")
+    ap.add_argument("--plain-max", type=int, default=100_000, help="Largest row count to also fill the plain way")
+    ap.add_argument("--steps", type=int, default=200, help="Scroll steps timed per size")
+    args = ap.parse_args(argv)
+    try:
+        root = runtime.tk.Tk()
+    except runtime.tk.TclError as e:
+        print(f"needs a display: {e}")
+        return 1
+    root.geometry("800x600")
+    columns = ("id", "name", "score", "date")
+    rnd = random.Random(0)
+    print(f"{'rows':>9} {'mode':>8} {'fill ms':>9} {'scroll ms':>10} {'jump ms':>8} {'sort ms':>8}")
+    try:
+        for n in args.sizes:
+            rows = _rows(n)
+            modes = ["plain", "virtual"] if n <= args.plain_max else ["virtual"]
+            for mode in modes:
+                grid = runtime.DataGrid(root, columns=columns)
+                grid.pack(fill="both", expand=True)
+                root.update()
+                if mode == "plain":
+                    def fill() -> None:
+                        for row in rows:
+                            grid.insert("", "end", values=row)
+                        root.update()
+                else:
+                    def fill() -> None:
+                        grid.set_source(rows=rows)
+                        root.update()
+                fill_s = _timed(fill)
+                # Per step: scroll, then let Tk redraw
+                steps = []
+                for _ in range(args.steps):
+                    steps.append(_timed(lambda: (grid.yview_scroll(3, "units"), root.update())))
+                jumps = []
+                for _ in range(args.steps // 4):
+                    jumps.append(_timed(lambda: (grid.yview_moveto(rnd.random()), root.update())))
+                sort_s = _timed(lambda: (grid.sort("score"), root.update()))
+                print(f"{n:>9} {mode:>8} {fill_s * 1e3:>9.0f} {statistics.median(steps) * 1e3:>10.2f} {statistics.median(jumps) * 1e3:>8.2f} {sort_s * 1e3:>8.0f}")
+                grid.destroy()
+                root.update()
+    finally:
+        root.destroy()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
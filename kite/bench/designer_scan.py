@@ -0,0 +1,131 @@
+import argparse
+import os
+import re
+import time
+from typing import Any, Dict, List, Tuple
+
+from ..model import UiNode
+from ..parsers.winforms import WinFormsParser
+from ..utils.fs import read_text
+from ..utils.naming import safe_name
+from .corpus import synth_designer
+
+# The multi-pass regex implementation parse_designer used before the statement scanner,
+# kept as the reference for equivalence and speed comparisons.
+_inst_pat = re.compile(r"(?:this\.)?(?P<name>\w+)\s*=\s*new\s+(?P<type>[\w\.]+)\(\)\s*;", re.MULTILINE)
+_prop_pat = re.compile(r"(?:this\.)?(?P<name>\w+)\.(?P<prop>\w+)\s*=\s*(?P<value>.+?);\s*$", re.MULTILINE)
+_add_form_pat = re.compile(r"this\.Controls\.Add\(\s*(?:this\.)?(?P<child>\w+)\s*\)\s*;", re.MULTILINE)
+_add_parent_pat = re.compile(r"(?:this\.)?(?P<parent>\w+)\.Controls\.Add\(\s*(?:this\.)?(?P<child>\w+)\s*\)\s*;", re.MULTILINE)
+_addrange_form_pat = re.compile(r"this\.Controls\.AddRange\(\s*new\s+[\w\.]+\[\]\s*\{(?P<list>[^}]*)\}\s*\)\s*;", re.S)
+_addrange_parent_pat = re.compile(r"(?:this\.)?(?P<parent>\w+)\.Controls\.AddRange\(\s*new\s+[\w\.]+\[\]\s*\{(?P<list>[^}]*)\}\s*\)\s*;", re.S)
+_form_text_pat = re.compile(r"this\.Text\s*=\s*\"(?P<text>.*?)\";")
+_form_size_pat = re.compile(r"this\.ClientSize\s*=\s*new\s+(?:System\.Drawing\.)?Size\((?P<w>\d+),\s*(?P<h>\d+)\)\s*;")
+
+
+def legacy_parse_designer(parser: WinFormsParser, text: str, form_name: str) -> UiNode:
+    root = UiNode(type="Form", name=safe_name(form_name), properties={}, children=[])
+    controls: Dict[str, Dict[str, Any]] = {}
+    for m in _inst_pat.finditer(text):
+        name = m.group("name")
+        typ = m.group("type").split(".")[-1]
+        if name == "components" or typ.endswith("Container") or typ.endswith("IContainer"):
+            continue
+        controls[name] = {"type": typ, "props": {}, "children": []}
+    for m in _prop_pat.finditer(text):
+        name = m.group("name")
+        prop = m.group("prop")
+        parsed = parser._parse_value(prop, m.group("value").strip())
+        if name in ("this", "base"):
+            if prop in ("Text", "ClientSize", "Size", "Width", "Height", "BackColor", "ForeColor"):
+                root.set_property(prop, parsed)
+            continue
+        if name == form_name:
+            root.set_property(prop, parsed)
+        else:
+            controls.setdefault(name, {"type": "Control", "props": {}, "children": []})["props"][prop] = parsed
+    for m in _add_form_pat.finditer(text):
+        controls.setdefault(m.group("child"), {"type": "Control", "props": {}, "children": []})["parent"] = form_name
+    for m in _addrange_form_pat.finditer(text):
+        for token in m.group("list").split(','):
+            nm = token.strip()
+            if not nm:
+                continue
+            nm = nm.replace('this.', '').strip()
+            controls.setdefault(nm, {"type": "Control", "props": {}, "children": []})["parent"] = form_name
+    for m in _add_parent_pat.finditer(text):
+        controls.setdefault(m.group("child"), {"type": "Control", "props": {}, "children": []})["parent"] = m.group("parent")
+    for m in _addrange_parent_pat.finditer(text):
+        for token in m.group("list").split(','):
+            nm = token.strip().replace('this.', '').strip()
+            if nm:
+                controls.setdefault(nm, {"type": "Control", "props": {}, "children": []})["parent"] = m.group("parent")
+    name_to_node = {name: UiNode(type=d["type"], name=safe_name(name), properties=d["props"], children=[]) for name, d in controls.items()}
+    for name, data in controls.items():
+        parent = data.get("parent")
+        node = name_to_node[name]
+        if parent and parent in name_to_node:
+            name_to_node[parent].add_child(node)
+        else:
+            root.add_child(node)
+    form_text = _form_text_pat.search(text)
+    if form_text:
+        root.set_property("Text", form_text.group("text"))
+    form_size = _form_size_pat.search(text)
+    if form_size:
+        root.set_property("ClientSize", {"w": int(form_size.group("w")), "h": int(form_size.group("h"))})
+    return root
+
+
+def tree_signature(root: UiNode) -> List[Tuple[int, str, str, str]]:
+    sig = []
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        sig.append((depth, node.type, node.name, repr(sorted(node.properties.items(), key=lambda kv: kv[0]))))
+        stack.extend((c, depth + 1) for c in reversed(node.children))
+    return sig
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m kite.bench.designer_scan", description="Compare the designer statement scanner with the legacy multi-pass parser")
+    ap.add_argument("files", nargs="*", help="Real .Designer.cs files to check for identical trees")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 8000], help="Synthetic form sizes (controls)")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+    parser = WinFormsParser()
+    ok = True
+
+    print(f"{'controls':>9} {'lines':>8} {'legacy ms':>10} {'scan ms':>9} {'scan us/ctl':>12} {'same':>5}")
+    per_control = []
+    for n in args.sizes:
+        text = synth_designer("Synthetic", n, seed=n)
+        legacy = _best(lambda: legacy_parse_designer(parser, text, "Synthetic"), args.repeat)
+        scan = _best(lambda: parser.parse_designer_text(text, "Synthetic"), args.repeat)
+        same = tree_signature(legacy_parse_designer(parser, text, "Synthetic")) == tree_signature(parser.parse_designer_text(text, "Synthetic"))
+        ok &= same
+        per_control.append(scan / n)
+        print(f"{n:>9} {text.count(chr(10)):>8} {legacy * 1000:>10.1f} {scan * 1000:>9.1f} {scan / n * 1e6:>12.2f} {'yes' if same else 'NO':>5}")
+    if len(per_control) > 1:
+        # Linear scaling keeps the per-control cost flat as forms grow
+        print(f"per-control cost, largest/smallest form: {per_control[-1] / per_control[0]:.2f}x")
+
+    for path in args.files:
+        form_name = os.path.basename(path).replace(".Designer.cs", "")
+        text = read_text(path)
+        same = tree_signature(legacy_parse_designer(parser, text, form_name)) == tree_signature(parser.parse_designer_text(text, form_name))
+        ok &= same
+        print(f"{path}: {'same tree' if same else 'DIFFERENT tree'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+from ..generator.tk_generator import CUSTOM_CONTENT, EMIT_MODES, TkGenerator
+from ..model import count_controls
+from ..parsers.winforms import WinFormsParser
+from .corpus import synth_tabbed
+from .window_emit import _best, _generate, _have_display, _null_tk
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m kite.bench.lazy_tabs", description="Window open time with every tab page built eagerly vs --lazy-tabs")
+    ap.add_argument("--tabs", type=int, nargs="+", default=[5, 10, 20], help="Tab pages per form")
+    ap.add_argument("--per-tab", type=int, default=200, help="Controls per tab page")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--headless", action="store_true", help="Build windows against no-op tk classes even if a display is available")
+    args = ap.parse_args(argv)
+    parser = WinFormsParser()
+    real_tk = not args.headless and _have_display()
+    saved = {k: sys.modules.get(k) for k in ("tkinter", "tkinter.ttk")}
+    if not real_tk:
+        sys.modules["tkinter"], sys.modules["tkinter.ttk"] = _null_tk()
+    print(f"open time measured with {'Tk' if real_tk else 'no-op widgets (no display)'}")
+    print(f"{'tabs':>5} {'controls':>9} {'emit':>6} {'eager ms':>9} {'lazy ms':>8} {'speedup':>8}")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            pkg = os.path.join(tmp, "kite_bench_tabs")
+            os.makedirs(pkg)
+            with open(os.path.join(pkg, "__init__.py"), "w", encoding="utf-8"):
+                pass
+            with open(os.path.join(pkg, "custom.py"), "w", encoding="utf-8") as f:
+                f.write(CUSTOM_CONTENT)
+            sys.path.insert(0, tmp)
+            try:
+                for tabs in args.tabs:
+                    node = parser.parse_designer_text(synth_tabbed("Tabbed", tabs, args.per_tab, seed=tabs), "Tabbed")
+                    for emit in EMIT_MODES:
+                        times = []
+                        for lazy in (False, True):
+                            fname = _generate(pkg, TkGenerator(emit, lazy), node)
+                            name = f"kite_bench_tabs.{fname[:-3]}"
+                            sys.modules.pop(name, None)
+                            # Same file name for both variants: drop the stale bytecode
+                            importlib.invalidate_caches()
+                            mod = importlib.import_module(name)
+                            window_cls = next(v for v in vars(mod).values() if isinstance(v, type) and v.__module__ == name)
+
+                            def open_window() -> None:
+                                win = window_cls()
+                                if real_tk:
+                                    win.update_idletasks()
+                                    win.destroy()
+
+                            times.append(_best(open_window, args.repeat))
+                            sys.modules.pop(name, None)
+                        print(f"{tabs:>5} {count_controls(node):>9} {emit:>6} {times[0] * 1e3:>9.1f} {times[1] * 1e3:>8.1f} {times[0] / times[1]:>7.1f}x")
+            finally:
+                sys.path.remove(tmp)
+                for name in [k for k in sys.modules if k.startswith("kite_bench_tabs")]:
+                    del sys.modules[name]
+    finally:
+        for k, mod in saved.items():
+            if mod is None:
+                sys.modules.pop(k, None)
+            else:
+                sys.modules[k] = mod
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
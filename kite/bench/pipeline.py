@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import __version__
+from ..converter import Converter
+from ..profiling import Profiler
+from ..utils.log import log
+from .corpus import write_project
+
+# Whole-pipeline throughput on synthetic projects (parse, generate, write; no parse cache), saved as a baseline
+# and compared against later runs. Everything is generated locally, so it runs offline.
+
+# Phases shorter than this (or with less memory) in the baseline are too noisy to flag
+MIN_PHASE_MS = 20.0
+MIN_PHASE_KB = 256.0
+
+
+def _case_name(kind: str, forms: int, controls: int) -> str:
+    return f"{kind}-{forms}x{controls}"
+
+
+def _convert(input_root: str, output_dir: str, jobs: int, profiler: Optional[Profiler] = None) -> Tuple[float, int, int]:
+    # Seconds, forms and controls of one fresh conversion
+    started = time.perf_counter()
+    results = Converter(jobs=jobs, full=True, profiler=profiler).convert(input_root, output_dir, overwrite=True)
+    seconds = time.perf_counter() - started
+    done = [r for r in results if r.fname]
+    return seconds, len(done), sum(r.controls for r in done)
+
+
+def run_case(kind: str, forms: int, controls: int, params: Dict[str, Any], repeat: int, jobs: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "src")
+        write_project(src, kind, forms, controls, depth=params["depth"], addrange=params["addrange"], density=params["density"], items=params["items"], seed=params["seed"])
+        out = os.path.join(tmp, "out")
+        best = float("inf")
+        n_forms = n_controls = 0
+        for _ in range(repeat):
+            seconds, n_forms, n_controls = _convert(src, out, jobs)
+            best = min(best, seconds)
+        # Memory per phase from one more, traced run: tracemalloc slows it, so it isn't timed for throughput
+        profiler = Profiler()
+        try:
+            _convert(src, out, jobs, profiler)
+        finally:
+            profiler.close()
+    return {
+        "case": _case_name(kind, forms, controls),
+        "kind": kind,
+        "forms": n_forms,
+        "controls": n_controls,
+        "seconds": round(best, 4),
+        "forms_per_sec": round(n_forms / best, 2),
+        "controls_per_sec": round(n_controls / best, 1),
+        "phases": profiler.summary(),
+    }
+
+
+def run(params: Dict[str, Any]) -> Dict[str, Any]:
+    # Quiet conversions: only the table below is printed
+    level, fmt = log.level, log.fmt
+    log.configure("warn", fmt)
+    results = []
+    print(f"{'case':>22} {'forms':>6} {'controls':>9} {'s':>8} {'forms/s':>9} {'controls/s':>11} {'peak MB':>8}")
+    try:
+        for kind in params["kinds"]:
+            for forms in params["forms"]:
+                for controls in params["controls"]:
+                    r = run_case(kind, forms, controls, params, params["repeat"], params["jobs"])
+                    peak = max((p["peak_kb"] for p in r["phases"].values()), default=0.0)
+                    print(f"{r['case']:>22} {r['forms']:>6} {r['controls']:>9} {r['seconds']:>8.3f} {r['forms_per_sec']:>9.1f} {r['controls_per_sec']:>11.0f} {peak / 1024:>8.1f}")
+                    results.append(r)
+    finally:
+        log.configure(level, fmt)
+    return {
+        "kite_version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    # Regressions beyond threshold (a fraction): lower throughput, or slower / hungrier phases
+    problems = []
+    now = {r["case"]: r for r in current["results"]}
+    for base in baseline["results"]:
+        cur = now.get(base["case"])
+        if cur is None:
+            continue
+        for metric in ("forms_per_sec", "controls_per_sec"):
+            if cur[metric] < base[metric] * (1 - threshold):
+                problems.append(f"{base['case']}: {metric} {base[metric]} -> {cur[metric]} ({cur[metric] / base[metric] - 1:+.0%})")
+        for name, bp in base["phases"].items():
+            cp = cur["phases"].get(name)
+            if cp is None:
+                continue
+            if bp["wall_ms"] >= MIN_PHASE_MS and cp["wall_ms"] > bp["wall_ms"] * (1 + threshold):
+                problems.append(f"{base['case']}: {name} wall_ms {bp['wall_ms']} -> {cp['wall_ms']} ({cp['wall_ms'] / bp['wall_ms'] - 1:+.0%})")
+            if bp["peak_kb"] >= MIN_PHASE_KB and cp["peak_kb"] > bp["peak_kb"] * (1 + threshold):
+                problems.append(f"{base['case']}: {name} peak_kb {bp['peak_kb']} -> {cp['peak_kb']} ({cp['peak_kb'] / bp['peak_kb'] - 1:+.0%})")
+    return problems
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save(data: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    print(f"wrote {path}")
+
+
+def _add_params(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--kinds", nargs="+", choices=["winforms", "wpf"], default=["winforms", "wpf"])
+    p.add_argument("--forms", type=int, nargs="+", default=[10, 50], help="Forms per project")
+    p.add_argument("--controls", type=int, nargs="+", default=[100, 1000], help="Controls per form")
+    p.add_argument("--depth", type=int, default=3, help="Container nesting depth")
+    p.add_argument("--density", type=int, default=4, help="Properties set per control beyond location/size/name")
+    p.add_argument("--items", type=int, default=0, help="Items.AddRange entries per list/combo box (WinForms)")
+    p.add_argument("--no-addrange", action="store_true", help="Add child controls one Controls.Add at a time")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is kept)")
+    p.add_argument("--jobs", "-j", type=int, default=1, help="Converter worker processes")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m kite.bench.pipeline", description="Forms/sec, controls/sec and peak memory per phase on synthetic projects, with baselines")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    run_p = sub.add_parser("run", help="Run the suite, optionally saving the results as a baseline")
+    _add_params(run_p)
+    run_p.add_argument("--save", metavar="PATH", help="Write results to this JSON file")
+    cmp_p = sub.add_parser("compare", help="Compare against a baseline (re-running its parameters unless --current is given); exit 1 on regressions")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("--current", metavar="PATH", help="Saved results to compare instead of running the suite")
+    cmp_p.add_argument("--save", metavar="PATH", help="Write the new results to this JSON file")
+    cmp_p.add_argument("--threshold", type=float, default=0.20, help="Allowed slowdown or memory growth as a fraction (default 0.20; timings on a busy machine vary by about that much)")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "run":
+        params = {
+            "kinds": args.kinds, "forms": args.forms, "controls": args.controls, "depth": args.depth, "density": args.density,
+            "items": args.items, "addrange": not args.no_addrange, "seed": args.seed, "repeat": args.repeat, "jobs": args.jobs,
+        }
+        data = run(params)
+        if args.save:
+            _save(data, args.save)
+        return 0
+
+    baseline = _load(args.baseline)
+    current = _load(args.current) if args.current else run(baseline["params"])
+    if args.save:
+        _save(current, args.save)
+    if (baseline.get("python"), baseline.get("platform")) != (current.get("python"), current.get("platform")):
+        print(f"note: baseline from Python {baseline.get('python')} on {baseline.get('platform')}", file=sys.stderr)
+    problems = compare(baseline, current, args.threshold)
+    for line in problems:
+        print(f"REGRESSION {line}")
+    print(f"{len(problems)} regression(s) beyond {args.threshold:.0%} across {len(baseline['results'])} case(s)")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
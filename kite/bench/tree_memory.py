@@ -0,0 +1,118 @@
+import argparse
+import gc
+import sys
+import tracemalloc
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from ..model import EMPTY_PROPERTIES, UiNode, walk
+from ..parsers.winforms import WinFormsParser
+from .corpus import synth_designer
+
+
+@dataclass
+class LegacyUiNode:
+    # kite.model.UiNode before it was slotted: per-instance __dict__, fresh containers on every node
+    type: str
+    name: str
+    properties: Dict[str, Any] = field(default_factory=dict)
+    children: List["LegacyUiNode"] = field(default_factory=list)
+    parent: Optional["LegacyUiNode"] = None
+
+
+class FlatTree:
+    # Array-backed alternative to UiNode, kept here for comparison only: node i is types[i]/names[i]/props[i],
+    # linked by parent/first-child/next-sibling indexes (-1 for none), with no Python object per node
+    __slots__ = ("types", "names", "props", "parent", "first_child", "next_sibling", "_last_child")
+
+    def __init__(self) -> None:
+        self.types: List[str] = []
+        self.names: List[str] = []
+        self.props: List[Mapping[str, Any]] = []
+        self.parent = array("i")
+        self.first_child = array("i")
+        self.next_sibling = array("i")
+        self._last_child = array("i")
+
+    def add(self, type: str, name: str, properties: Optional[Mapping[str, Any]] = None, parent: int = -1) -> int:
+        i = len(self.types)
+        self.types.append(sys.intern(type))
+        self.names.append(name)
+        self.props.append({sys.intern(k): v for k, v in properties.items()} if properties else EMPTY_PROPERTIES)
+        self.parent.append(parent)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        self._last_child.append(-1)
+        if parent >= 0:
+            last = self._last_child[parent]
+            if last < 0:
+                self.first_child[parent] = i
+            else:
+                self.next_sibling[last] = i
+            self._last_child[parent] = i
+        return i
+
+    @classmethod
+    def from_node(cls, root: UiNode) -> "FlatTree":
+        tree = cls()
+        tree.add(root.type, root.name, root.properties)
+        index: Dict[int, int] = {id(root): 0}
+        for node, _ in walk(root):
+            index[id(node)] = tree.add(node.type, node.name, node.properties, index[id(node.parent)])
+        return tree
+
+
+def _fresh(s: str) -> str:
+    # A distinct string object, as each regex match used to produce
+    return s.encode().decode()
+
+
+def to_legacy(root: UiNode) -> LegacyUiNode:
+    def copy(node: UiNode) -> LegacyUiNode:
+        return LegacyUiNode(type=_fresh(node.type), name=node.name, properties={_fresh(k): v for k, v in node.properties.items()}, children=[])
+    out = copy(root)
+    made = {id(root): out}
+    for node, _ in walk(root):
+        new = copy(node)
+        parent = made[id(node.parent)]
+        new.parent = parent
+        parent.children.append(new)
+        made[id(node)] = new
+    return out
+
+
+def _measure(build: Callable[[], Any]) -> int:
+    # Bytes still allocated once the structure is built, i.e. what a batch holds per parsed form
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return after - before
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m kite.bench.tree_memory", description="Memory held by parsed form trees: legacy dataclass nodes vs slotted UiNode vs FlatTree")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000, 50000], help="Synthetic form sizes (controls)")
+    args = ap.parse_args(argv)
+    parser = WinFormsParser()
+
+    print(f"{'controls':>9} {'legacy MB':>10} {'UiNode MB':>10} {'FlatTree MB':>12} {'B/ctl legacy':>13} {'B/ctl UiNode':>13} {'B/ctl flat':>11}")
+    for n in args.sizes:
+        text = synth_designer("Synthetic", n, seed=n)
+        # Fill the value cache first so it isn't charged to whichever model runs first
+        parser.parse_designer_text(text, "Synthetic")
+        # Values are shared by all three; the difference is node/container/key overhead
+        legacy = _measure(lambda: to_legacy(parser.parse_designer_text(text, "Synthetic")))
+        slotted = _measure(lambda: parser.parse_designer_text(text, "Synthetic"))
+        flat = _measure(lambda: FlatTree.from_node(parser.parse_designer_text(text, "Synthetic")))
+        print(f"{n:>9} {legacy / 1e6:>10.1f} {slotted / 1e6:>10.1f} {flat / 1e6:>12.1f} {legacy / n:>13.0f} {slotted / n:>13.0f} {flat / n:>11.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
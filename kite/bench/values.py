@@ -0,0 +1,108 @@
+import argparse
+import re
+import time
+from typing import Any, List
+
+from ..parsers import winforms
+from ..parsers.winforms import WinFormsParser, _font_pat, _font_style_pat, _parse_literal, _scan_statements
+from ..utils.fs import read_text
+from .corpus import synth_designer
+
+_location_pat = re.compile(r"new\s+(?:System\.Drawing\.)?Point\((?P<x>-?\d+),\s*(?P<y>-?\d+)\)")
+_size_pat = re.compile(r"new\s+(?:System\.Drawing\.)?Size\((?P<w>\d+),\s*(?P<h>\d+)\)")
+_padding_pat = re.compile(r"new\s+(?:System\.Windows\.Forms\.)?Padding\((?P<a>\d+)(?:\s*,\s*(?P<b>\d+)\s*,\s*(?P<c>\d+)\s*,\s*(?P<d>\d+))?\)")
+_color_argb_pat = re.compile(r"Color\.FromArgb\((?P<r>\d+)\s*,\s*(?P<g>\d+)\s*,\s*(?P<b>\d+)\)")
+_color_name_pat = re.compile(r"(?:System\.Drawing\.)?Color\.(?P<name>\w+)")
+_dockstyle_pat = re.compile(r"DockStyle\.(?P<val>\w+)")
+_string_pat = re.compile(r'\"(.*?)(?<!\\)\"')
+
+
+def legacy_parse_value(val: str) -> Any:
+    # Sequential regex chain _parse_value used before dispatch + caching, plus the Font literals parsed since
+    m = _font_pat.search(val)
+    if m:
+        rest = m.group("rest")
+        size = float(m.group("size")) * (-1 if "GraphicsUnit.Pixel" in rest else 1)
+        return {"family": m.group("family"), "size": size, "style": tuple(s.lower() for s in _font_style_pat.findall(rest))}
+    if _location_pat.search(val):
+        m = _location_pat.search(val)
+        return {"x": int(m.group("x")), "y": int(m.group("y"))}
+    if _size_pat.search(val):
+        m = _size_pat.search(val)
+        return {"w": int(m.group("w")), "h": int(m.group("h"))}
+    if _padding_pat.search(val):
+        m = _padding_pat.search(val)
+        a = int(m.group('a'))
+        if not m.group('b'):
+            return a
+        return (a, int(m.group('b')), int(m.group('c')), int(m.group('d')))
+    if _color_argb_pat.search(val):
+        m = _color_argb_pat.search(val)
+        return f"#{int(m.group('r')):02X}{int(m.group('g')):02X}{int(m.group('b')):02X}"
+    if _dockstyle_pat.search(val):
+        return _dockstyle_pat.search(val).group('val')
+    if _color_name_pat.fullmatch(val.strip()):
+        return _color_name_pat.fullmatch(val.strip()).group('name')
+    if val.endswith(")") and "Color" in val:
+        return val.split('.')[-1].rstrip(")")
+    sm = _string_pat.search(val)
+    if sm:
+        return sm.group(1)
+    if val.isdigit():
+        return int(val)
+    if val.lower() in ("true", "false"):
+        return val.lower() == "true"
+    return val
+
+
+def corpus_values(paths: List[str], synthetic: int) -> List[str]:
+    texts = [read_text(p) for p in paths] or [synth_designer(f"Form{i}", synthetic, seed=i) for i in range(4)]
+    return [val for text in texts for _, _, val in _scan_statements(text).props]
+
+
+def _per_call(fn, values: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for v in values:
+            fn(v)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(values)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m kite.bench.values", description="Per-assignment cost of WinForms property value parsing")
+    ap.add_argument("files", nargs="*", help="Designer files to draw property values from (default: synthetic corpus)")
+    ap.add_argument("--synthetic", type=int, default=2000, help="Controls per synthetic form when no files are given")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    values = corpus_values(args.files, args.synthetic)
+    if not values:
+        print("no property assignments found")
+        return 1
+    parser = WinFormsParser()
+    mismatches = [v for v in values if parser._parse_value("", v) != legacy_parse_value(v)]
+
+    legacy = _per_call(legacy_parse_value, values, args.repeat)
+    _parse_literal.cache_clear()
+    t0 = time.perf_counter()
+    for v in values:
+        parser._parse_value("", v)
+    cold = (time.perf_counter() - t0) / len(values)
+    warm = _per_call(lambda v: parser._parse_value("", v), values, args.repeat)
+    info = _parse_literal.cache_info()
+
+    print(f"assignments: {len(values)}, distinct literals: {len(set(values))}, cache size: {winforms._VALUE_CACHE_SIZE}")
+    print(f"legacy regex chain : {legacy * 1e9:8.0f} ns/assignment")
+    print(f"dispatch, cold     : {cold * 1e9:8.0f} ns/assignment")
+    print(f"dispatch, warm     : {warm * 1e9:8.0f} ns/assignment ({legacy / warm:.1f}x)")
+    print(f"cache hits/misses  : {info.hits}/{info.misses}")
+    print(f"result mismatches  : {len(mismatches)}")
+    for v in mismatches[:10]:
+        print(f"  {v!r}")
+    return 0 if not mismatches else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
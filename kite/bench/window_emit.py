@@ -0,0 +1,140 @@
+import argparse
+import importlib
+import marshal
+import os
+import sys
+import tempfile
+import time
+import types
+from typing import Any, Callable, Tuple
+
+from ..generator.tk_generator import CUSTOM_CONTENT, EMIT_MODES, TkGenerator
+from ..parsers.winforms import WinFormsParser
+from .corpus import synth_designer
+
+
+class _NullWidget:
+    # Headless stand-in for tk/ttk classes: accepts every call, so only the generated code's own cost is timed
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.menu = self
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self
+
+
+class _NullNotebook(_NullWidget):
+    # Selects its first page, as ttk.Notebook does, so lazily built pages behave as under Tk
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__()
+        self._selected = ""
+
+    def add(self, page: Any, **kwargs: Any) -> None:
+        self._selected = self._selected or str(page)
+
+    def select(self) -> str:
+        return self._selected
+
+
+def _null_tk() -> Tuple[types.ModuleType, types.ModuleType]:
+    tk = types.ModuleType("tkinter")
+    ttk = types.ModuleType("tkinter.ttk")
+    tk.__getattr__ = lambda name: _NullWidget
+    ttk.__getattr__ = lambda name: _NullNotebook if name == "Notebook" else _NullWidget
+    tk.ttk = ttk
+    return tk, ttk
+
+
+def _have_display() -> bool:
+    try:
+        import tkinter
+        tkinter.Tk().destroy()
+        return True
+    except Exception:
+        return False
+
+
+def _generate(pkg: str, generator: TkGenerator, node: Any) -> str:
+    # Window module plus the theme.py it may import, as Converter.finish would write it
+    fname, _, styles = generator.generate_window(pkg, node)
+    with open(os.path.join(pkg, "theme.py"), "w", encoding="utf-8") as f:
+        f.write("\n".join(generator.theme_lines(styles)))
+    # A theme imported for an earlier window is stale now
+    sys.modules.pop(os.path.basename(pkg) + ".theme", None)
+    return fname
+
+
+def _best(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m kite.bench.window_emit", description="Generated window size, compile, import and startup time: --emit code vs --emit table")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[500, 5000], help="Synthetic form sizes (controls)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--headless", action="store_true", help="Build windows against no-op tk classes even if a display is available")
+    args = ap.parse_args(argv)
+    parser = WinFormsParser()
+    real_tk = not args.headless and _have_display()
+    saved = {k: sys.modules.get(k) for k in ("tkinter", "tkinter.ttk")}
+    if not real_tk:
+        sys.modules["tkinter"], sys.modules["tkinter.ttk"] = _null_tk()
+    print(f"startup measured with {'Tk' if real_tk else 'no-op widgets (no display)'}")
+    print(f"{'controls':>9} {'emit':>6} {'.py KB':>8} {'compile ms':>11} {'import ms':>10} {'startup ms':>11}")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            pkg = os.path.join(tmp, "kite_bench_app")
+            os.makedirs(pkg)
+            with open(os.path.join(pkg, "__init__.py"), "w", encoding="utf-8"):
+                pass
+            with open(os.path.join(pkg, "custom.py"), "w", encoding="utf-8") as f:
+                f.write(CUSTOM_CONTENT)
+            sys.path.insert(0, tmp)
+            try:
+                custom = importlib.import_module("kite_bench_app.custom")
+                for n in args.sizes:
+                    node = parser.parse_designer_text(synth_designer("Synthetic", n, seed=n), "Synthetic")
+                    for emit in EMIT_MODES:
+                        fname = _generate(pkg, TkGenerator(emit), node)
+                        path = os.path.join(pkg, fname)
+                        with open(path, encoding="utf-8") as f:
+                            source = f.read()
+                        code = compile(source, path, "exec")
+                        # What an import from __pycache__ does: unmarshal, then run the module body
+                        pyc = marshal.dumps(code)
+                        compile_s = _best(lambda: compile(source, path, "exec"), args.repeat)
+                        ns = {"__name__": f"kite_bench_app.{fname[:-3]}", "__package__": "kite_bench_app"}
+                        import_s = _best(lambda: exec(marshal.loads(pyc), dict(ns)), args.repeat)
+                        exec(code, ns)
+                        window_cls = next(v for v in ns.values() if isinstance(v, type) and v.__module__ == ns["__name__"])
+
+                        def startup() -> None:
+                            win = window_cls()
+                            if real_tk:
+                                win.update_idletasks()
+                                win.destroy()
+
+                        startup_s = _best(startup, args.repeat)
+                        print(f"{n:>9} {emit:>6} {len(source.encode('utf-8')) / 1024:>8.0f} {compile_s * 1e3:>11.1f} {import_s * 1e3:>10.2f} {startup_s * 1e3:>11.1f}")
+                del custom
+            finally:
+                sys.path.remove(tmp)
+                for name in [k for k in sys.modules if k.startswith("kite_bench_app")]:
+                    del sys.modules[name]
+    finally:
+        for k, mod in saved.items():
+            if mod is None:
+                sys.modules.pop(k, None)
+            else:
+                sys.modules[k] = mod
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
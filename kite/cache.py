@@ -0,0 +1,185 @@
+import hashlib
+import marshal
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import __version__
+from .model import UiNode, walk
+from .utils.log import log
+
+DEFAULT_MAX_BYTES = 256 << 20
+# Trimming leaves this much headroom so the next runs don't evict again straight away
+_TRIM_TO = 0.9
+_LAYOUT = "v1"
+_parser_hash: Optional[str] = None
+
+
+def default_cache_dir() -> str:
+    env = os.environ.get("KITE_CACHE_DIR")
+    if env:
+        return env
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "kite")
+
+
+def parser_hash() -> str:
+    # Any change to the parsers, the node model or the helpers they use (decoding, naming, colors) invalidates
+    # every entry, released or not
+    global _parser_hash
+    if _parser_hash is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        h = hashlib.sha256(__version__.encode("ascii"))
+        paths = [os.path.join(here, "model.py")]
+        for sub in ("parsers", "utils"):
+            d = os.path.join(here, sub)
+            paths += sorted(os.path.join(d, n) for n in os.listdir(d) if n.endswith(".py"))
+        for path in paths:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        _parser_hash = h.hexdigest()
+    return _parser_hash
+
+
+def encode_tree(root: UiNode) -> bytes:
+    # Pre-order (type, name, properties, child count) rows; property values are plain dict/tuple/str/int/bool
+    rows: List[Any] = [root.type, root.name, dict(root.properties), len(root.children)]
+    for node, _ in walk(root):
+        rows += (node.type, node.name, dict(node.properties), len(node.children))
+    return marshal.dumps(tuple(rows))
+
+
+def decode_tree(data: bytes) -> UiNode:
+    rows = marshal.loads(data)
+    root = UiNode(rows[0], rows[1], rows[2])
+    # (parent, children still to attach)
+    stack = [(root, rows[3])]
+    for i in range(4, len(rows), 4):
+        while stack[-1][1] == 0:
+            stack.pop()
+        parent, left = stack[-1]
+        stack[-1] = (parent, left - 1)
+        node = UiNode(rows[i], rows[i + 1], rows[i + 2])
+        parent.add_child(node)
+        if rows[i + 3]:
+            stack.append((node, rows[i + 3]))
+    return root
+
+
+class ParseCache:
+    # Parsed trees keyed by source hash, parse kind and parser hash; shared by every Kite process on the machine
+    def __init__(self, root: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = os.path.abspath(root or default_cache_dir())
+        self.max_bytes = max_bytes
+        self._dir = os.path.join(self.root, _LAYOUT)
+
+    def key(self, parse_kind: str, path: str, digest: str) -> str:
+        # The file name is part of the tree: designer and XAML roots are named after it
+        return hashlib.sha256(f"{parser_hash()}:{parse_kind}:{os.path.basename(path)}:{digest}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._dir, key[:2], key[2:])
+
+    def get(self, key: str) -> Optional[Tuple[Optional[UiNode], Optional[str]]]:
+        # None on a miss, else (tree or None, parse error or None)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            tag, payload = data[:1], data[1:]
+            if tag == b"T":
+                entry: Tuple[Optional[UiNode], Optional[str]] = (decode_tree(payload), None)
+            elif tag == b"N":
+                entry = (None, None)
+            elif tag == b"E":
+                entry = (None, payload.decode("utf-8"))
+            else:
+                raise ValueError(f"unknown entry tag {tag!r}")
+        except Exception as e:
+            log.warn("Dropped unreadable cache entry", path=path, error=e)
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, node: Optional[UiNode], error: Optional[str] = None) -> None:
+        if error is not None:
+            data = b"E" + error.encode("utf-8")
+        elif node is None:
+            data = b"N"
+        else:
+            data = b"T" + encode_tree(node)
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                self._remove(tmp)
+                raise
+        except OSError as e:
+            # A read-only or full cache only costs speed
+            log.warn("Could not write parse cache entry", path=path, error=e)
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        try:
+            shards = list(os.scandir(self._dir))
+        except OSError:
+            return entries
+        for shard in shards:
+            if not shard.is_dir(follow_symlinks=False):
+                continue
+            try:
+                with os.scandir(shard.path) as it:
+                    for e in it:
+                        try:
+                            st = e.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        entries.append((st.st_mtime, st.st_size, e.path))
+            except OSError:
+                continue
+        return entries
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        return {"path": self.root, "entries": len(entries), "bytes": sum(e[1] for e in entries), "max_bytes": self.max_bytes}
+
+    def trim(self) -> int:
+        # Oldest-first until under the cap; concurrent trims may race on the same files, which is harmless
+        entries = self._entries()
+        total = sum(e[1] for e in entries)
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        target = self.max_bytes * _TRIM_TO
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+        log.info("Trimmed parse cache", removed=removed, bytes=total)
+        return removed
+
+    def clear(self) -> int:
+        entries = self._entries()
+        for _, _, path in entries:
+            self._remove(path)
+        return len(entries)
@@ -1,24 +1,120 @@
 import argparse
+from typing import Optional
+from .batch import convert_batch
+from .cache import DEFAULT_MAX_BYTES, ParseCache, default_cache_dir
 from .converter import Converter
-from .utils.log import log
+from .epat import EPAT_FORMATS
+from .generator.tk_generator import EMIT_MODES
+from .utils.fs import DEFAULT_PRUNE_DIRS
+from .profiling import Profiler
+from .utils.log import LEVELS, LOG_FORMATS, log
+from .watch import Watcher
+
+
+def _add_scan_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes for parsing/generation (default: CPU count, 1 = serial)")
+    p.add_argument("--exclude-dir", action="append", default=[], metavar="NAME", help="Directory name to skip while scanning the input (repeatable)")
+    p.add_argument("--no-default-excludes", action="store_true", help=f"Also scan {', '.join(sorted(DEFAULT_PRUNE_DIRS))}")
+    p.add_argument("--emit", choices=EMIT_MODES, default="code", help="Window code style: statements per control, or a literal widget table built at startup (smaller, faster to import for large forms)")
+    p.add_argument("--lazy-tabs", action="store_true", help="Create each tab page's controls when the page is first selected instead of when the window opens")
+    p.add_argument("--shared-runtime", action="store_true", help="Import widgets from the installed kite.runtime instead of writing app/custom.py into the output")
+    p.add_argument("--epat", choices=EPAT_FORMATS, default="json", help="serial.epat/pie.epat encoding: one indented JSON document, or a JSON line per window with an offset index that kite.epat.EpatFile reads without loading the rest")
+    p.add_argument("--compile", action="store_true", help="Byte-compile the generated app (for this Python version) so its first start skips compilation")
+    p.add_argument("--profile", default=None, metavar="PATH", help="Record wall/CPU time and peak traced memory per phase and per file, written as a Chrome trace (chrome://tracing, Perfetto) to PATH")
+    p.add_argument("--no-cache", action="store_true", help="Parse every source instead of reusing trees from the parse cache")
+    _add_cache_args(p)
+
+
+def _add_cache_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--cache-dir", default=None, help=f"Parse cache location (default: $KITE_CACHE_DIR or {default_cache_dir()})")
+    p.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES >> 20, metavar="MB", help="Parse cache size cap; least recently used entries are evicted above it")
+
+
+def _cache(args) -> Optional[ParseCache]:
+    if getattr(args, "no_cache", False):
+        return None
+    return ParseCache(args.cache_dir, max_bytes=args.cache_size << 20)
+
+
+def _prune_dirs(args) -> set:
+    prune = set(args.exclude_dir)
+    if not args.no_default_excludes:
+        prune |= DEFAULT_PRUNE_DIRS
+    return prune
 
 
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="kite", description="Convert .NET UIs (WinForms/WPF) to Tkinter")
+    p.add_argument("--log-level", choices=list(LEVELS), default="info", help="Least severe messages to print")
+    p.add_argument("--log-format", choices=LOG_FORMATS, default="text", help="Plain lines, or one JSON object per message")
     sub = p.add_subparsers(dest="cmd", required=True)
 
     conv = sub.add_parser("convert", help="Convert a .NET project to Tkinter")
     conv.add_argument("--input", "-i", required=True, help="Path to .NET project root (.sln/.csproj) or source dir")
     conv.add_argument("--output", "-o", required=True, help="Output directory for generated Tkinter project")
     conv.add_argument("--main-window", default=None, help="Optional main window/form name to start")
-    conv.add_argument("--overwrite", action="store_true", help="Overwrite output directory if exists")
+    conv.add_argument("--overwrite", action="store_true", help="Overwrite output directory if exists (with a previous Kite manifest only stale windows are removed)")
+    conv.add_argument("--full", action="store_true", help="Ignore the manifest of a previous run and regenerate every form")
+    _add_scan_args(conv)
+
+    batch = sub.add_parser("batch", help="Convert every project of a .sln (or a list file of project roots) in one run")
+    batch.add_argument("--input", "-i", required=True, help="Path to a .sln, a text file listing project roots/.csproj/.sln (one per line), or a directory of projects")
+    batch.add_argument("--output", "-o", required=True, help="Output directory; each project is written to its own subdirectory")
+    batch.add_argument("--overwrite", action="store_true", help="Overwrite project output directories if they exist")
+    batch.add_argument("--full", action="store_true", help="Ignore the manifests of previous runs and regenerate every form")
+    _add_scan_args(batch)
+
+    watch = sub.add_parser("watch", help="Convert, then re-convert changed forms as the sources are edited")
+    watch.add_argument("--input", "-i", required=True, help="Path to .NET project root (.sln/.csproj) or source dir")
+    watch.add_argument("--output", "-o", required=True, help="Output directory for generated Tkinter project")
+    watch.add_argument("--main-window", default=None, help="Optional main window/form name to start")
+    watch.add_argument("--interval", type=float, default=0.1, help="Seconds between polls of the input tree")
+    watch.add_argument("--debounce", type=float, default=0.2, help="Quiet period in seconds before changes are converted")
+    _add_scan_args(watch)
+
+    cache = sub.add_parser("cache", help="Inspect or empty the parse cache")
+    cache.add_argument("action", choices=["stats", "clear"])
+    _add_cache_args(cache)
 
     return p
 
 
+def _write_profile(profiler: Profiler, path: str) -> None:
+    profiler.write(path)
+    for name, totals in sorted(profiler.summary().items(), key=lambda kv: -kv[1]["wall_ms"]):
+        log.info("Profile", phase=name, **totals)
+    log.info("Wrote profile", path=path)
+
+
 def main(argv=None):
     args = build_parser().parse_args(argv)
+    log.configure(args.log_level, args.log_format)
+    profiler = Profiler() if getattr(args, "profile", None) else None
+    try:
+        _run(args, profiler)
+    finally:
+        if profiler is not None:
+            _write_profile(profiler, args.profile)
+
+
+def _run(args, profiler: Optional[Profiler]) -> None:
     if args.cmd == "convert":
         log.info("Starting conversion", input=args.input, output=args.output)
-        Converter().convert(input_path=args.input, output_dir=args.output, main_window=args.main_window, overwrite=args.overwrite)
+        Converter(prune_dirs=_prune_dirs(args), jobs=args.jobs, full=args.full, cache=_cache(args), emit=args.emit, lazy_tabs=args.lazy_tabs, shared_runtime=args.shared_runtime, compile=args.compile, epat=args.epat, profiler=profiler).convert(input_path=args.input, output_dir=args.output, main_window=args.main_window, overwrite=args.overwrite)
+        log.info("Done", output=args.output)
+    elif args.cmd == "batch":
+        log.info("Starting batch conversion", input=args.input, output=args.output)
+        convert_batch(Converter(prune_dirs=_prune_dirs(args), jobs=args.jobs, full=args.full, cache=_cache(args), emit=args.emit, lazy_tabs=args.lazy_tabs, shared_runtime=args.shared_runtime, compile=args.compile, epat=args.epat, profiler=profiler), args.input, args.output, overwrite=args.overwrite)
         log.info("Done", output=args.output)
+    elif args.cmd == "watch":
+        watcher = Watcher(Converter(prune_dirs=_prune_dirs(args), jobs=args.jobs, cache=_cache(args), emit=args.emit, lazy_tabs=args.lazy_tabs, shared_runtime=args.shared_runtime, compile=args.compile, epat=args.epat, profiler=profiler), args.input, args.output, main_window=args.main_window, interval=args.interval, debounce=args.debounce)
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            log.info("Stopped watching", output=args.output)
+    elif args.cmd == "cache":
+        cache = _cache(args)
+        if args.action == "stats":
+            log.info("Parse cache", **cache.stats())
+        else:
+            log.info("Cleared parse cache", path=cache.root, removed=cache.clear())
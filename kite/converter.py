@@ -1,65 +1,483 @@
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import compileall
+import hashlib
 import os
 
 from .parsers.winforms import WinFormsParser
 from .parsers.wpf import WpfParser
-from .generator.tk_generator import TkGenerator
-from .utils.fs import ensure_empty_dir, ensure_dir, write_text, read_text, find_files
+from .parsers.xaml_resources import ResourceIndex
+from .parsers.resx import extract_images
+from .assets import AssetStore
+from .generator.tk_generator import TkGenerator, items_path
+from .cache import ParseCache
+from .manifest import Manifest, manifest_entry, manifest_fields
+from .profiling import NullProfiler, Profiler
+from .utils.fs import DEFAULT_PRUNE_DIRS, DISK, FileIndex, FileSystem
 from .utils.log import log
-from .model import UiNode
+from .model import UiNode, count_controls, walk
+
+# (parse kind, source path, app package dir, source digest, keep the parsed tree)
+Task = Tuple[str, str, str, str, bool]
+
+
+@dataclass
+class FormResult:
+    source: str
+    parse_kind: str = ""
+    digest: str = ""
+    name: str = ""
+    fname: str = ""
+    children: int = 0
+    controls: int = 0
+    parsed: bool = False
+    reused: bool = False
+    # Tree (or negative result) came from the parse cache
+    cached: bool = False
+    error: Optional[str] = None
+    # Parsed tree, only kept for in-process callers that ask for it
+    node: Optional[UiNode] = None
+    # ReadStats counts taken in a worker process, merged back by the parent
+    reads: Tuple[int, ...] = ()
+    # app/assets files the window uses
+    assets: List[str] = field(default_factory=list)
+    # Named ttk styles the window uses (style name -> [class style, options]), for app/theme.py
+    styles: Dict[str, List[Any]] = field(default_factory=dict)
+    # Profiler events recorded in a worker process, merged back by the parent
+    trace: List[Dict[str, Any]] = field(default_factory=list)
+    # serial.epat/pie.epat lines of a window generated in a worker process, appended by the parent as it arrives
+    epat: Tuple[str, ...] = ()
+
+
+@dataclass
+class Project:
+    input_root: str
+    output_dir: str
+    index: FileIndex
+    kind: str
+    prev: Optional[Manifest]
+    app_pkg_dir: str
+    results: List[FormResult] = field(default_factory=list)
 
 
 class Converter:
-    def __init__(self) -> None:
-        self.winforms = WinFormsParser()
-        self.wpf = WpfParser()
-        self.generator = TkGenerator()
-
-    def _detect_kind(self, input_path: str) -> str:
-        csproj = find_files(input_path, patterns=["*.csproj"]) or []
-        xamls = find_files(input_path, patterns=["*.xaml"]) or []
-        designers = find_files(input_path, patterns=["*.Designer.cs"]) or []
+    def __init__(self, prune_dirs: Optional[Iterable[str]] = None, jobs: Optional[int] = None, full: bool = False, cache: Optional[ParseCache] = None, emit: str = "code", lazy_tabs: bool = False, shared_runtime: bool = False, compile: bool = False, epat: str = "json", profiler: Optional[Profiler] = None, fs: Optional[FileSystem] = None) -> None:
+        # Sources are read from and output written to fs (the disk unless given)
+        self.fs = fs or DISK
+        if compile and not self.fs.shared:
+            raise ValueError("compile needs the output on disk")
+        self.winforms = WinFormsParser(self.fs)
+        self.wpf = WpfParser(self.fs)
+        self.generator = TkGenerator(emit, lazy_tabs, shared_runtime, epat, self.fs)
+        # Byte-compile the output tree after generating it
+        self.compile = compile
+        self.prune_dirs = DEFAULT_PRUNE_DIRS if prune_dirs is None else frozenset(prune_dirs)
+        self.jobs = jobs if jobs and jobs > 0 else (os.cpu_count() or 1)
+        if not self.fs.shared:
+            # Worker processes can't see a file system that lives in this one
+            self.jobs = 1
+        # Ignore the manifest of a previous run and regenerate every form
+        self.full = full
+        self.cache = cache
+        # Hand parsed trees back on the results (kite watch keeps them between rebuilds)
+        self.keep_nodes = False
+        # Leave EPAT lines on the results instead of adding them to the generator's writers (worker processes)
+        self.defer_epat = False
+        # Phase timings for --profile; the null one records nothing
+        self.profiler = profiler or NullProfiler()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_workers = 0
+        # WPF resource indexes by app package dir (which tasks already carry); shipped to workers once
+        self.resources: Dict[str, ResourceIndex] = {}
+        # (assets dir, .resx path) -> (file stamp, {resource name: asset name or None}): each .resx is streamed
+        # again only for names no earlier form of this process asked for
+        self._resx_assets: Dict[Tuple[str, str], Tuple[Tuple[int, int], Dict[str, Optional[str]]]] = {}
+        # Directory -> its project's Properties/Resources.resx (or None)
+        self._project_resx: Dict[str, Optional[str]] = {}
+        self._resx_digests: Dict[Tuple[str, int, int], str] = {}
+
+    def _detect_kind(self, index: FileIndex) -> str:
+        csproj = index.find(["*.csproj"])
+        xamls = index.find(["*.xaml"])
+        designers = index.find(["*.Designer.cs"])
         if xamls:
             return "wpf"
         if designers:
             return "winforms"
         # Fallback by inspect .csproj
         if csproj:
-            text = read_text(csproj[0])
+            text = self.fs.read_text(csproj[0])
             if "<UseWPF>true</UseWPF>" in text or "<OutputType>WinExe</OutputType>" in text and ".xaml" in text:
                 return "wpf"
         return "winforms"
 
-    def _collect(self, input_path: str, kind: str) -> List[UiNode]:
+    def _sources(self, index: FileIndex, kind: str) -> List[Tuple[str, str]]:
         if kind == "wpf":
-            return self.wpf.parse_project(input_path)
+            # Skip resources/app xaml
+            return [("xaml", p) for p in index.find(["*.xaml"]) if not os.path.basename(p).lower().startswith("app.")]
+        return [("designer", p) for p in index.find(["*.Designer.cs"])]
+
+    def _code_sources(self, index: FileIndex) -> List[Tuple[str, str]]:
+        return [("code", p) for p in index.find(["*.cs"]) if not p.endswith(".Designer.cs")]
+
+    def parse_file(self, parse_kind: str, path: str, resources: Optional[ResourceIndex] = None) -> Optional[UiNode]:
+        if parse_kind == "designer":
+            return self.winforms.parse_designer(path)
+        if parse_kind == "code":
+            return self.winforms.parse_code(cs_path=path)
+        return self.wpf.parse_xaml(path, resources)
+
+    def form_resx(self, path: str) -> str:
+        # Form1.Designer.cs / Form1.cs -> Form1.resx
+        base = path[:-len(".Designer.cs")] if path.endswith(".Designer.cs") else os.path.splitext(path)[0]
+        return base + ".resx"
+
+    def project_resx(self, path: str) -> Optional[str]:
+        # Nearest Properties/Resources.resx at or above the source's directory
+        d = os.path.dirname(path)
+        seen: List[str] = []
+        found: Optional[str] = None
+        while d not in self._project_resx:
+            seen.append(d)
+            candidate = os.path.join(d, "Properties", "Resources.resx")
+            if self.fs.isfile(candidate):
+                found = candidate
+                break
+            parent = os.path.dirname(d)
+            if parent == d:
+                break
+            d = parent
+        else:
+            found = self._project_resx[d]
+        for s in seen:
+            self._project_resx[s] = found
+        return found
+
+    def resx_files(self, path: str) -> List[str]:
+        # Resource files a WinForms source's images can come from
+        files = [self.form_resx(path), self.project_resx(path)]
+        return [f for f in files if f and self.fs.isfile(f)]
+
+    def _resx_digest(self, path: str) -> str:
+        key = (path, *self.fs.stat(path))
+        digest = self._resx_digests.get(key)
+        if digest is None:
+            digest = self._resx_digests[key] = self.fs.file_digest(path)
+        return digest
+
+    def source_digest(self, path: str, app_pkg_dir: str) -> str:
+        digest = self.fs.file_digest(path)
+        res = self.resources.get(app_pkg_dir)
+        extra = [res.fingerprint] if res is not None and res.fingerprint else []
+        if path.endswith(".cs"):
+            extra += [self._resx_digest(f) for f in self.resx_files(path)]
+        if not extra:
+            return digest
+        # Windows take values from the project's dictionaries and images from its .resx files, so editing either
+        # must invalidate them too
+        return hashlib.sha256(":".join([digest] + extra).encode("ascii")).hexdigest()
+
+    def _resx_images(self, store: AssetStore, path: str, names: Set[str]) -> Dict[str, Optional[str]]:
+        stamp = self.fs.stat(path)
+        key = (store.root, path)
+        memo = self._resx_assets.get(key)
+        if memo is None or memo[0] != stamp:
+            memo = self._resx_assets[key] = (stamp, {})
+        known = memo[1]
+        # Also redo names whose asset was pruned since (watch mode: a form removed, then restored)
+        missing = {n for n in names if n not in known or (known[n] and not self.fs.exists(os.path.join(store.root, known[n])))}
+        if missing:
+            found = extract_images(path, missing, store)
+            for n in missing:
+                known[n] = found.get(n)
+        return known
+
+    def resolve_images(self, source: str, node: UiNode, app_pkg_dir: str) -> List[str]:
+        # Give each resx image reference its asset file ({"resx", "key"} gains "asset"); returns the assets used
+        refs: List[Dict[str, Any]] = []
+        for n, _depth in walk(node):
+            for prop in ("Image", "BackgroundImage"):
+                v = n.properties.get(prop)
+                if isinstance(v, dict) and "resx" in v:
+                    refs.append(v)
+        if not refs:
+            return []
+        store = AssetStore.for_app(app_pkg_dir, self.fs)
+        files = {"form": self.form_resx(source), "project": self.project_resx(source)}
+        wanted: Dict[str, Set[str]] = {}
+        for ref in refs:
+            path = files.get(ref["resx"])
+            if path and self.fs.isfile(path):
+                wanted.setdefault(path, set()).add(ref["key"])
+        assets = {path: self._resx_images(store, path, names) for path, names in wanted.items()}
+        used: Set[str] = set()
+        for ref in refs:
+            asset = assets.get(files.get(ref["resx"]) or "", {}).get(ref["key"])
+            ref["asset"] = asset
+            if asset:
+                used.add(asset)
+            else:
+                log.warn("Image resource not found", source=source, resx=ref["resx"], key=ref["key"])
+        return sorted(used)
+
+    def _parse_cached(self, result: FormResult, app_pkg_dir: str) -> Optional[UiNode]:
+        key = None
+        if self.cache is not None:
+            if not result.digest:
+                result.digest = self.source_digest(result.source, app_pkg_dir)
+            key = self.cache.key(result.parse_kind, result.source, result.digest)
+            hit = self.cache.get(key)
+            if hit is not None:
+                result.cached = True
+                node, result.error = hit
+                return node
+        try:
+            node = self.parse_file(result.parse_kind, result.source, self.resources.get(app_pkg_dir))
+        except Exception as e:
+            node = None
+            result.error = f"parse: {type(e).__name__}: {e}"
+        if key is not None:
+            self.cache.put(key, node, result.error)
+        return node
+
+    def convert_file(self, parse_kind: str, path: str, app_pkg_dir: str, digest: str = "", keep_node: bool = False) -> FormResult:
+        result = FormResult(source=path, parse_kind=parse_kind, digest=digest)
+        with self.profiler.phase("parse", "file", source=path) as trace:
+            try:
+                node = self._parse_cached(result, app_pkg_dir)
+            except OSError as e:
+                result.error = f"parse: {type(e).__name__}: {e}"
+                return result
+            if self.profiler.enabled:
+                trace["bytes_in"] = self.fs.getsize(path)
+                trace["cached"] = result.cached
+        log.debug("Parsed source", source=path, cached=result.cached, found=node is not None)
+        if node is None:
+            return result
+        if keep_node:
+            result.node = node
+        return self.generate_result(result, node, app_pkg_dir)
+
+    def generate_result(self, result: FormResult, node: UiNode, app_pkg_dir: str) -> FormResult:
+        result.parsed = True
+        result.reused = False
+        result.name = node.name
+        result.children = len(node.children)
+        result.controls = count_controls(node)
+        result.error = None
+        with self.profiler.phase("generate", "file", source=result.source, window=result.name, controls=result.controls) as trace:
+            try:
+                result.assets = self.resolve_images(result.source, node, app_pkg_dir)
+                result.fname, lines, result.styles = self.generator.generate_window(app_pkg_dir, node)
+                if self.defer_epat:
+                    result.epat = lines
+                else:
+                    self.generator.add_epat(os.path.dirname(app_pkg_dir), result.name, lines)
+            except Exception as e:
+                result.error = f"generate: {type(e).__name__}: {e}"
+            if self.profiler.enabled and result.fname:
+                data = items_path(app_pkg_dir, result.fname)
+                trace["bytes_out"] = self.fs.getsize(os.path.join(app_pkg_dir, result.fname)) + (self.fs.getsize(data) if self.fs.exists(data) else 0)
+        return result
+
+    def _executor(self, tasks: int) -> Tuple[ProcessPoolExecutor, int]:
+        if self._pool is None:
+            self._pool_workers = min(self.jobs, tasks)
+            self._pool = ProcessPoolExecutor(max_workers=self._pool_workers, initializer=_init_worker, initargs=(self.resources, self.cache, self.generator.options(), self.profiler.enabled, (log.level, log.fmt)))
+        return self._pool, self._pool_workers
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _run(self, tasks: List[Task]) -> List[FormResult]:
+        if self.jobs <= 1 or len(tasks) <= 1:
+            return [self.convert_file(*t) for t in tasks]
+        results: List[FormResult] = []
+        pool, workers = self._executor(len(tasks))
+        chunksize = max(1, len(tasks) // (workers * 4))
+        try:
+            for task, res in zip(tasks, pool.map(_run_task, tasks, chunksize=chunksize)):
+                self.fs.stats.add(res.reads)
+                res.reads = ()
+                self.profiler.add(res.trace)
+                res.trace = []
+                if res.epat:
+                    self.generator.add_epat(os.path.dirname(task[2]), res.name, res.epat)
+                    res.epat = ()
+                results.append(res)
+        except BrokenProcessPool as e:
+            log.warn("Worker pool died, finishing serially", done=len(results), remaining=len(tasks) - len(results), error=e)
+            # Stops the broken executor's management thread and queues; a later batch starts a fresh pool
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            results.extend(self.convert_file(*t) for t in tasks[len(results):])
+        return results
+
+    def _convert_sources(self, batch: List[Tuple[Project, List[Tuple[str, str]]]]) -> List[List[FormResult]]:
+        # All projects' pending forms go through the pool together
+        planned: List[List[Optional[FormResult]]] = []
+        tasks: List[Task] = []
+        owners: List[Tuple[int, int, str]] = []
+        # Digest every source and pick up unchanged windows from the previous run
+        with self.profiler.phase("plan", sources=sum(len(sources) for _, sources in batch)):
+            for b, (proj, sources) in enumerate(batch):
+                results: List[Optional[FormResult]] = [None] * len(sources)
+                for i, (pk, path) in enumerate(sources):
+                    try:
+                        digest = self.source_digest(path, proj.app_pkg_dir)
+                    except OSError:
+                        digest = ""
+                    prev = proj.prev
+                    entry = prev.lookup(os.path.relpath(path, proj.input_root), pk, digest) if prev and digest else None
+                    if entry is not None and (not entry["fname"] or self.fs.exists(os.path.join(proj.app_pkg_dir, entry["fname"]))):
+                        name = entry["name"]
+                        results[i] = FormResult(
+                            source=path, parse_kind=pk, digest=digest, name=name, fname=entry["fname"],
+                            children=entry["children"], controls=entry.get("controls", 0), parsed=bool(name), reused=True,
+                            assets=entry.get("assets", []), styles=entry.get("styles", {}),
+                        )
+                        log.debug("Reused window", source=path, name=name)
+                    else:
+                        tasks.append((pk, path, proj.app_pkg_dir, digest, self.keep_nodes))
+                        owners.append((b, i))
+                planned.append(results)
+        for (b, i), res in zip(owners, self._run(tasks)):
+            planned[b][i] = res
+        out: List[List[FormResult]] = []
+        for (proj, _), results in zip(batch, planned):
+            done = [r for r in results if r is not None]
+            # Forms sharing a window file may have been written out of order; serial order says the last one wins
+            producers: Dict[str, List[int]] = {}
+            for i, res in enumerate(done):
+                if res.fname:
+                    producers.setdefault(res.fname, []).append(i)
+            for fname, idx in producers.items():
+                if len(idx) > 1 and any(not done[i].reused for i in idx):
+                    last = done[idx[-1]]
+                    done[idx[-1]] = self.convert_file(last.parse_kind, last.source, proj.app_pkg_dir, last.digest, self.keep_nodes)
+            out.append(done)
+        return out
+
+    def prepare(self, input_root: str, output_dir: str, index: FileIndex, overwrite: bool = False) -> Project:
+        with self.profiler.phase("detect kind", input=input_root):
+            kind = self._detect_kind(index)
+        log.info("Detected project kind", input=input_root, kind=kind)
+        prev = None if self.full else Manifest.load(output_dir, kind, self.generator.options(), self.fs)
+        # A previous manifest lets us prune stale windows instead of wiping the directory
+        if overwrite and (prev is None or not prev.forms):
+            self.fs.ensure_empty_dir(output_dir)
+            prev = None
         else:
-            return self.winforms.parse_project(input_path)
+            self.fs.ensure_dir(output_dir)
+        app_pkg_dir = os.path.join(output_dir, "app")
+        self.fs.ensure_dir(app_pkg_dir)
+        if kind == "wpf":
+            resources = self.resources[app_pkg_dir] = ResourceIndex.build(input_root, index, self.fs)
+            log.info("Indexed resources", input=input_root, dictionaries=len(resources.files), keys=len(resources.entries))
+        return Project(input_root=input_root, output_dir=output_dir, index=index, kind=kind, prev=prev, app_pkg_dir=app_pkg_dir)
+
+    def convert_projects(self, projects: List[Project], main_window: Optional[str] = None, strict: bool = True) -> None:
+        self.fs.stats.reset()
+        try:
+            first = self._convert_sources([(p, self._sources(p.index, p.kind)) for p in projects])
+            for proj, results in zip(projects, first):
+                proj.results = results
+            fallback = [p for p in projects if self.needs_code_fallback(p.kind, p.results)]
+            if fallback:
+                for proj, results in zip(fallback, self._convert_sources([(p, self._code_sources(p.index)) for p in fallback])):
+                    proj.results += results
+        finally:
+            self.close()
+        log.info("Read sources", **self.fs.stats.as_dict())
+        if self.cache is not None:
+            self.cache.trim()
+        try:
+            for proj in projects:
+                try:
+                    self.finish(proj.input_root, proj.output_dir, proj.kind, proj.results, main_window, proj.prev.fnames() if proj.prev is not None else set())
+                except RuntimeError as e:
+                    if strict:
+                        raise
+                    log.error("Project not converted", input=proj.input_root, error=e)
+        finally:
+            # EPAT writers of projects that never got to generate_app
+            self.generator.discard_epat()
 
-    def convert(self, input_path: str, output_dir: str, main_window: Optional[str] = None, overwrite: bool = False) -> None:
+    def convert(self, input_path: str, output_dir: str, main_window: Optional[str] = None, overwrite: bool = False) -> List[FormResult]:
         input_path = os.path.abspath(input_path)
         # Accept a file path (e.g., .sln/.csproj) by converting to its directory
-        input_root = input_path if os.path.isdir(input_path) else os.path.dirname(input_path)
+        input_root = input_path if self.fs.isdir(input_path) else os.path.dirname(input_path)
         output_dir = os.path.abspath(output_dir)
 
-        if overwrite:
-            ensure_empty_dir(output_dir)
-        else:
-            ensure_dir(output_dir)
+        # One traversal feeds kind detection and every parser
+        with self.profiler.phase("discover", input=input_root):
+            index = self.fs.scan_tree(input_root, prune=self.prune_dirs)
+        log.info("Indexed input", files=len(index))
+        proj = self.prepare(input_root, output_dir, index, overwrite)
+        self.convert_projects([proj], main_window)
+        return proj.results
+
+    def needs_code_fallback(self, kind: str, results: List[FormResult]) -> bool:
+        # If no forms or forms lack children, try parsing code-behind .cs
+        parsed = [r for r in results if r.parsed]
+        return kind == "winforms" and (not parsed or all(r.children == 0 for r in parsed))
 
-        kind = self._detect_kind(input_root)
-        log.info("Detected project kind", kind=kind)
-        ui_roots = self._collect(input_root, kind)
-        if not ui_roots:
+    def finish(self, input_root: str, output_dir: str, kind: str, results: List[FormResult], main_window: Optional[str], stale: Set[str]) -> None:
+        failed = [r for r in results if r.error]
+        for r in failed:
+            log.error("Failed to convert form", source=r.source, error=r.error)
+        generated = [(r.name, r.fname) for r in results if r.fname]
+        if not generated:
+            self.generator.discard_epat(output_dir)
             raise RuntimeError("No windows/forms found to convert.")
+        reused = sum(1 for r in results if r.reused and r.fname)
+        cached = sum(1 for r in results if r.cached and r.fname)
+        log.info("Converted forms", forms=len(generated), regenerated=len(generated) - reused, reused=reused, cached=cached, failed=len(failed), jobs=self.jobs)
 
         app_pkg_dir = os.path.join(output_dir, "app")
-        ensure_dir(app_pkg_dir)
-        write_text(os.path.join(app_pkg_dir, "__init__.py"), "")
+        with self.profiler.phase("write", output=output_dir):
+            for fname in stale - {r.fname for r in results if r.fname}:
+                for path in (os.path.join(app_pkg_dir, fname), items_path(app_pkg_dir, fname)):
+                    try:
+                        self.fs.remove(path)
+                    except OSError:
+                        pass
+            # Assets are shared between windows; keep exactly the ones some window still uses
+            AssetStore.for_app(app_pkg_dir, self.fs).prune({a for r in results if r.fname for a in r.assets})
+
+        forms = [manifest_entry(os.path.relpath(r.source, input_root), r.parse_kind, r.digest, r.name, r.fname, r.children, r.controls, r.assets, r.styles) for r in results if not r.error and r.digest]
+        styles = {name: style for r in results if r.fname for name, style in r.styles.items()}
+        with self.profiler.phase("app", output=output_dir, windows=len(generated)):
+            self.generator.generate_app(output_dir, generated, main_window, kind, manifest=manifest_fields(forms, self.generator.options()), styles=styles)
+        if self.compile:
+            with self.profiler.phase("compile", output=output_dir):
+                self.compile_output(output_dir)
+
+    def compile_output(self, output_dir: str) -> None:
+        # __pycache__ for this interpreter's version; up-to-date .pyc files (unchanged windows) are skipped
+        if not compileall.compile_dir(output_dir, quiet=1, workers=self.jobs):
+            log.warn("Some generated files failed to byte-compile", output=output_dir)
+        else:
+            log.info("Byte-compiled output", output=output_dir)
+
+
+_worker: Optional[Converter] = None
+
+
+def _init_worker(resources: Dict[str, ResourceIndex], cache: Optional[ParseCache], options: Dict[str, Any], profile: bool, log_cfg: Tuple[str, str]) -> None:
+    global _worker
+    log.configure(*log_cfg)
+    _worker = Converter(jobs=1, cache=cache, profiler=Profiler() if profile else None, **options)
+    _worker.resources = resources
+    _worker.defer_epat = True
 
-        generated = []
-        for node in ui_roots:
-            fname, positions, colors = self.generator.generate_window(app_pkg_dir, node)
-            generated.append((node.name, fname, positions, colors))
 
-        self.generator.generate_app(output_dir, generated, main_window, kind)
+def _run_task(task: Task) -> FormResult:
+    res = _worker.convert_file(*task)
+    res.reads = _worker.fs.stats.take()
+    res.trace = _worker.profiler.take()
+    return res
@@ -0,0 +1,219 @@
+import bisect
+import json
+import mmap
+import os
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .utils.fs import DISK, FileSystem
+
+# serial.epat (positions) and pie.epat (colors) hold per-window lists of element records, either as one indented
+# JSON object ({window: [record, ...]}) or "indexed": a magic line, one compact JSON line per window, an index line
+# ({"index": {window: [offset, length]}}) and a fixed-width line with the index line's byte offset. The index comes
+# last because windows are streamed before their offsets are known; offsets count the platform's newline.
+EPAT_FORMATS = ("json", "indexed")
+
+MAGIC = "KITE-EPAT 1"
+_OFFSET_DIGITS = 20
+
+# Compact and ASCII-only: one character is one byte, so offsets can be counted on the str side
+_line_encoder = json.JSONEncoder(separators=(",", ":"))
+
+
+def window_line(name: str, records: List[Dict[str, Any]]) -> str:
+    # One window of an indexed file, without the newline
+    return _line_encoder.encode({"window": name, "records": records})
+
+
+def iter_indexed(windows: Iterable[Tuple[str, List[Dict[str, Any]]]]) -> Iterator[str]:
+    # Text of an indexed EPAT file, line by line as the windows arrive; pairs up with write_chunks_if_changed,
+    # which applies the same newline translation the offsets account for
+    nl = len(os.linesep)
+    index: Dict[str, List[int]] = {}
+    yield MAGIC + "\n"
+    offset = len(MAGIC) + nl
+    for name, records in windows:
+        line = window_line(name, records)
+        index[name] = [offset, len(line)]
+        yield line + "\n"
+        offset += len(line) + nl
+    yield _line_encoder.encode({"index": index}) + "\n"
+    yield f"{offset:0{_OFFSET_DIGITS}d}\n"
+
+
+def iter_json(windows: Iterable[Tuple[str, List[Dict[str, Any]]]]) -> Iterator[str]:
+    # Same text as json.dumps({window: records}, indent=2), token by token
+    return json.JSONEncoder(indent=2).iterencode(dict(windows))
+
+
+def iter_epat(fmt: str, windows: Iterable[Tuple[str, List[Dict[str, Any]]]]) -> Iterator[str]:
+    if fmt == "indexed":
+        return iter_indexed(windows)
+    return iter_json(windows)
+
+
+class EpatFile:
+    # Either encoding; indexed files are mapped and decoded a window at a time. ValueError for anything else
+    def __init__(self, path: str, fs: FileSystem = DISK) -> None:
+        self.path = path
+        # Indexed file contents, mapped when the file system maps large files
+        self._mm: Optional[Union[bytes, mmap.mmap]] = fs.load(path)
+        self._data: Optional[Dict[str, Any]] = None
+        # window -> (offset, length) of its line
+        self._index: Dict[str, Tuple[int, int]] = {}
+        if self._mm[:len(MAGIC)] != MAGIC.encode("ascii"):
+            try:
+                data = json.loads(self._mm[:])
+            finally:
+                self.close()
+            if not isinstance(data, dict):
+                raise ValueError(f"not an EPAT file: {path}")
+            self._data = data
+            return
+        try:
+            self._index = self._read_index()
+        except (ValueError, KeyError, TypeError):
+            self.close()
+            raise ValueError(f"damaged EPAT index: {path}") from None
+
+    def _read_index(self) -> Dict[str, Tuple[int, int]]:
+        mm = self._mm
+        tail = mm[max(0, len(mm) - _OFFSET_DIGITS - 2):].split()[-1]
+        start = int(tail)
+        end = mm.find(b"\n", start)
+        index = json.loads(mm[start:end])["index"]
+        return {name: (int(pos[0]), int(pos[1])) for name, pos in index.items()}
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._mm = None
+
+    def __enter__(self) -> "EpatFile":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @property
+    def indexed(self) -> bool:
+        return self._data is None
+
+    def windows(self) -> List[str]:
+        return list(self._index if self._data is None else self._data)
+
+    def __contains__(self, window: str) -> bool:
+        return window in (self._index if self._data is None else self._data)
+
+    def records(self, window: str) -> List[Dict[str, Any]]:
+        # KeyError for a window the file doesn't have
+        if self._data is not None:
+            return self._data[window]
+        offset, length = self._index[window]
+        return json.loads(self._mm[offset:offset + length])["records"]
+
+    def get(self, window: str, default: Any = None) -> Any:
+        return self.records(window) if window in self else default
+
+    def line(self, window: str) -> str:
+        # The window's line of an indexed file, copied without decoding its records
+        if self._data is not None:
+            return window_line(window, self._data[window])
+        offset, length = self._index[window]
+        return self._mm[offset:offset + length].decode("ascii")
+
+    def element(self, name: str) -> List[Tuple[str, Dict[str, Any]]]:
+        # (window, record) for every element called name; in an indexed file the bytes are searched first and
+        # only the windows that mention the name are decoded
+        if self._data is not None:
+            return [(w, r) for w, records in self._data.items() for r in records if r.get("name") == name]
+        # Every record is written with "name" first
+        needle = b'{"name":' + _line_encoder.encode(name).encode("ascii") + b","
+        lines = sorted((offset, window) for window, (offset, _length) in self._index.items())
+        starts = [offset for offset, _window in lines]
+        found: List[Tuple[str, Dict[str, Any]]] = []
+        mm = self._mm
+        pos = mm.find(needle)
+        while pos >= 0:
+            i = bisect.bisect_right(starts, pos) - 1
+            if i < 0:
+                break
+            window = lines[i][1]
+            offset, length = self._index[window]
+            if pos < offset + length:
+                found += [(window, r) for r in self.records(window) if r.get("name") == name]
+            # The rest of this line is covered either way
+            pos = mm.find(needle, max(pos + 1, offset + length))
+        return found
+
+
+class EpatWriter:
+    # An EPAT file filled a window at a time as results arrive. Lines are appended to a spool file with their
+    # offsets noted; close() adds the index, in the final window order, and swaps the spool in only if it differs.
+    # The json encoding is produced from the spool at close, the one point that holds every window's records.
+    def __init__(self, path: str, fmt: str = "indexed", fs: FileSystem = DISK) -> None:
+        self.path = path
+        self.fmt = fmt
+        self.fs = fs
+        self._spool = path + ".kite-spool"
+        fs.ensure_dir(os.path.dirname(path) or ".")
+        self._out: Optional[BinaryIO] = fs.open_write(self._spool)
+        # window -> (offset, length) of its latest line
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._offset = 0
+        self._write(MAGIC)
+
+    def _write(self, line: str) -> None:
+        data = (line + os.linesep).encode("ascii")
+        self._out.write(data)
+        self._offset += len(data)
+
+    def add(self, window: str, line: str) -> None:
+        # line: window_line() of the window's records
+        self._index[window] = (self._offset, len(line))
+        self._write(line)
+
+    def __contains__(self, window: str) -> bool:
+        return window in self._index
+
+    def close(self, windows: Iterable[str]) -> bool:
+        # windows: every window of the finished file, in order. Those not added this time keep their line from the
+        # file being replaced (no records when it lacks them); returns whether the file changed
+        windows = list(dict.fromkeys(windows))
+        missing = [w for w in windows if w not in self._index]
+        if missing:
+            try:
+                old: Optional[EpatFile] = EpatFile(self.path, self.fs)
+            except (OSError, ValueError):
+                old = None
+            try:
+                for w in missing:
+                    self.add(w, old.line(w) if old is not None and w in old else window_line(w, []))
+            finally:
+                if old is not None:
+                    old.close()
+        start = self._offset
+        self._write(_line_encoder.encode({"index": {w: list(self._index[w]) for w in windows}}))
+        self._write(f"{start:0{_OFFSET_DIGITS}d}")
+        self._out.close()
+        self._out = None
+        try:
+            if self.fmt == "json":
+                with EpatFile(self._spool, self.fs) as spool:
+                    data = {w: spool.records(w) for w in windows}
+                return self.fs.write_text_if_changed(self.path, json.dumps(data, indent=2))
+            if self.fs.exists(self.path) and self.fs.getsize(self.path) == self.fs.getsize(self._spool) and self.fs.file_digest(self.path) == self.fs.file_digest(self._spool):
+                return False
+            self.fs.replace(self._spool, self.path)
+            return True
+        finally:
+            if self.fs.exists(self._spool):
+                self.fs.remove(self._spool)
+
+    def discard(self) -> None:
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+        try:
+            self.fs.remove(self._spool)
+        except OSError:
+            pass
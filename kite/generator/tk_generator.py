@@ -1,16 +1,190 @@
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Iterable, Iterator, Mapping
 import os
 import json
+import ast
+import hashlib
+from functools import lru_cache
 from datetime import datetime
+from ..epat import EpatWriter, window_line
 from ..model import UiNode
 from ..mapping.winforms_map import WINFORMS_TO_TK, PROP_MAP
 from ..mapping.wpf_map import WPF_TO_TK
-from ..utils.fs import write_text
+from ..utils.fs import DISK, WRITE_BUFFER, FileSystem
 from ..utils.naming import safe_name
 from ..utils.colors import color_to_hex
+from ..utils.log import log
+
+
+def _joined(lines: Iterable[str]) -> Iterator[str]:
+    # "\n".join(lines), lazily
+    it = iter(lines)
+    for line in it:
+        yield line
+        break
+    for line in it:
+        yield "\n"
+        yield line
+
+
+def _batched(parts: Iterable[str], size: int = WRITE_BUFFER) -> Iterator[str]:
+    # Coalesce small pieces (lines, json tokens) into write-sized chunks
+    buf: List[str] = []
+    n = 0
+    for part in parts:
+        buf.append(part)
+        n += len(part)
+        if n >= size:
+            yield "".join(buf)
+            buf = []
+            n = 0
+    if buf:
+        yield "".join(buf)
+
+
+def _call_args(options: List[Tuple[str, str]]) -> str:
+    return ", ".join(f"{k}={v}" for k, v in options)
+
+
+def _literal_value(literal: str) -> Any:
+    # The value a generated option literal evaluates to; only escapes and tuples need the full evaluator
+    if literal[0] == "'" and "\\" not in literal:
+        return literal[1:-1]
+    if literal in ("True", "False"):
+        return literal == "True"
+    if literal.lstrip("-").isdigit():
+        return int(literal)
+    return ast.literal_eval(literal)
+
+
+class WidgetSpec:
+    # One control as it will be emitted: factory, options and geometry as Python literals
+    __slots__ = ("var", "factory", "options", "manager", "geometry", "cls", "container", "items", "image")
+
+    def __init__(self, var: str, factory: str, options: List[Tuple[str, str]], manager: str, geometry: List[Tuple[str, str]], cls: str, container: bool, items: Tuple[Any, ...] | None = None, image: str | None = None) -> None:
+        self.var = var
+        self.factory = factory
+        self.options = options
+        # pack / place / tab (Notebook page) / lazytab (page built when first selected) / menu (window menu bar)
+        self.manager = manager
+        self.geometry = geometry
+        self.cls = cls
+        # Whether the control's children are emitted under it
+        self.container = container
+        # Listbox entries / Combobox values, filled with one call
+        self.items = items
+        # app/assets file shown as the widget's image, through the runtime's shared PhotoImage cache
+        self.image = image
+
+
+class WindowExtras:
+    # Per-window output besides the module itself: item collections for its data file, ttk styles for theme.py
+    __slots__ = ("items", "styles")
+
+    def __init__(self) -> None:
+        # var -> items, written to items_path()
+        self.items: Dict[str, Tuple[Any, ...]] = {}
+        # style name -> [ttk class style, options]
+        self.styles: Dict[str, List[Any]] = {}
+
+
+EMIT_MODES = ("code", "table")
+
+# ttk widget class -> (class style the named styles derive from, style option for the background color).
+# Entry-like widgets color their field and take font as a widget option rather than a style one.
+TTK_STYLES: Dict[str, Tuple[str, str]] = {
+    "Button": ("TButton", "background"),
+    "Label": ("TLabel", "background"),
+    "Checkbutton": ("TCheckbutton", "background"),
+    "Radiobutton": ("TRadiobutton", "background"),
+    "Labelframe": ("TLabelframe", "background"),
+    "Frame": ("TFrame", "background"),
+    "Notebook": ("TNotebook", "background"),
+    "Treeview": ("Treeview", "fieldbackground"),
+    "Entry": ("TEntry", "fieldbackground"),
+    "Combobox": ("TCombobox", "fieldbackground"),
+}
+_WIDGET_FONT = frozenset({"Entry", "Combobox"})
+# Containers show no text of their own: a Font there only sets what children inherit in WinForms
+_NO_FONT = frozenset({"Frame", "Notebook", "Canvas", "Tk", "Toplevel", "Placeholder"})
+_FONT_PROPS = ("Font", "FontFamily", "FontSize", "FontWeight", "FontStyle")
+_BOLD_WEIGHTS = frozenset({"SemiBold", "DemiBold", "Bold", "ExtraBold", "UltraBold", "Black", "Heavy", "ExtraBlack", "UltraBlack"})
+
+
+def _font_value(props: Mapping[str, Any]) -> Tuple[Any, ...] | None:
+    # Tk font description (family, size, styles...) from a WinForms Font or WPF FontFamily/FontSize/FontWeight/
+    # FontStyle; size 0 is Tk's default size, negative sizes are pixels
+    family, size, styles = "", 0.0, []
+    font = props.get("Font")
+    if isinstance(font, dict):
+        family, size = font.get("family") or "", font.get("size") or 0.0
+        styles = ["overstrike" if st == "strikeout" else st for st in font.get("style", ())]
+    elif isinstance(font, str):
+        family = font
+    if isinstance(props.get("FontFamily"), str):
+        family = props["FontFamily"].split(",")[0].strip()
+    if isinstance(props.get("FontSize"), str):
+        try:
+            # WPF sizes are device-independent pixels
+            size = -float(props["FontSize"])
+        except ValueError:
+            pass
+    if props.get("FontWeight") in _BOLD_WEIGHTS:
+        styles.append("bold")
+    if props.get("FontStyle") in ("Italic", "Oblique"):
+        styles.append("italic")
+    if not (family or size or styles):
+        return None
+    return (family, round(size), *styles)
+
+
+@lru_cache(maxsize=4096)
+def _style(base: str, bg_option: str, bg: str | None, fg: str | None, font: Tuple[Any, ...] | None) -> Tuple[str, Dict[str, Any]]:
+    # (style name, options): names hash the options, so every window (in any worker process) derives the same
+    # name for the same look and theme.py defines each one once
+    options: Dict[str, Any] = {}
+    if bg:
+        options[bg_option] = bg
+    if fg:
+        options["foreground"] = fg
+    if font:
+        options["font"] = list(font)
+    digest = hashlib.sha1(json.dumps([base, options], sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    return f"K{digest}.{base}", options
+
+# Widget classes with an image option
+IMAGE_WIDGETS = frozenset({"Label", "Button", "Checkbutton", "Radiobutton", "HyperlinkLabel"})
+
+# Item collections at least this long go to the window's data file (items_path) instead of its source
+SIDECAR_MIN_ITEMS = 500
+
+
+def items_path(app_pkg_dir: str, fname: str) -> str:
+    # app/data/<window module>.json, read by widgets.load_items()
+    return os.path.join(app_pkg_dir, "data", os.path.splitext(fname)[0] + ".json")
 
 
 class TkGenerator:
+    def __init__(self, emit: str = "code", lazy_tabs: bool = False, shared_runtime: bool = False, epat: str = "json", fs: FileSystem | None = None) -> None:
+        # "code": statements per control; "table": a literal widget table built at runtime by custom.build()
+        self.emit = emit
+        # Build Notebook pages' contents the first time each page is selected
+        self.lazy_tabs = lazy_tabs
+        # Windows import the installed kite.runtime instead of a copy in app/custom.py
+        self.shared_runtime = shared_runtime
+        # EPAT encoding (kite.epat.EPAT_FORMATS); tooling output only, so not part of options()
+        self.epat = epat
+        # Where windows and app files are written
+        self.fs = fs or DISK
+        # Output dir -> its (serial.epat, pie.epat) writers, open from the first window added until generate_app
+        self._epat: Dict[str, Tuple[EpatWriter, EpatWriter]] = {}
+
+    def options(self) -> Dict[str, Any]:
+        # Everything that changes the generated windows for the same tree; recorded in .kite.xom
+        return {"emit": self.emit, "lazy_tabs": self.lazy_tabs, "shared_runtime": self.shared_runtime}
+
+    def _imports(self) -> Tuple[str, ...]:
+        return WINDOW_IMPORTS[:-1] + (SHARED_RUNTIME_IMPORT if self.shared_runtime else WINDOW_IMPORTS[-1],)
+
     def _widget_ctor(self, node: UiNode, for_kind: str) -> Tuple[str, str]:
         if for_kind == "winforms":
             mod, cls = WINFORMS_TO_TK.get(node.type, ("widgets", "Placeholder"))
@@ -18,8 +192,9 @@ class TkGenerator:
             mod, cls = WPF_TO_TK.get(node.type, ("widgets", "Placeholder"))
         return mod, cls
 
-    def _to_kwargs(self, node: UiNode, mod: str, cls: str) -> List[str]:
-        skip = {"Dock", "Location", "Size", "Height", "Width", "FlatStyle", "Cursor", "BorderStyle", "FlatAppearance", "Font", "Padding"}
+    def _kwarg_items(self, node: UiNode, mod: str, cls: str) -> List[Tuple[str, str]]:
+        # (tk option, Python literal) pairs, shared by both emission modes
+        skip = {"Dock", "Location", "Size", "Height", "Width", "FlatStyle", "Cursor", "BorderStyle", "FlatAppearance", "Padding", *_FONT_PROPS}
         kwargs = []
         for k, v in node.properties.items():
             if k in skip:
@@ -27,128 +202,283 @@ class TkGenerator:
             if cls == 'Text' and mod == 'tk' and k == 'Text':
                 continue
             tk_k = PROP_MAP.get(k, k.lower())
-            # Drop color/font kwargs for ttk widgets (use default theme)
+            # ttk widgets take colors/fonts through a named style (_widget_spec)
             if mod == 'ttk' and tk_k in ("background", "foreground", "font"):
                 continue
             if isinstance(v, str):
                 if k in ("ForeColor", "BackColor", "Background", "Foreground"):
                     v = color_to_hex(v)
-                    kwargs.append(f"{tk_k}='{v}'")
+                    kwargs.append((tk_k, f"'{v}'"))
                 else:
                     esc = v.replace("'", "\\'")
-                    kwargs.append(f"{tk_k}='{esc}'")
+                    kwargs.append((tk_k, f"'{esc}'"))
             elif isinstance(v, bool):
-                kwargs.append(f"{tk_k}={'normal' if v else 'disabled'}" if tk_k == 'state' else f"{tk_k}={v}")
+                kwargs.append((tk_k, f"'{'normal' if v else 'disabled'}'" if tk_k == 'state' else f"{v}"))
             elif isinstance(v, int):
-                kwargs.append(f"{tk_k}={v}")
+                kwargs.append((tk_k, f"{v}"))
         return kwargs
 
-    def _place(self, node: UiNode) -> str:
+    def _to_kwargs(self, node: UiNode, mod: str, cls: str) -> List[str]:
+        return [f"{k}={v}" for k, v in self._kwarg_items(node, mod, cls)]
+
+    def _geometry(self, node: UiNode) -> Tuple[str, List[Tuple[str, str]]]:
+        # (geometry manager, [(option, Python literal)])
         # Prepare padding for pack
         pad = node.properties.get("Padding")
         pad_args = []
         if isinstance(pad, int):
-            pad_args.append(f"padx={pad}")
-            pad_args.append(f"pady={pad}")
+            pad_args.append(("padx", f"{pad}"))
+            pad_args.append(("pady", f"{pad}"))
         elif isinstance(pad, tuple) and len(pad) == 4:
             l, t, r, b = pad
-            pad_args.append(f"padx=({l}, {r})")
-            pad_args.append(f"pady=({t}, {b})")
-        pad_str = (', ' + ', '.join(pad_args)) if pad_args else ''
+            pad_args.append(("padx", f"({l}, {r})"))
+            pad_args.append(("pady", f"({t}, {b})"))
 
         # Dock beats absolute placement
         dock = node.properties.get("Dock")
         if isinstance(dock, str):
             m = dock.lower()
             if m == 'fill':
-                return f".pack(fill='both', expand=True{pad_str})"
+                return "pack", [("fill", "'both'"), ("expand", "True")] + pad_args
             side = {'top':'top','bottom':'bottom','left':'left','right':'right'}.get(m)
             if side:
                 fill = 'x' if side in ('top','bottom') else 'y'
-                return f".pack(side='{side}', fill='{fill}'{pad_str})"
+                return "pack", [("side", f"'{side}'"), ("fill", f"'{fill}'")] + pad_args
         loc = node.properties.get("Location") or node.properties.get("Margin")
         size = node.properties.get("Size") or node.properties.get("Width")
         parts = []
         if isinstance(loc, dict):
-            parts.append(f"x={loc.get('x',0)}")
-            parts.append(f"y={loc.get('y',0)}")
+            parts.append(("x", f"{loc.get('x',0)}"))
+            parts.append(("y", f"{loc.get('y',0)}"))
         if isinstance(size, dict):
-            parts.append(f"width={size.get('w')}")
-            parts.append(f"height={size.get('h')}")
-        return f".place({', '.join(parts)})" if parts else f".pack(anchor='nw'{pad_str})"
+            parts.append(("width", f"{size.get('w')}"))
+            parts.append(("height", f"{size.get('h')}"))
+        return ("place", parts) if parts else ("pack", [("anchor", "'nw'")] + pad_args)
+
+    def _place(self, node: UiNode) -> str:
+        manager, options = self._geometry(node)
+        return f".{manager}({_call_args(options)})"
 
-    def generate_window(self, app_pkg_dir: str, node: UiNode) -> Tuple[str, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    def generate_window(self, app_pkg_dir: str, node: UiNode) -> Tuple[str, Tuple[str, str], Dict[str, List[Any]]]:
+        # Lines are written out as they are produced. Also returns the window's serial.epat and pie.epat lines (records
+        # only exist for top-level controls), for add_epat, and the ttk styles it uses, for generate_app's theme.py.
         fname = f"window_{safe_name(node.name)}.py"
         path = os.path.join(app_pkg_dir, fname)
-        imports = ["# Generated by Kite", "import tkinter as tk", "from tkinter import ttk", "from . import custom as widgets"]
-        lines: List[str] = []
-        lines.extend(imports)
-        lines.append("")
         positions: List[Dict[str, Any]] = []
         colors: List[Dict[str, Any]] = []
+        extras = WindowExtras()
+        lines = self.table_lines(node, positions, colors, extras) if self.emit == "table" and node.children else self.window_lines(node, positions, colors, extras)
+        self.fs.write_chunks_if_changed(path, _batched(_joined(lines)))
+        data_path = items_path(app_pkg_dir, fname)
+        if extras.items:
+            self.fs.write_chunks_if_changed(data_path, _batched(json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).iterencode(extras.items)))
+        elif self.fs.exists(data_path):
+            self.fs.remove(data_path)
+        return fname, (window_line(node.name, positions), window_line(node.name, colors)), extras.styles
+
+    def _epat_writers(self, out_dir: str) -> Tuple[EpatWriter, EpatWriter]:
+        writers = self._epat.get(out_dir)
+        if writers is None:
+            writers = self._epat[out_dir] = (
+                EpatWriter(os.path.join(out_dir, 'serial.epat'), self.epat, self.fs),
+                EpatWriter(os.path.join(out_dir, 'pie.epat'), self.epat, self.fs),
+            )
+        return writers
+
+    def add_epat(self, out_dir: str, window: str, lines: Tuple[str, str]) -> None:
+        for writer, line in zip(self._epat_writers(out_dir), lines):
+            writer.add(window, line)
+
+    def discard_epat(self, out_dir: str | None = None) -> None:
+        # Drops the writers (and spool files) of out_dir, or of every output dir, without touching the EPAT files
+        for d in [out_dir] if out_dir is not None else list(self._epat):
+            for writer in self._epat.pop(d, ()):
+                writer.discard()
+
+    def theme_lines(self, styles: Dict[str, List[Any]]) -> Iterator[str]:
+        yield "# Generated by Kite"
+        yield "from tkinter import ttk"
+        yield ""
+        yield "# Style name -> (class style it derives from, options)"
+        yield "STYLES = {"
+        for name in sorted(styles):
+            base, options = styles[name]
+            yield f"    {name!r}: ({base!r}, {options!r}),"
+        yield "}"
+        yield ""
+        yield "_configured = None"
+        yield ""
+        yield ""
+        yield "def apply(master):"
+        yield "    # Configure every style once per Tk interpreter; widgets already using a style name pick it up"
+        yield "    global _configured"
+        yield "    if _configured is master.tk:"
+        yield "        return"
+        yield "    style = ttk.Style(master)"
+        yield "    for name, (_base, options) in STYLES.items():"
+        yield "        style.configure(name, **options)"
+        yield "    _configured = master.tk"
+        yield ""
+
+    def _class_header(self, node: UiNode) -> Iterator[str]:
         class_name = safe_name(node.name).title().replace('_', '')
         base = "tk.Tk" if node.type in ("Form", "Window") else "tk.Toplevel"
-        lines.append(f"class {class_name}({base}):")
-        lines.append(f"    def __init__(self, *args, **kwargs):")
-        lines.append(f"        super().__init__(*args, **kwargs)")
+        yield f"class {class_name}({base}):"
+        yield f"    def __init__(self, *args, **kwargs):"
+        yield f"        super().__init__(*args, **kwargs)"
         title = node.properties.get("Text") or node.properties.get("Title") or node.name
         size = node.properties.get("ClientSize")
         if isinstance(size, dict):
-            lines.append(f"        self.geometry('{size.get('w',400)}x{size.get('h',300)}')")
-        lines.append(f"        self.title('{title}')")
-        # Emit children
+            yield f"        self.geometry('{size.get('w',400)}x{size.get('h',300)}')"
+        yield f"        self.title('{title}')"
+
+    def window_lines(self, node: UiNode, positions: List[Dict[str, Any]], colors: List[Dict[str, Any]], extras: WindowExtras) -> Iterator[str]:
+        # "code" mode: statements per control in __init__
+        yield from self._imports()
+        yield ""
+        yield from self._class_header(node)
+        # Emit children at method indentation; a lazy tab's contents go into a nested builder function
+        indent = "    " * 2
+        lazy: List[Tuple[str, str, int]] = []
         emitted = 0
-        for child in node.children:
-            self._emit_widget(lines, parent_var='self', child=child, level=2, for_kind='winforms' if node.type == 'Form' else 'wpf', parent_type=None, positions=positions, colors=colors)
+        for row, _parent_row, parent_var, spec in self._widgets(node, positions, colors, extras):
+            if spec is None:
+                notebook, page, page_row = lazy.pop()
+                indent = indent[:-4]
+                yield f"{indent}widgets.lazy_tab({notebook}, {page}, _tab_{page_row})"
+                continue
+            yield from self._code_lines(parent_var, spec, indent, extras)
             emitted += 1
+            if spec.manager == 'lazytab':
+                yield f"{indent}def _tab_{row}({spec.var}):"
+                lazy.append((parent_var, spec.var, row))
+                indent += "    "
         if emitted == 0:
             # Create richer placeholder UI so window isn't blank
-            lines.append("        _menu = widgets.MenuBar(self)")
-            lines.append("        self.config(menu=_menu.menu)")
-            lines.append("        _toolbar = widgets.ToolBar(self)")
-            lines.append("        _toolbar.pack(side='top', fill='x')")
-            lines.append("        _main = ttk.Frame(self)")
-            lines.append("        _main.pack(fill='both', expand=True)")
-            lines.append("        _left = ttk.Frame(_main, width=180)")
-            lines.append("        _left.pack(side='left', fill='y')")
-            lines.append("        ttk.Label(_left, text='Navigation').pack(anchor='w', padx=6, pady=6)")
-            lines.append("        ttk.Treeview(_left).pack(fill='both', expand=True, padx=6, pady=6)")
-            lines.append("        _content = ttk.Notebook(_main)")
-            lines.append("        _content.pack(side='left', fill='both', expand=True)")
-            lines.append("        _tab = ttk.Frame(_content)")
-            lines.append("        _content.add(_tab, text='Main')")
-            lines.append("        ttk.Label(_tab, text='Kite placeholder: no controls parsed.').pack(anchor='w', padx=8, pady=8)")
-            lines.append("        widgets.DataGrid(_tab, columns=('A','B','C')).pack(fill='both', expand=True, padx=8, pady=8)")
-            lines.append("        _status = widgets.StatusBar(self, text='Ready')")
-            lines.append("        _status.pack(side='bottom', fill='x')")
-        write_text(path, "\n".join(lines))
-        return fname, positions, colors
-
-    def _emit_widget(self, lines: List[str], parent_var: str, child: UiNode, level: int, for_kind: str, parent_type: str | None = None, positions: List[Dict[str, Any]] | None = None, colors: List[Dict[str, Any]] | None = None):
-        # Always emit at method indentation (no extra blocks), ignore 'level' to avoid unexpected indent
-        indent = "    " * 2
+            yield from PLACEHOLDER_LINES
+        yield from self._theme_lines(extras)
+        yield from self._class_footer()
+
+    def table_lines(self, node: UiNode, positions: List[Dict[str, Any]], colors: List[Dict[str, Any]], extras: WindowExtras) -> Iterator[str]:
+        # "table" mode: one row per control, instantiated by widgets.build(). Option names live once per distinct
+        # shape (factory, option names, geometry manager, geometry option names), so rows only carry values.
+        # Rows are JSON in one (implicitly concatenated) string constant: that compiles in milliseconds, where a
+        # tuple display of the same rows takes longer to compile than the statements it replaces.
+        imports = self._imports()
+        yield imports[0]
+        yield "import json"
+        yield from imports[1:]
+        yield ""
+        yield "# [parent row or -1 for the window, SHAPES index, option values, geometry option values(, items or their data file key(, image asset))]"
+        yield "SPEC = json.loads("
+        yield "    '['"
+        shapes: Dict[Tuple[str, Tuple[str, ...], str, Tuple[str, ...]], int] = {}
+        images = False
+        sep = ""
+        for _row, parent_row, _pvar, spec in self._widgets(node, positions, colors, extras):
+            if spec is None:
+                continue
+            shape = (spec.factory, tuple(k for k, _ in spec.options), spec.manager, tuple(k for k, _ in spec.geometry))
+            i = shapes.setdefault(shape, len(shapes))
+            row = [parent_row, i, [_literal_value(v) for _, v in spec.options], [_literal_value(v) for _, v in spec.geometry]]
+            if spec.items is not None:
+                if len(spec.items) >= SIDECAR_MIN_ITEMS:
+                    extras.items[spec.var] = spec.items
+                    row.append(spec.var)
+                else:
+                    row.append(spec.items)
+            if spec.image is not None:
+                if len(row) == 4:
+                    row.append(None)
+                row.append(spec.image)
+                images = True
+            yield f"    {sep + json.dumps(row, ensure_ascii=False, separators=(',', ':'))!r}"
+            sep = ","
+        yield "    ']'"
+        yield ")"
+        yield "# (factory, option names, geometry manager, geometry option names)"
+        yield "SHAPES = ("
+        for shape in shapes:
+            yield f"    {shape!r},"
+        yield ")"
+        yield ""
+        yield ""
+        yield from self._class_header(node)
+        yield f"        widgets.build(self, SHAPES, SPEC{', __file__' if extras.items or images else ''})"
+        yield from self._theme_lines(extras)
+        yield from self._class_footer()
+
+    def _theme_lines(self, extras: WindowExtras) -> Iterator[str]:
+        # Last in __init__: only now is it known whether any widget used a style. Widgets created earlier (and
+        # lazily built tab pages) pick the configured styles up.
+        if extras.styles:
+            yield "        from . import theme"
+            yield "        theme.apply(self)"
+
+    def _class_footer(self) -> Iterator[str]:
+        if self.lazy_tabs:
+            yield ""
+            yield "    def materialize_tabs(self):"
+            yield "        # Build every tab page that has not been shown yet"
+            yield "        widgets.materialize(self)"
+
+    def _widgets(self, node: UiNode, positions: List[Dict[str, Any]], colors: List[Dict[str, Any]], extras: WindowExtras) -> Iterator[Tuple[int, int, str, "WidgetSpec | None"]]:
+        # Every control below the window in emission order as (row, parent row or -1, parent variable, spec): each
+        # top-level child, then its subtree depth-first with an explicit stack (deep trees would hit the recursion
+        # limit). A lazy tab page's subtree is followed by (page row, -1, page variable, None). EPAT data is only
+        # collected for the top-level children, as before.
+        for_kind = 'winforms' if node.type == 'Form' else 'wpf'
+        row = 0
+        for child in node.children:
+            stack = [(child, -1, 'self', None, positions, colors)]
+            while stack:
+                n, parent_row, parent_var, parent_type, pos, col = stack.pop()
+                if n is None:
+                    yield parent_row, -1, parent_var, None
+                    continue
+                spec = self._widget_spec(n, for_kind, parent_type, pos, col, extras)
+                if spec.manager == 'tab' and self.lazy_tabs and n.children:
+                    spec.manager = 'lazytab'
+                    stack.append((None, row, spec.var, None, None, None))
+                yield row, parent_row, parent_var, spec
+                if spec.container and n.children:
+                    stack.extend((g, row, spec.var, spec.cls, None, None) for g in reversed(n.children))
+                row += 1
+
+    def _code_lines(self, parent_var: str, spec: "WidgetSpec", indent: str, extras: WindowExtras) -> Iterator[str]:
+        items = None
+        if spec.items is not None:
+            if len(spec.items) >= SIDECAR_MIN_ITEMS:
+                extras.items[spec.var] = spec.items
+                items = f"widgets.load_items(__file__, {spec.var!r})"
+            else:
+                items = repr(spec.items)
+        options = spec.options
+        if items and spec.cls == 'Combobox':
+            options = options + [("values", items)]
+        if spec.image is not None:
+            options = options + [("image", f"widgets.image({parent_var}, __file__, {spec.image!r})")]
+        options = _call_args(options)
+        yield f"{indent}{spec.var} = {spec.factory}({parent_var}{', ' if options else ''}{options})"
+        if items and spec.cls == 'Listbox':
+            yield f"{indent}{spec.var}.insert('end', *{items})"
+        if spec.manager == 'menu':
+            yield f"{indent}{parent_var}.config(menu={spec.var}.menu)"
+        elif spec.manager in ('tab', 'lazytab'):
+            yield f"{indent}{parent_var}.add({spec.var}, {_call_args(spec.geometry)})"
+        else:
+            yield f"{indent}{spec.var}.{spec.manager}({_call_args(spec.geometry)})"
+
+    def _widget_spec(self, child: UiNode, for_kind: str, parent_type: str | None, positions: List[Dict[str, Any]] | None, colors: List[Dict[str, Any]] | None, extras: WindowExtras) -> "WidgetSpec":
         mod, cls = self._widget_ctor(child, for_kind)
         var = safe_name(child.name)
-        kwargs = ", ".join(self._to_kwargs(child, mod, cls))
-        # Special containers and menus
+        # Special containers and menus; their children are not emitted
         if child.type == 'MenuStrip':
-            lines.append(f"{indent}{var} = widgets.MenuBar({parent_var})")
-            lines.append(f"{indent}{parent_var}.config(menu={var}.menu)")
-            return
+            return WidgetSpec(var, "widgets.MenuBar", [], "menu", [], cls, False)
         if child.type == 'StatusStrip':
-            lines.append(f"{indent}{var} = widgets.StatusBar({parent_var}, text='{child.properties.get('Text','Ready')}')")
-            lines.append(f"{indent}{var}.pack(side='bottom', fill='x')")
-            return
+            return WidgetSpec(var, "widgets.StatusBar", [("text", f"'{child.properties.get('Text','Ready')}'")], "pack", [("side", "'bottom'"), ("fill", "'x'")], cls, False)
         if child.type == 'ToolStrip':
-            lines.append(f"{indent}{var} = widgets.ToolBar({parent_var})")
-            lines.append(f"{indent}{var}.pack(side='top', fill='x')")
-            return
-
-        # Create widget
-        if mod == 'widgets':
-            lines.append(f"{indent}{var} = widgets.{cls}({parent_var}{', ' if kwargs else ''}{kwargs})")
-        else:
-            lines.append(f"{indent}{var} = {mod}.{cls}({parent_var}{', ' if kwargs else ''}{kwargs})")
+            return WidgetSpec(var, "widgets.ToolBar", [], "pack", [("side", "'top'"), ("fill", "'x'")], cls, False)
 
         # Collect EPAT data
         if positions is not None:
@@ -162,55 +492,106 @@ class TkGenerator:
                 'size': size if isinstance(size, dict) else None,
                 'dock': dock if isinstance(dock, str) else None,
             })
-        if colors is not None:
-            bg = child.properties.get('BackColor') or child.properties.get('Background')
-            fg = child.properties.get('ForeColor') or child.properties.get('Foreground')
-            bg_hex = color_to_hex(bg) if isinstance(bg, str) else None
-            fg_hex = color_to_hex(fg) if isinstance(fg, str) else None
-            if bg_hex or fg_hex:
-                colors.append({'name': var, 'type': child.type, 'background': bg_hex, 'foreground': fg_hex})
+        bg = child.properties.get('BackColor') or child.properties.get('Background')
+        fg = child.properties.get('ForeColor') or child.properties.get('Foreground')
+        bg_hex = color_to_hex(bg) if isinstance(bg, str) else None
+        fg_hex = color_to_hex(fg) if isinstance(fg, str) else None
+        if colors is not None and (bg_hex or fg_hex):
+            colors.append({'name': var, 'type': child.type, 'background': bg_hex, 'foreground': fg_hex})
 
         # Notebook page handling
         if parent_type == 'Notebook':
             tab_text = child.properties.get('Text') or child.name
-            lines.append(f"{indent}{parent_var}.add({var}, text='{tab_text}')")
+            manager, geometry = "tab", [("text", f"'{tab_text}'")]
         else:
-            lines.append(f"{indent}{var}{self._place(child)}")
-
-        for g in child.children:
-            self._emit_widget(lines, var, g, level, for_kind, parent_type=cls)
+            manager, geometry = self._geometry(child)
+        items = child.properties.get("Items")
+        if not (items and isinstance(items, tuple) and cls in ('Listbox', 'Combobox')):
+            items = None
+        # Image wins over BackgroundImage: Tk widgets show one image
+        image = next((v["asset"] for v in (child.properties.get("Image"), child.properties.get("BackgroundImage")) if isinstance(v, dict) and v.get("asset")), None)
+        if image is not None and cls not in IMAGE_WIDGETS:
+            image = None
+        options = self._kwarg_items(child, mod, cls)
+        font = _font_value(child.properties) if cls not in _NO_FONT else None
+        if font is not None and (mod == 'tk' or cls in _WIDGET_FONT):
+            options.append(("font", repr(font)))
+            font = None
+        # Buttons drawn with visual styles ignore BackColor in WinForms too
+        style_bg = None if child.properties.get("UseVisualStyleBackColor") is True else bg_hex
+        if mod == 'ttk' and cls in TTK_STYLES and (style_bg or fg_hex or font):
+            base, bg_option = TTK_STYLES[cls]
+            name, style_options = _style(base, bg_option, style_bg, fg_hex, font)
+            extras.styles[name] = [base, style_options]
+            options.append(("style", repr(name)))
+        if image is not None and any(k == "text" for k, _ in options):
+            # Tk shows only the image unless told where the text goes
+            options.append(("compound", "'left'"))
+        return WidgetSpec(var, f"{mod}.{cls}", options, manager, geometry, cls, True, items, image)
 
-    def generate_app(self, out_dir: str, generated: List[Tuple[str, str, List[Dict[str, Any]], List[Dict[str, Any]]]], main_window: str | None, kind: str | None = None) -> None:
-        app_init = os.path.join(out_dir, 'app', '__init__.py')
-        write_text(app_init, ("# Generated by Kite\nfrom . import custom\n"))
+    def generate_app(self, out_dir: str, generated: List[Tuple[str, str]], main_window: str | None, kind: str | None = None, manifest: Dict[str, Any] | None = None, styles: Dict[str, List[Any]] | None = None) -> None:
+        # generated: (window name, window file) in order. Window registry: main.py imports only the start window,
+        # the rest load on first use
+        windows: Dict[str, Tuple[str, str]] = {}
+        for name, fname in generated:
+            windows[name] = (os.path.splitext(fname)[0], safe_name(name).title().replace('_', ''))
+        init = ["# Generated by Kite", "import importlib"]
+        if not self.shared_runtime:
+            init.append("from . import custom")
+        init += ["", "# Window name -> (module, class)", "WINDOWS = {"]
+        init += [f"    {name!r}: {entry!r}," for name, entry in windows.items()]
+        init += [
+            "}", "", "",
+            "def window_class(name):",
+            "    # Imports the window's module on first use",
+            "    module, cls = WINDOWS[name]",
+            "    return getattr(importlib.import_module('.' + module, __name__), cls)",
+            "",
+        ]
+        self.fs.write_text_if_changed(os.path.join(out_dir, 'app', '__init__.py'), "\n".join(init))
         # Custom widgets module
         custom_path = os.path.join(out_dir, 'app', 'custom.py')
-        write_text(custom_path, "# Generated by Kite\n" + CUSTOM_CONTENT)
+        if self.shared_runtime:
+            # Drop the copy an earlier run may have left behind
+            if self.fs.exists(custom_path):
+                self.fs.remove(custom_path)
+        else:
+            self.fs.write_text_if_changed(custom_path, "# Generated by Kite\n" + CUSTOM_CONTENT)
+        # Every window's named ttk styles, defined once
+        theme_path = os.path.join(out_dir, 'app', 'theme.py')
+        if styles:
+            self.fs.write_text_if_changed(theme_path, "\n".join(self.theme_lines(styles)))
+        elif self.fs.exists(theme_path):
+            self.fs.remove(theme_path)
         # Main runner
         main_path = os.path.join(out_dir, 'main.py')
-        imports = ["# Generated by Kite"]
-        for name, fname, _pos, _col in generated:
-            mod = os.path.splitext(fname)[0]
-            class_name = safe_name(name).title().replace('_', '')
-            imports.append(f"from app.{mod} import {class_name}")
         start = main_window or (generated[0][0] if generated else 'MainWindow')
         start_cls = safe_name(start).title().replace('_', '')
+        entry = windows.get(start) or next((e for e in windows.values() if e[1] == start_cls), None)
+        if entry is None and windows:
+            log.warn("Main window not found, starting with the first window", main_window=start)
+            entry = next(iter(windows.values()))
+        imports = ["# Generated by Kite"]
+        if entry is not None:
+            imports.append(f"from app.{entry[0]} import {entry[1]}")
+            start_cls = entry[1]
         code = imports + ["", f"def main():", f"    win = {start_cls}()", "    win.mainloop()", "", "if __name__ == '__main__':", "    main()"]
-        write_text(main_path, "\n".join(code))
+        self.fs.write_text_if_changed(main_path, "\n".join(code))
 
         # Write README
         readme = os.path.join(out_dir, 'README.md')
+        runtime = "kite.runtime (installed with Kite)" if self.shared_runtime else "app/custom.py"
         readme_text = (
             "# Kite Output\n\n"
             "This directory was generated by Kite, a tool that converts .NET WinForms/WPF UIs into Python Tkinter code.\n\n"
             "- main.py: entry point to run the app\n\n"
             "- app/window_*.py: generated windows\n\n"
-            "- app/custom.py: custom widgets that emulate .NET controls\n\n"
+            f"- {runtime}: custom widgets that emulate .NET controls\n\n"
             "- .kite.xom: Kite configuration (not used at runtime)\n\n"
             "- serial.epat: element positions (for tooling)\n\n"
             "- pie.epat: color mapping per element (for tooling)\n\n"
         )
-        write_text(readme, readme_text)
+        self.fs.write_text_if_changed(readme, readme_text)
 
         # Write config .kite.xom
         cfg = {
@@ -219,111 +600,60 @@ class TkGenerator:
             'windows': [name for name, *_ in generated],
             'notes': 'This file is for Kite tooling only and does not affect app runtime.'
         }
-        write_text(os.path.join(out_dir, '.kite.xom'), json.dumps(cfg, indent=2))
-
-        # Write EPAT files
-        serial: Dict[str, Any] = {}
-        pie: Dict[str, Any] = {}
-        for name, _fname, pos_list, col_list in generated:
-            serial[name] = pos_list
-            pie[name] = col_list
-        write_text(os.path.join(out_dir, 'serial.epat'), json.dumps(serial, indent=2))
-        write_text(os.path.join(out_dir, 'pie.epat'), json.dumps(pie, indent=2))
-
-
-CUSTOM_CONTENT = """
-import tkinter as tk
-from tkinter import ttk
-
-class HyperlinkLabel(ttk.Label):
-    def __init__(self, master=None, text='', command=None, **kwargs):
-        super().__init__(master, text=text, foreground='#0645AD', cursor='hand2', **kwargs)
-        self._command = command
-        self.bind('<Button-1>', lambda e: self._command() if self._command else None)
-        self.bind('<Enter>', lambda e: self.configure(foreground='#0B0080'))
-        self.bind('<Leave>', lambda e: self.configure(foreground='#0645AD'))
-
-class PlaceholderEntry(ttk.Entry):
-    def __init__(self, master=None, placeholder='', **kwargs):
-        super().__init__(master, **kwargs)
-        self.placeholder = placeholder
-        self._has_placeholder = False
-        self._show_placeholder()
-        self.bind('<FocusIn>', self._clear_placeholder)
-        self.bind('<FocusOut>', self._show_placeholder)
-
-    def _show_placeholder(self, *args):
-        if not self.get():
-            self.insert(0, self.placeholder)
-            self.configure(foreground='gray')
-            self._has_placeholder = True
-
-    def _clear_placeholder(self, *args):
-        if self._has_placeholder:
-            self.delete(0, 'end')
-            self.configure(foreground='black')
-            self._has_placeholder = False
-
-class DataGrid(ttk.Treeview):
-    def __init__(self, master=None, columns=None, **kwargs):
-        super().__init__(master, columns=columns or (), show='headings', **kwargs)
-        for col in (columns or ("col1", "col2")):
-            self.heading(col, text=col)
-            self.column(col, width=120, anchor='w')
-
-class NumericUpDown(tk.Spinbox):
-    def __init__(self, master=None, from_=0, to=100, increment=1, **kwargs):
-        super().__init__(master, from_=from_, to=to, increment=increment, **kwargs)
-
-class DatePicker(ttk.Entry):
-    def __init__(self, master=None, **kwargs):
-        super().__init__(master, **kwargs)
-        # Simple placeholder date picker; user can type date
-
-class Placeholder(ttk.Labelframe):
-    def __init__(self, master=None, title='Placeholder', **kwargs):
-        super().__init__(master, text=title, **kwargs)
-        ttk.Label(self, text='Auto-generated placeholder').pack(anchor='w', padx=6, pady=4)
-
-class MenuBar:
-    def __init__(self, master, spec=None):
-        self.menu = tk.Menu(master)
-        # Basic File->Exit placeholder if no spec
-        filem = tk.Menu(self.menu, tearoff=0)
-        filem.add_command(label='Exit', command=master.destroy)
-        self.menu.add_cascade(label='File', menu=filem)
-
-class StatusBar(ttk.Frame):
-    def __init__(self, master=None, text='', **kwargs):
-        super().__init__(master, **kwargs)
-        self._var = tk.StringVar(value=text)
-        lbl = ttk.Label(self, textvariable=self._var, anchor='w')
-        lbl.pack(fill='x')
-
-class ToolBar(ttk.Frame):
-    def __init__(self, master=None, **kwargs):
-        super().__init__(master, **kwargs)
-        # Placeholder toolbar with a button
-        ttk.Button(self, text='Action').pack(side='left')
-
-class CircleButton(tk.Canvas):
-    def __init__(self, master=None, color='#FF5F56', size=12, command=None, **kwargs):
-        super().__init__(master, width=size, height=size, highlightthickness=0, bg=kwargs.get('bg', self.master.cget('bg')))
-        self._command = command
-        r = size // 2
-        self._oval = self.create_oval(1, 1, size-1, size-1, fill=color, outline=color)
-        self.bind('<Button-1>', lambda e: self._command() if self._command else None)
-
-class RoundedContextMenu:
-    def __init__(self, master=None):
-        self._menu = tk.Menu(master, tearoff=0)
-    def AddItem(self, label, command=None):
-        self._menu.add_command(label=label, command=command)
-    def AddSeparator(self):
-        self._menu.add_separator()
-    def Show(self, widget, x, y=None):
-        # widget: tk widget; x,y in widget coords; if only x is tuple, treat as event
-        if isinstance(x, tuple) and y is None:
-            x, y = x
-        self._menu.tk_popup(widget.winfo_rootx()+x, widget.winfo_rooty()+y)
-"""
+        if manifest:
+            cfg.update(manifest)
+        xom_path = os.path.join(out_dir, '.kite.xom')
+        try:
+            with self.fs.open_read(xom_path) as f:
+                prev_cfg = json.load(f)
+        except (OSError, ValueError):
+            prev_cfg = None
+        # Keep the old timestamp when nothing else changed so the file is left alone
+        if isinstance(prev_cfg, dict) and 'generated_at' in prev_cfg:
+            if {k: v for k, v in prev_cfg.items() if k != 'generated_at'} == {k: v for k, v in cfg.items() if k != 'generated_at'}:
+                cfg['generated_at'] = prev_cfg['generated_at']
+        self.fs.write_text_if_changed(xom_path, json.dumps(cfg, indent=2))
+
+        # Finish the EPAT files: windows added as they were generated, the rest carried over from the previous files
+        names = [name for name, _fname in generated]
+        try:
+            for writer in self._epat_writers(out_dir):
+                writer.close(names)
+        finally:
+            self.discard_epat(out_dir)
+
+
+WINDOW_IMPORTS = ("# Generated by Kite", "import tkinter as tk", "from tkinter import ttk", "from . import custom as widgets")
+SHARED_RUNTIME_IMPORT = "from kite import runtime as widgets"
+
+PLACEHOLDER_LINES = (
+    "        _menu = widgets.MenuBar(self)",
+    "        self.config(menu=_menu.menu)",
+    "        _toolbar = widgets.ToolBar(self)",
+    "        _toolbar.pack(side='top', fill='x')",
+    "        _main = ttk.Frame(self)",
+    "        _main.pack(fill='both', expand=True)",
+    "        _left = ttk.Frame(_main, width=180)",
+    "        _left.pack(side='left', fill='y')",
+    "        ttk.Label(_left, text='Navigation').pack(anchor='w', padx=6, pady=6)",
+    "        ttk.Treeview(_left).pack(fill='both', expand=True, padx=6, pady=6)",
+    "        _content = ttk.Notebook(_main)",
+    "        _content.pack(side='left', fill='both', expand=True)",
+    "        _tab = ttk.Frame(_content)",
+    "        _content.add(_tab, text='Main')",
+    "        ttk.Label(_tab, text='Kite placeholder: no controls parsed.').pack(anchor='w', padx=8, pady=8)",
+    "        widgets.DataGrid(_tab, columns=('A','B','C')).pack(fill='both', expand=True, padx=8, pady=8)",
+    "        _status = widgets.StatusBar(self, text='Ready')",
+    "        _status.pack(side='bottom', fill='x')",
+)
+
+
+def _runtime_source() -> str:
+    with open(RUNTIME_PATH, encoding="utf-8") as f:
+        return f.read()
+
+
+# kite/runtime.py is the widget runtime; outputs get a copy unless they import the installed one
+RUNTIME_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "runtime.py")
+CUSTOM_CONTENT = _runtime_source()
+
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Set
+
+from . import __version__
+from .epat import EpatFile
+from .utils.fs import DISK, FileSystem
+from .mapping.winforms_map import WINFORMS_TO_TK, PROP_MAP
+from .mapping.wpf_map import WPF_TO_TK
+
+XOM_NAME = ".kite.xom"
+
+
+def mapping_hash() -> str:
+    tables = {"winforms": WINFORMS_TO_TK, "props": PROP_MAP, "wpf": WPF_TO_TK}
+    return hashlib.sha256(json.dumps(tables, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _load_json(path: str, fs: FileSystem = DISK) -> Any:
+    try:
+        with fs.open_read(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _valid_epat(path: str, fs: FileSystem = DISK) -> bool:
+    # Reused windows' records are copied from the file when the new one is finished, so it has to be readable
+    try:
+        EpatFile(path, fs).close()
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+class Manifest:
+    # Inputs and outputs of the previous conversion into an output directory, read from .kite.xom
+    def __init__(self, cfg: Dict[str, Any], reusable: bool) -> None:
+        self.cfg = cfg
+        self.reusable = reusable
+        self.forms: Dict[str, Dict[str, Any]] = {e["source"]: e for e in cfg.get("forms", []) if isinstance(e, dict) and "source" in e}
+
+    @classmethod
+    def load(cls, output_dir: str, kind: str, generator: Optional[Dict[str, Any]] = None, fs: FileSystem = DISK) -> Optional["Manifest"]:
+        cfg = _load_json(os.path.join(output_dir, XOM_NAME), fs)
+        if not isinstance(cfg, dict):
+            return None
+        reusable = (
+            cfg.get("kite_version") == __version__
+            and cfg.get("mapping_hash") == mapping_hash()
+            and cfg.get("project_kind") == kind
+            and cfg.get("generator") == (generator or {})
+            and _valid_epat(os.path.join(output_dir, "serial.epat"), fs)
+            and _valid_epat(os.path.join(output_dir, "pie.epat"), fs)
+        )
+        return cls(cfg, reusable)
+
+    def lookup(self, source: str, parse_kind: str, digest: str) -> Optional[Dict[str, Any]]:
+        if not self.reusable:
+            return None
+        entry = self.forms.get(source)
+        if entry and entry.get("parse") == parse_kind and entry.get("hash") == digest:
+            return entry
+        return None
+
+    def fnames(self) -> Set[str]:
+        return {e["fname"] for e in self.forms.values() if e.get("fname")}
+
+
+def manifest_entry(source: str, parse_kind: str, digest: str, name: str, fname: str, children: int, controls: int, assets: Optional[List[str]] = None, styles: Optional[Dict[str, List[Any]]] = None) -> Dict[str, Any]:
+    entry = {"source": source, "parse": parse_kind, "hash": digest, "name": name, "fname": fname, "children": children, "controls": controls}
+    if assets:
+        entry["assets"] = assets
+    if styles:
+        # Reused windows still need their styles in app/theme.py
+        entry["styles"] = styles
+    return entry
+
+
+def manifest_fields(forms: List[Dict[str, Any]], generator: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    # generator: TkGenerator.options(), which must match for windows to be reused
+    return {"kite_version": __version__, "mapping_hash": mapping_hash(), "generator": generator or {}, "forms": forms}
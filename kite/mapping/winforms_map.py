@@ -8,6 +8,7 @@ WINFORMS_TO_TK: Dict[str, Tuple[str, str]] = {
     "MaskedTextBox": ("ttk", "Entry"),
     "RichTextBox": ("tk", "Text"),
     "ListBox": ("tk", "Listbox"),
+    "CheckedListBox": ("tk", "Listbox"),
     "ListView": ("ttk", "Treeview"),
     "TreeView": ("ttk", "Treeview"),
     "ComboBox": ("ttk", "Combobox"),
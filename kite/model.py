@@ -1,10 +1,58 @@
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+import sys
+from types import MappingProxyType
+from typing import Any, Iterator, Mapping, Optional, Sequence, Tuple
+
+# Shared by every node without properties/children; read-only so a stray write can't leak into other nodes
+EMPTY_PROPERTIES: Mapping[str, Any] = MappingProxyType({})
+EMPTY_CHILDREN: Tuple["UiNode", ...] = ()
+
+_intern = sys.intern
+
 
-@dataclass
 class UiNode:
-    type: str
-    name: str
-    properties: Dict[str, Any] = field(default_factory=dict)
-    children: List["UiNode"] = field(default_factory=list)
-    parent: Optional["UiNode"] = None
+    # Slotted: forms with tens of thousands of controls keep one of these per control.
+    # Type names and property keys are interned; leaves share the empty containers above.
+    __slots__ = ("type", "name", "properties", "children", "parent")
+
+    def __init__(self, type: str, name: str, properties: Optional[Mapping[str, Any]] = None, children: Optional[Sequence["UiNode"]] = None, parent: Optional["UiNode"] = None) -> None:
+        self.type = _intern(type)
+        self.name = name
+        self.properties: Mapping[str, Any] = {_intern(k): v for k, v in properties.items()} if properties else EMPTY_PROPERTIES
+        self.children: Sequence[UiNode] = list(children) if children else EMPTY_CHILDREN
+        self.parent = parent
+
+    def __repr__(self) -> str:
+        return f"UiNode(type={self.type!r}, name={self.name!r}, properties={dict(self.properties)!r}, children={len(self.children)})"
+
+    def set_property(self, key: str, value: Any) -> None:
+        if self.properties is EMPTY_PROPERTIES:
+            self.properties = {}
+        self.properties[_intern(key)] = value
+
+    def add_child(self, child: "UiNode") -> None:
+        if self.children is EMPTY_CHILDREN:
+            self.children = []
+        self.children.append(child)
+        child.parent = self
+
+
+def count_controls(root: UiNode) -> int:
+    # Nodes below the root, without recursion
+    count = 0
+    stack = list(root.children)
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def walk(root: UiNode) -> Iterator[Tuple[UiNode, int]]:
+    # (node, depth) below the root in document order, without recursion
+    stack = [(child, 1) for child in reversed(root.children)]
+    while stack:
+        node, depth = stack.pop()
+        yield node, depth
+        if node.children:
+            stack.extend((child, depth + 1) for child in reversed(node.children))
+
@@ -1 +1 @@
-__all__ = ["winforms", "wpf"]
+__all__ = ["winforms", "wpf", "xaml_resources"]
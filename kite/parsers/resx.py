@@ -0,0 +1,119 @@
+import binascii
+import os
+import xml.parsers.expat
+from typing import AbstractSet, Dict, List, Optional, Tuple
+
+from ..assets import AssetStore, AssetWriter
+from ..utils.log import log
+
+# Embedded bitmaps/icons are the image file's bytes in base64
+_BYTEARRAY_MIME = "application/x-microsoft.net.object.bytearray.base64"
+# <value>relative\path.png;System.Drawing.Bitmap, System.Drawing, ...</value>
+_FILEREF_TYPE = "System.Resources.ResXFileRef"
+_IMAGE_TYPES = ("System.Drawing.Bitmap", "System.Drawing.Icon", "System.Drawing.Image")
+READ_SIZE = 1 << 16
+
+
+class _Base64Decoder:
+    # Decodes base64 text as it arrives; at most three characters wait for the next piece
+    __slots__ = ("out", "rest")
+
+    def __init__(self, out: AssetWriter) -> None:
+        self.out = out
+        self.rest = ""
+
+    def feed(self, text: str) -> None:
+        text = self.rest + "".join(text.split())
+        n = len(text) - len(text) % 4
+        if n:
+            self.out.write(binascii.a2b_base64(text[:n]))
+        self.rest = text[n:]
+
+    def close(self) -> None:
+        if self.rest:
+            self.out.write(binascii.a2b_base64(self.rest + "=" * (-len(self.rest) % 4)))
+            self.rest = ""
+
+
+class _ResxImages:
+    # expat handlers for one pass over a .resx: wanted <data> entries are decoded straight into the asset store
+    def __init__(self, path: str, names: AbstractSet[str], store: AssetStore) -> None:
+        self.path = path
+        self.names = names
+        self.store = store
+        self.found: Dict[str, Optional[str]] = {}
+        # Current wanted <data>: (name, type, mimetype)
+        self.entry: Optional[Tuple[str, str, str]] = None
+        self.decoder: Optional[_Base64Decoder] = None
+        self.ref: Optional[List[str]] = None
+
+    def start(self, tag: str, attrs: Dict[str, str]) -> None:
+        if tag == "data":
+            name = attrs.get("name")
+            if name in self.names:
+                self.entry = (name, attrs.get("type", ""), attrs.get("mimetype", ""))
+        elif tag == "value" and self.entry is not None:
+            _name, typ, mime = self.entry
+            if typ.startswith(_FILEREF_TYPE):
+                self.ref = []
+            elif mime == _BYTEARRAY_MIME and typ.startswith(_IMAGE_TYPES):
+                self.decoder = _Base64Decoder(self.store.writer())
+
+    def text(self, data: str) -> None:
+        if self.decoder is not None:
+            self.decoder.feed(data)
+        elif self.ref is not None:
+            self.ref.append(data)
+
+    def end(self, tag: str) -> None:
+        if tag == "value" and self.decoder is not None:
+            decoder, self.decoder = self.decoder, None
+            try:
+                decoder.close()
+            except binascii.Error:
+                decoder.out.abort()
+                log.warn("Bad base64 in resx entry", path=self.path, name=self.entry[0])
+                return
+            self.found[self.entry[0]] = decoder.out.commit()
+        elif tag == "value" and self.ref is not None:
+            ref, self.ref = "".join(self.ref), None
+            self.found[self.entry[0]] = self._file_ref(ref)
+        elif tag == "data":
+            self.entry = None
+
+    def _file_ref(self, ref: str) -> Optional[str]:
+        rel, _, typ = ref.partition(";")
+        if not typ.strip().startswith(_IMAGE_TYPES):
+            return None
+        target = os.path.normpath(os.path.join(os.path.dirname(self.path), rel.strip().replace("\\", os.sep)))
+        try:
+            return self.store.add_file(target)
+        except OSError as e:
+            log.warn("Image file referenced from resx not readable", path=self.path, file=target, error=e)
+            return None
+
+    def abort(self) -> None:
+        if self.decoder is not None:
+            self.decoder.out.abort()
+            self.decoder = None
+
+
+def extract_images(path: str, names: AbstractSet[str], store: AssetStore) -> Dict[str, Optional[str]]:
+    # {resource name: asset name (None if not an image)} for the wanted entries that exist in the .resx. The file
+    # is fed to expat in READ_SIZE pieces and base64 is decoded as it streams, so no entry is held in memory whole.
+    # It is read from the store's file system: a conversion reads and writes through one.
+    handler = _ResxImages(path, names, store)
+    parser = xml.parsers.expat.ParserCreate()
+    parser.StartElementHandler = handler.start
+    parser.EndElementHandler = handler.end
+    parser.CharacterDataHandler = handler.text
+    try:
+        with store.fs.open_read(path) as f:
+            for block in iter(lambda: f.read(READ_SIZE), b""):
+                parser.Parse(block, False)
+        parser.Parse(b"", True)
+    except xml.parsers.expat.ExpatError as e:
+        log.warn("Malformed resx, images after the error are skipped", path=path, error=e)
+    finally:
+        handler.abort()
+    return handler.found
@@ -1,8 +1,12 @@
 import os
 import re
-from typing import Dict, List, Any
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from ..model import UiNode
-from ..utils.fs import find_files, read_text
+from ..utils.fs import DISK, FileIndex, FileSystem, SourceBytes
+from ..utils.log import log
 from ..utils.naming import safe_name
 
 # Control types we'll consider as real UI elements
@@ -14,15 +18,36 @@ _ACCEPT_TYPES = {
     'CircleButton','RoundedContextMenu'
 }
 
-_inst_pat = re.compile(r"(?:this\.)?(?P<name>\w+)\s*=\s*new\s+(?P<type>[\w\.]+)\(\)\s*;", re.MULTILINE)
-# var btn = new Button(...){ Prop=..., ... };
-_inst_obj_pat = re.compile(r"(?P<name>\w+)\s*=\s*new\s+(?P<type>[\w\.]+)\s*(?:\((?P<args>[^)]*)\))?\s*(\{(?P<init>.*?)\})?\s*;", re.S)
-_prop_pat = re.compile(r"(?:this\.)?(?P<name>\w+)\.(?P<prop>\w+)\s*=\s*(?P<value>.+?);\s*$", re.MULTILINE)
+_inst_pat = re.compile(r"(?<!\w)(?:this\.)?(?P<name>\w+)\s*=\s*new\s+(?P<type>[\w\.]+)\(\)\s*;", re.MULTILINE)
+# var btn = new Button(...){ Prop=..., ... }; -- the head only, the initializer body is found with _brace_map
+_inst_head_pat = re.compile(r"(?<!\w)(?P<name>\w+)\s*=\s*new\s+(?P<type>[\w\.]+)\s*")
+_ws_pat = re.compile(r"\s*")
+_close_paren_pat = re.compile(r"\)")
+_stmt_end_pat = re.compile(r"\s*;")
+# Literals and comments are consumed whole (unterminated ones run to the end) so braces inside them don't count
+_brace_token_pat = re.compile(r"""@"(?:[^"]|"")*"?|"(?:[^"\\\n]|\\.)*"?|'(?:[^'\\\n]|\\.)*'?|//[^\n]*|/\*(?:.*?\*/|.*)|[{}]""", re.S)
+_init_token_pat = re.compile(r"""@"(?:[^"]|"")*"?|"(?:[^"\\\n]|\\.)*"?|'(?:[^'\\\n]|\\.)*'?|[(){}\[\],]""", re.S)
+_prop_pat = re.compile(r"(?<!\w)(?:this\.)?(?P<name>\w+)\.(?P<prop>\w+)\s*=\s*(?P<value>.+?);\s*$", re.MULTILINE)
 _add_form_pat = re.compile(r"this\.Controls\.Add\(\s*(?:this\.)?(?P<child>\w+)\s*\)\s*;", re.MULTILINE)
-_add_parent_pat = re.compile(r"(?:this\.)?(?P<parent>\w+)\.Controls\.Add\(\s*(?:this\.)?(?P<child>\w+)\s*\)\s*;", re.MULTILINE)
+_add_parent_pat = re.compile(r"(?<!\w)(?:this\.)?(?P<parent>\w+)\.Controls\.Add\(\s*(?:this\.)?(?P<child>\w+)\s*\)\s*;", re.MULTILINE)
 _addrange_form_pat = re.compile(r"this\.Controls\.AddRange\(\s*new\s+[\w\.]+\[\]\s*\{(?P<list>[^}]*)\}\s*\)\s*;", re.S)
-_addrange_parent_pat = re.compile(r"(?:this\.)?(?P<parent>\w+)\.Controls\.AddRange\(\s*new\s+[\w\.]+\[\]\s*\{(?P<list>[^}]*)\}\s*\)\s*;", re.S)
+_addrange_parent_pat = re.compile(r"(?<!\w)(?:this\.)?(?P<parent>\w+)\.Controls\.AddRange\(\s*new\s+[\w\.]+\[\]\s*\{(?P<list>[^}]*)\}\s*\)\s*;", re.S)
+# Items.AddRange(new object[] { ... }) / Items.Add(item) on a list or combo box; string items may contain braces
+_ITEM_LIST = r"""(?:[^{}"';]|"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')*"""
+_items_pat = re.compile(r"(?<!\w)(?:this\.)?(?P<name>\w+)\.Items\.(?:AddRange\(\s*new\s*[\w\.]*\s*\[\]\s*\{(?P<list>" + _ITEM_LIST + r")\}\s*\)|Add\((?P<item>" + _ITEM_LIST + r")\))\s*;", re.S)
+# One item of such a list: a (verbatim) string or char literal, or anything up to the next comma
+_item_pat = re.compile(r"""@"(?:[^"]|"")*"|"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|[^,\s][^,]*""")
+_item_number_pat = re.compile(r"-?\d+(?:\.\d+)?[fFdDmM]?")
+_cs_escape_pat = re.compile(r"\\(u[0-9a-fA-F]{4}|.)")
+_CS_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "0": "\0", "a": "\a", "b": "\b", "f": "\f", "v": "\v"}
+# Image properties: ((System.Drawing.Image)(resources.GetObject("pictureBox1.Image"))) reads the form's .resx,
+# global::App.Properties.Resources.logo the project's Properties/Resources.resx
+_IMAGE_PROPS = frozenset({"Image", "BackgroundImage"})
+_form_resource_pat = re.compile(r"resources\.GetObject\(\s*\"(?P<key>[^\"]*)\"\s*\)")
+_project_resource_pat = re.compile(r"(?:global::)?(?:[\w.]*\.)?Properties\.Resources\.(?P<key>\w+)")
 _class_form_pat = re.compile(r"partial\s+class\s+(?P<name>\w+)\s*:\s*Form", re.MULTILINE)
+# Pre-filter for _class_form_pat over undecoded bytes; bytes \w is ASCII-only, so the name is any non-space run
+_class_form_bytes_pat = re.compile(rb"partial\s+class\s+[^\s:]+\s*:\s*Form")
 _form_text_pat = re.compile(r"this\.Text\s*=\s*\"(?P<text>.*?)\";")
 _form_size_pat = re.compile(r"this\.ClientSize\s*=\s*new\s+(?:System\.Drawing\.)?Size\((?P<w>\d+),\s*(?P<h>\d+)\)\s*;")
 _location_pat = re.compile(r"new\s+(?:System\.Drawing\.)?Point\((?P<x>-?\d+),\s*(?P<y>-?\d+)\)")
@@ -30,26 +55,299 @@ _size_pat = re.compile(r"new\s+(?:System\.Drawing\.)?Size\((?P<w>\d+),\s*(?P<h>\
 _padding_pat = re.compile(r"new\s+(?:System\.Windows\.Forms\.)?Padding\((?P<a>\d+)(?:\s*,\s*(?P<b>\d+)\s*,\s*(?P<c>\d+)\s*,\s*(?P<d>\d+))?\)")
 _color_argb_pat = re.compile(r"Color\.FromArgb\((?P<r>\d+)\s*,\s*(?P<g>\d+)\s*,\s*(?P<b>\d+)\)")
 _color_name_pat = re.compile(r"(?:System\.Drawing\.)?Color\.(?P<name>\w+)")
+# new System.Drawing.Font("Segoe UI", 9.75F, System.Drawing.FontStyle.Bold, System.Drawing.GraphicsUnit.Point, ((byte)(0)))
+_font_pat = re.compile(r"new\s+(?:System\.Drawing\.)?Font\(\s*\"(?P<family>[^\"]*)\"\s*,\s*(?P<size>\d+(?:\.\d+)?)[fF]?(?P<rest>[^;]*)\)")
+_font_style_pat = re.compile(r"FontStyle\.(Bold|Italic|Underline|Strikeout)")
 _dockstyle_pat = re.compile(r"DockStyle\.(?P<val>\w+)")
 _string_pat = re.compile(r'\"(.*?)(?<!\\)\"')
 
 
+# One token per match: code run, string/char literal, comment or directive, array initializer,
+# statement terminator, or a single leftover character. Alternatives never overlap, so the scan is linear.
+_token_pat = re.compile(r"""
+    [^;{}"'/@\[\#]+
+  | @"(?:[^"]|"")*"
+  | "(?:[^"\\\n]|\\.)*"
+  | '(?:[^'\\\n]|\\.)*'
+  | //[^\n]*
+  | /\*.*?\*/
+  | \#[^\n]*
+  | \[\]\s*\{(?:[^{}"']|"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')*\}
+  | .
+""", re.S | re.X)
+_stmt_assign_pat = re.compile(r"(?<![\w.])(?P<lhs>\w+(?:\.\w+)*)\s*=(?!=)\s*(?P<rhs>.*)", re.S)
+_stmt_new_pat = re.compile(r"new\s+(?P<type>[\w\.]+)\(\)")
+_stmt_add_pat = re.compile(r"(?P<target>\w+(?:\.\w+)*)\.Controls\.Add\(\s*(?:this\.)?(?P<child>\w+)\s*\)")
+_stmt_addrange_pat = re.compile(r"(?P<target>\w+(?:\.\w+)*)\.Controls\.AddRange\(\s*new\s+[\w\.]+\[\]\s*\{(?P<list>[^}]*)\}\s*\)", re.S)
+_stmt_items_pat = re.compile(r"(?P<target>\w+(?:\.\w+)*)\.Items\.(?:AddRange\(\s*new\s*[\w\.]*\s*\[\]\s*\{(?P<list>.*)\}\s*\)|Add\((?P<item>.*)\))", re.S)
+_stmt_form_size_pat = re.compile(r"new\s+(?:System\.Drawing\.)?Size\((?P<w>\d+),\s*(?P<h>\d+)\)")
+
+
+@dataclass
+class _Statements:
+    insts: List[Tuple[str, str]] = field(default_factory=list)
+    props: List[Tuple[str, str, str]] = field(default_factory=list)
+    adds: List[Tuple[str, str]] = field(default_factory=list)
+    ranges: List[Tuple[str, List[str]]] = field(default_factory=list)
+    # (control, item list source) per Items.AddRange/Items.Add, in order
+    items: List[Tuple[str, str]] = field(default_factory=list)
+    form_text: Optional[str] = None
+    form_size: Optional[Tuple[int, int]] = None
+
+
+def _iter_statements(text: str):
+    parts: List[str] = []
+    for m in _token_pat.finditer(text):
+        tok = m.group()
+        c = tok[0]
+        if len(tok) == 1 and c in ";{}":
+            if parts:
+                yield "".join(parts).strip()
+                parts = []
+        elif c == "#" or (c == "/" and len(tok) > 1 and tok[1] == "/"):
+            continue
+        elif c == "/" and len(tok) > 1:
+            parts.append(" ")
+        else:
+            parts.append(tok)
+    if parts:
+        yield "".join(parts).strip()
+
+
+def _scan_statements(text: str) -> _Statements:
+    # Walk the C# statements once and classify each as instantiation, property assignment, Controls.Add/AddRange
+    # or Items.Add/AddRange
+    st = _Statements()
+    for stmt in _iter_statements(text):
+        if not stmt:
+            continue
+        if ".Controls.Add" in stmt:
+            m = _stmt_add_pat.fullmatch(stmt)
+            if m:
+                st.adds.append((m.group("target").rsplit(".", 1)[-1], m.group("child")))
+                continue
+            m = _stmt_addrange_pat.fullmatch(stmt)
+            if m:
+                names = [t.strip().replace("this.", "").strip() for t in m.group("list").split(",")]
+                st.ranges.append((m.group("target").rsplit(".", 1)[-1], [n for n in names if n]))
+                continue
+        if ".Items.Add" in stmt:
+            m = _stmt_items_pat.fullmatch(stmt)
+            if m:
+                inner = m.group("list")
+                st.items.append((m.group("target").rsplit(".", 1)[-1], m.group("item") if inner is None else inner))
+                continue
+        if "=" not in stmt:
+            continue
+        m = _stmt_assign_pat.search(stmt)
+        if not m:
+            continue
+        chain = m.group("lhs").split(".")
+        rhs = m.group("rhs").strip()
+        nm = _stmt_new_pat.fullmatch(rhs) if rhs.startswith("new") else None
+        if nm:
+            st.insts.append((chain[-1], nm.group("type").split(".")[-1]))
+        if len(chain) < 2:
+            continue
+        name, prop = chain[-2], chain[-1]
+        st.props.append((name, prop, rhs))
+        if len(chain) == 2 and name == "this":
+            if prop == "Text" and st.form_text is None and len(rhs) >= 2 and rhs[0] == '"' and rhs[-1] == '"':
+                st.form_text = rhs[1:-1]
+            elif prop == "ClientSize" and st.form_size is None:
+                sm = _stmt_form_size_pat.fullmatch(rhs)
+                if sm:
+                    st.form_size = (int(sm.group("w")), int(sm.group("h")))
+    return st
+
+
+def _parent_links(st: _Statements):
+    # (parent or None for the form, child)
+    for target, child in st.adds:
+        if target == "this":
+            yield None, child
+    for target, children in st.ranges:
+        if target == "this":
+            for child in children:
+                yield None, child
+    for target, child in st.adds:
+        yield target, child
+    for target, children in st.ranges:
+        for child in children:
+            yield target, child
+
+
+# Designer files repeat the same literals thousands of times. Room for about two distinct literals (mostly names
+# and texts) per control of a few large forms: a smaller LRU is cycled through form by form and evicts the
+# locations, sizes and colors before they come round again
+_VALUE_CACHE_SIZE = 32768
+
+
+@lru_cache(maxsize=_VALUE_CACHE_SIZE)
+def _parse_literal(val: str) -> Any:
+    # Cheap first-token checks before any regex; each regex below only runs when its
+    # literal anchor is present, and the order matches the original sequential checks
+    c = val[:1]
+    if c.isdigit() and val.isdigit():
+        return int(val)
+    low = val.lower()
+    if low == "true" or low == "false":
+        return low == "true"
+    if "Font(" in val:
+        m = _font_pat.search(val)
+        if m:
+            rest = m.group("rest")
+            # Pixel sizes are negative, as Tk writes them
+            size = float(m.group("size")) * (-1 if "GraphicsUnit.Pixel" in rest else 1)
+            return {"family": m.group("family"), "size": size, "style": tuple(s.lower() for s in _font_style_pat.findall(rest))}
+    if "Point(" in val:
+        m = _location_pat.search(val)
+        if m:
+            return {"x": int(m.group("x")), "y": int(m.group("y"))}
+    if "Size(" in val:
+        m = _size_pat.search(val)
+        if m:
+            return {"w": int(m.group("w")), "h": int(m.group("h"))}
+    if "Padding(" in val:
+        m = _padding_pat.search(val)
+        if m:
+            a = int(m.group('a'))
+            if not m.group('b'):
+                return a
+            return (a, int(m.group('b')), int(m.group('c')), int(m.group('d')))
+    if "FromArgb(" in val:
+        m = _color_argb_pat.search(val)
+        if m:
+            r, g, b = int(m.group('r')), int(m.group('g')), int(m.group('b'))
+            return f"#{r:02X}{g:02X}{b:02X}"
+    if "DockStyle." in val:
+        m = _dockstyle_pat.search(val)
+        if m:
+            return m.group('val')
+    if "Color" in val:
+        m = _color_name_pat.fullmatch(val.strip())
+        if m:
+            return m.group('name')
+        if val.endswith(")"):
+            # Simplistic fallback
+            return val.split('.')[-1].rstrip(")")
+    if '"' in val:
+        sm = _string_pat.search(val)
+        if sm:
+            return sm.group(1)
+    if val.isdigit():
+        return int(val)
+    return val
+
+
+def _cs_unescape(m: "re.Match[str]") -> str:
+    esc = m.group(1)
+    if len(esc) == 5:
+        return chr(int(esc[1:], 16))
+    return _CS_ESCAPES.get(esc, esc)
+
+
+def _parse_items(source: str) -> Tuple[Any, ...]:
+    # Item values from an Items.AddRange initializer (or an Items.Add argument): strings unescaped, numbers as
+    # numbers, anything else (enum members, resource lookups) as its source text
+    items: List[Any] = []
+    for m in _item_pat.finditer(source):
+        tok = m.group().rstrip()
+        c = tok[0]
+        if c == '"' or c == "'":
+            body = tok[1:-1]
+            items.append(_cs_escape_pat.sub(_cs_unescape, body) if "\\" in body else body)
+        elif c == "@":
+            items.append(tok[2:-1].replace('""', '"'))
+        elif _item_number_pat.fullmatch(tok):
+            num = tok.rstrip("fFdDmM")
+            items.append(float(num) if "." in num else int(num))
+        else:
+            items.append(tok)
+    return tuple(items)
+
+
+def _attach_items(controls: Dict[str, Dict[str, Any]], collections) -> None:
+    collected: Dict[str, List[Any]] = {}
+    for name, items in collections:
+        collected.setdefault(name, []).extend(items)
+    for name, items in collected.items():
+        if name not in controls:
+            controls[name] = {"type": "Control", "props": {}, "children": []}
+        controls[name]["props"]["Items"] = tuple(items)
+
+
+def _may_define_form(src: SourceBytes) -> bool:
+    if src.ascii_compatible:
+        # Straight over the raw bytes (or the mapping of a large file)
+        return _class_form_bytes_pat.search(src.data) is not None
+    return src.contains("partial") and src.contains("Form")
+
+
+def _brace_map(text: str) -> Dict[int, int]:
+    # Offset of every matched '{' -> offset of its '}', in one pass
+    pairs: Dict[int, int] = {}
+    stack: List[int] = []
+    for m in _brace_token_pat.finditer(text):
+        tok = m.group()
+        if tok == "{":
+            stack.append(m.start())
+        elif tok == "}" and stack:
+            pairs[stack.pop()] = m.start()
+    return pairs
+
+
+def _object_creations(text: str):
+    # (head match, initializer body or None) for each `x = new T(...) { ... };` statement. Parentheses and
+    # braces are resolved from precomputed offsets, so a file with thousands of unterminated initializers
+    # still scans in linear time.
+    closes: Optional[List[int]] = None
+    braces: Optional[Dict[int, int]] = None
+    resume = 0
+    for m in _inst_head_pat.finditer(text):
+        if m.start() < resume:
+            # Inside the previous statement's initializer
+            continue
+        pos = m.end()
+        if text.startswith("(", pos):
+            if closes is None:
+                closes = [c.start() for c in _close_paren_pat.finditer(text)]
+            j = bisect_left(closes, pos)
+            if j == len(closes):
+                continue
+            pos = _ws_pat.match(text, closes[j] + 1).end()
+        init = None
+        if text.startswith("{", pos):
+            if braces is None:
+                braces = _brace_map(text)
+            close = braces.get(pos)
+            if close is None:
+                continue
+            init = text[pos + 1:close]
+            pos = close + 1
+        end = _stmt_end_pat.match(text, pos)
+        if end:
+            resume = end.end()
+            yield m, init
+
+
 def _split_object_init(s: str):
+    # Top-level `Prop = value` pairs; commas nested in calls, initializers or literals don't split
     parts = []
-    buf = ''
     depth = 0
-    for ch in s:
-        if ch == '(':
+    start = 0
+    for m in _init_token_pat.finditer(s):
+        tok = m.group()
+        if tok in "([{":
             depth += 1
-        elif ch == ')':
-            depth = max(0, depth-1)
-        if ch == ',' and depth == 0:
-            parts.append(buf.strip())
-            buf = ''
-        else:
-            buf += ch
-    if buf.strip():
-        parts.append(buf.strip())
+        elif tok in ")]}":
+            depth = max(0, depth - 1)
+        elif tok == "," and depth == 0:
+            parts.append(s[start:m.start()].strip())
+            start = m.end()
+    last = s[start:].strip()
+    if last:
+        parts.append(last)
     kv = []
     for p in parts:
         if '=' in p:
@@ -59,96 +357,78 @@ def _split_object_init(s: str):
 
 
 class WinFormsParser:
-    def parse_project(self, root: str) -> List[UiNode]:
-        files = find_files(root, patterns=["*.Designer.cs"]) or []
+    def __init__(self, fs: Optional[FileSystem] = None) -> None:
+        # Where sources are read from
+        self.fs = fs or DISK
+
+    def parse_project(self, root: str, index: Optional[FileIndex] = None) -> List[UiNode]:
+        if index is None:
+            index = self.fs.scan_tree(root)
+        files = index.find(["*.Designer.cs"])
         nodes: List[UiNode] = []
         for f in files:
             try:
                 node = self.parse_designer(f)
                 if node:
                     nodes.append(node)
-            except Exception:
+            except Exception as e:
+                log.warn("Skipped designer file", path=f, error=f"{type(e).__name__}: {e}")
                 continue
         # If no nodes or nodes lack children, try parsing code-behind .cs
         if not nodes or all(len(n.children) == 0 for n in nodes):
-            code_files = [p for p in (find_files(root, patterns=["*.cs"]) or []) if not p.endswith(".Designer.cs")]
+            code_files = [p for p in index.find(["*.cs"]) if not p.endswith(".Designer.cs")]
             for cf in code_files:
                 try:
                     cnode = self.parse_code(cs_path=cf)
                     if cnode:
                         nodes.append(cnode)
-                except Exception:
+                except Exception as e:
+                    log.warn("Skipped code file", path=cf, error=f"{type(e).__name__}: {e}")
                     continue
         return nodes
 
     def parse_designer(self, path: str) -> UiNode:
-        text = read_text(path)
         # Guess form name from filename
         form_name = os.path.basename(path).replace(".Designer.cs", "")
+        return self.parse_designer_text(self.fs.read_text(path), form_name)
+
+    def parse_designer_text(self, text: str, form_name: str) -> UiNode:
         root = UiNode(type="Form", name=safe_name(form_name), properties={}, children=[])
+        st = _scan_statements(text)
 
         # Collect control types
         controls: Dict[str, Dict[str, Any]] = {}
-        for m in _inst_pat.finditer(text):
-            name = m.group("name")
-            typ = m.group("type").split(".")[-1]
+        for name, typ in st.insts:
             # Skip designer-only containers
             if name == "components" or typ.endswith("Container") or typ.endswith("IContainer"):
                 continue
             controls[name] = {"type": typ, "props": {}, "children": []}
 
         # Properties
-        for m in _prop_pat.finditer(text):
-            name = m.group("name")
-            prop = m.group("prop")
-            val = m.group("value").strip()
+        for name, prop, val in st.props:
             parsed = self._parse_value(prop, val)
             # Treat 'this' and 'base' as the form instance
             if name in ("this", "base"):
                 if prop in ("Text", "ClientSize", "Size", "Width", "Height", "BackColor", "ForeColor"):
-                    root.properties[prop] = parsed
+                    root.set_property(prop, parsed)
                 continue
             if name == form_name:
-                root.properties[prop] = parsed
+                root.set_property(prop, parsed)
             else:
                 if name not in controls:
                     controls[name] = {"type": "Control", "props": {}, "children": []}
                 controls[name]["props"][prop] = parsed
 
-        # Parent-child (form-level adds)
-        for m in _add_form_pat.finditer(text):
-            child = m.group("child")
-            if child not in controls:
-                controls[child] = {"type": "Control", "props": {}, "children": []}
-            controls[child]["parent"] = form_name
-        # AddRange for form
-        for m in _addrange_form_pat.finditer(text):
-            inner = m.group("list")
-            for token in inner.split(','):
-                nm = token.strip()
-                if not nm:
-                    continue
-                nm = nm.replace('this.', '').strip()
-                if nm not in controls:
-                    controls[nm] = {"type": "Control", "props": {}, "children": []}
-                controls[nm]["parent"] = form_name
-        # Parent-child (panel/groupbox etc.)
-        for m in _add_parent_pat.finditer(text):
-            parent = m.group("parent")
-            child = m.group("child")
+        # Item collections, one tuple per control however many statements fill it
+        if st.items:
+            _attach_items(controls, ((name, _parse_items(src)) for name, src in st.items))
+
+        # Parent-child: form-level adds, then every add by its target, in the precedence of the
+        # per-pattern passes this replaced (a later pass wins)
+        for parent, child in _parent_links(st):
             if child not in controls:
                 controls[child] = {"type": "Control", "props": {}, "children": []}
-            controls[child]["parent"] = parent
-        for m in _addrange_parent_pat.finditer(text):
-            parent = m.group("parent")
-            inner = m.group("list")
-            for token in inner.split(','):
-                nm = token.strip().replace('this.', '').strip()
-                if not nm:
-                    continue
-                if nm not in controls:
-                    controls[nm] = {"type": "Control", "props": {}, "children": []}
-                controls[nm]["parent"] = parent
+            controls[child]["parent"] = form_name if parent is None else parent
 
         # Attach to tree
         name_to_node: Dict[str, UiNode] = {}
@@ -161,24 +441,27 @@ class WinFormsParser:
             parent = data.get("parent")
             node = name_to_node[name]
             if parent and parent in name_to_node:
-                node.parent = name_to_node[parent]
-                name_to_node[parent].children.append(node)
+                name_to_node[parent].add_child(node)
             else:
-                node.parent = root
-                root.children.append(node)
+                root.add_child(node)
 
         # Form-level props
-        form_text = _form_text_pat.search(text)
-        if form_text:
-            root.properties["Text"] = form_text.group("text")
-        form_size = _form_size_pat.search(text)
-        if form_size:
-            root.properties["ClientSize"] = {"w": int(form_size.group("w")), "h": int(form_size.group("h"))}
+        if st.form_text is not None:
+            root.set_property("Text", st.form_text)
+        if st.form_size is not None:
+            root.set_property("ClientSize", {"w": st.form_size[0], "h": st.form_size[1]})
 
         return root
 
     def parse_code(self, cs_path: str) -> UiNode | None:
-        text = read_text(cs_path)
+        with self.fs.open_source(cs_path) as src:
+            # Most code-behind candidates are services/models; skip them before decoding
+            if not _may_define_form(src):
+                return None
+            text = src.text()
+        return self.parse_code_text(text)
+
+    def parse_code_text(self, text: str) -> UiNode | None:
         m = _class_form_pat.search(text)
         if not m:
             return None
@@ -186,7 +469,7 @@ class WinFormsParser:
         root = UiNode(type="Form", name=safe_name(form_name), properties={}, children=[])
         controls: Dict[str, Dict[str, Any]] = {}
         # Object initializers and simple news
-        for m in _inst_obj_pat.finditer(text):
+        for m, init in _object_creations(text):
             name = m.group("name")
             typ = m.group("type").split(".")[-1]
             if name == "components":
@@ -194,7 +477,6 @@ class WinFormsParser:
             if typ not in _ACCEPT_TYPES:
                 continue
             controls.setdefault(name, {"type": typ, "props": {}, "children": []})
-            init = m.group("init")
             if init:
                 for p, v in _split_object_init(init):
                     controls[name]["props"][p] = self._parse_value(p, v)
@@ -213,36 +495,40 @@ class WinFormsParser:
             val = m.group("value").strip()
             if name in ("this", "base"):
                 if prop in ("Text", "ClientSize", "Size", "Width", "Height", "BackColor", "ForeColor"):
-                    root.properties[prop] = self._parse_value(prop, val)
+                    root.set_property(prop, self._parse_value(prop, val))
                 continue
             if name not in controls:
                 continue
             controls[name]["props"][prop] = self._parse_value(prop, val)
+        if ".Items.Add" in text:
+            _attach_items(controls, ((m.group("name"), _parse_items(m.group("item") if m.group("list") is None else m.group("list")))
+                                     for m in _items_pat.finditer(text) if m.group("name") in controls))
         # Parent-child relationships
-        for m in _add_form_pat.finditer(text):
-            child = m.group("child")
-            if child not in controls:
-                continue
-            controls[child]["parent"] = form_name
-        for m in _addrange_form_pat.finditer(text):
-            inner = m.group("list")
-            for token in inner.split(','):
-                nm = token.strip().replace('this.', '').strip()
-                if nm and nm in controls:
-                    controls[nm]["parent"] = form_name
-        for m in _add_parent_pat.finditer(text):
-            parent = m.group("parent")
-            child = m.group("child")
-            if child not in controls:
-                continue
-            controls[child]["parent"] = parent
-        for m in _addrange_parent_pat.finditer(text):
-            parent = m.group("parent")
-            inner = m.group("list")
-            for token in inner.split(','):
-                nm = token.strip().replace('this.', '').strip()
-                if nm and nm in controls:
-                    controls[nm]["parent"] = parent
+        if ".Controls.Add" in text:
+            for m in _add_form_pat.finditer(text):
+                child = m.group("child")
+                if child not in controls:
+                    continue
+                controls[child]["parent"] = form_name
+            for m in _addrange_form_pat.finditer(text):
+                inner = m.group("list")
+                for token in inner.split(','):
+                    nm = token.strip().replace('this.', '').strip()
+                    if nm and nm in controls:
+                        controls[nm]["parent"] = form_name
+            for m in _add_parent_pat.finditer(text):
+                parent = m.group("parent")
+                child = m.group("child")
+                if child not in controls:
+                    continue
+                controls[child]["parent"] = parent
+            for m in _addrange_parent_pat.finditer(text):
+                parent = m.group("parent")
+                inner = m.group("list")
+                for token in inner.split(','):
+                    nm = token.strip().replace('this.', '').strip()
+                    if nm and nm in controls:
+                        controls[nm]["parent"] = parent
         # Build nodes
         name_to_node: Dict[str, UiNode] = {}
         for name, data in controls.items():
@@ -252,46 +538,19 @@ class WinFormsParser:
             parent = data.get("parent")
             node = name_to_node[name]
             if parent and parent in name_to_node:
-                node.parent = name_to_node[parent]
-                name_to_node[parent].children.append(node)
+                name_to_node[parent].add_child(node)
             else:
-                node.parent = root
-                root.children.append(node)
+                root.add_child(node)
         return root
 
     def _parse_value(self, prop: str, val: str) -> Any:
-        if _location_pat.search(val):
-            m = _location_pat.search(val)
-            return {"x": int(m.group("x")), "y": int(m.group("y"))}
-        if _size_pat.search(val):
-            m = _size_pat.search(val)
-            return {"w": int(m.group("w")), "h": int(m.group("h"))}
-        if _padding_pat.search(val):
-            m = _padding_pat.search(val)
-            a = int(m.group('a'))
-            b = m.group('b')
-            if not b:
-                return a
-            return (a, int(m.group('b')), int(m.group('c')), int(m.group('d')))
-        if _color_argb_pat.search(val):
-            m = _color_argb_pat.search(val)
-            r, g, b = int(m.group('r')), int(m.group('g')), int(m.group('b'))
-            return f"#{r:02X}{g:02X}{b:02X}"
-        if _dockstyle_pat.search(val):
-            m = _dockstyle_pat.search(val)
-            return m.group('val')
-        if _color_name_pat.fullmatch(val.strip()):
-            m = _color_name_pat.fullmatch(val.strip())
-            return m.group('name')
-        if val.endswith(")") and "Color" in val:
-            # Simplistic fallback
-            parts = val.split('.')
-            return parts[-1].rstrip(")")
-        sm = _string_pat.search(val)
-        if sm:
-            return sm.group(1)
-        if val.isdigit():
-            return int(val)
-        if val.lower() in ("true", "false"):
-            return val.lower() == "true"
-        return val
+        if prop in _IMAGE_PROPS:
+            m = _form_resource_pat.search(val)
+            if m:
+                return {"resx": "form", "key": m.group("key")}
+            m = _project_resource_pat.search(val)
+            if m:
+                return {"resx": "project", "key": m.group("key")}
+        v = _parse_literal(val)
+        # Cached dicts are shared between calls; hand out a private copy (tuples/str/int are immutable)
+        return dict(v) if type(v) is dict else v
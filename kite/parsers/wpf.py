@@ -1,14 +1,25 @@
 import os
 import xml.etree.ElementTree as ET
-from typing import List
+from typing import List, Optional
 from ..model import UiNode
-from ..utils.fs import find_files, read_text
+from ..utils.fs import DISK, FileIndex, FileSystem
+from ..utils.log import log
 from ..utils.naming import safe_name
+from .xaml_resources import ResourceIndex, ResourceScope, entry
+
+# Resource containers never become widgets
+_SKIP_TYPES = {"ResourceDictionary"}
 
 
 class WpfParser:
-    def parse_project(self, root: str) -> List[UiNode]:
-        files = find_files(root, patterns=["*.xaml"]) or []
+    def __init__(self, fs: Optional[FileSystem] = None) -> None:
+        # Where sources (and the dictionaries they merge) are read from
+        self.fs = fs or DISK
+
+    def parse_project(self, root: str, index: Optional[FileIndex] = None) -> List[UiNode]:
+        if index is None:
+            index = self.fs.scan_tree(root)
+        files = index.find(["*.xaml"])
         nodes: List[UiNode] = []
         for f in files:
             # Skip resources/app xaml
@@ -16,28 +27,30 @@ class WpfParser:
             if base.startswith("app."):
                 continue
             try:
-                nodes.append(self.parse_xaml(f))
-            except Exception:
+                node = self.parse_xaml(f)
+                if node is not None:
+                    nodes.append(node)
+            except Exception as e:
+                log.warn("Skipped XAML file", path=f, error=f"{type(e).__name__}: {e}")
                 continue
         return nodes
 
-    def parse_xaml(self, path: str) -> UiNode:
-        text = read_text(path)
-        root_el = ET.fromstring(text)
-        root_type = self._strip_ns(root_el.tag)
+    def parse_xaml(self, path: str, resources: Optional[ResourceIndex] = None) -> Optional[UiNode]:
+        # Nodes are built from start events and each element is dropped from the ElementTree at its end
+        # event, so only the open path is held; a standalone ResourceDictionary is not a window.
         name = safe_name(os.path.splitext(os.path.basename(path))[0])
-        root = UiNode(type=root_type, name=name, properties=self._attrs(root_el), children=[])
-        self._walk_children(root_el, root)
-        return root
-
-    def _walk_children(self, el: ET.Element, node: UiNode) -> None:
-        for child in list(el):
-            if isinstance(child.tag, str):
-                ctype = self._strip_ns(child.tag)
-                cnode = UiNode(type=ctype, name=safe_name(child.attrib.get("x:Name") or child.attrib.get("Name") or ctype), properties=self._attrs(child), children=[])
-                cnode.parent = node
-                node.children.append(cnode)
-                self._walk_children(child, cnode)
+        parser = ET.XMLPullParser(events=("start", "end"))
+        builder = _TreeBuilder(self, name, resources if resources is not None else ResourceIndex(os.path.dirname(path), self.fs), os.path.dirname(path))
+        with self.fs.open_source(path) as src:
+            for chunk in src.iter_text():
+                parser.feed(chunk)
+                builder.consume(parser.read_events())
+                if builder.root is not None and builder.root.type in _SKIP_TYPES:
+                    return None
+        # Raises ParseError on truncated input or an empty document
+        parser.close()
+        builder.consume(parser.read_events())
+        return builder.root
 
     def _attrs(self, el: ET.Element):
         props = {}
@@ -51,3 +64,79 @@ class WpfParser:
         if '}' in tag:
             return tag.split('}', 1)[1]
         return tag
+
+
+# What an open element is to the builder
+_NODE, _SKIP, _RESOURCES, _MERGED, _ENTRY, _KEEP = range(6)
+
+
+class _TreeBuilder:
+    # Turns XMLPullParser events into a UiNode tree, collecting *.Resources blocks into scopes as it goes
+    def __init__(self, parser: WpfParser, name: str, resources: ResourceIndex, base_dir: str) -> None:
+        self.parser = parser
+        self.name = name
+        self.resources = resources
+        self.base_dir = base_dir
+        self.root: Optional[UiNode] = None
+        # Open elements as [element, node, kind, scope]; a *.Resources block gives its owner a new scope
+        self.stack: List[list] = []
+
+    def consume(self, events) -> None:
+        stack = self.stack
+        for event, el in events:
+            if event == "end":
+                _, _, kind, scope = stack.pop()
+                if kind == _ENTRY:
+                    kv = entry(el)
+                    if kv is not None:
+                        scope.entries[kv[0]] = kv[1]
+                elif kind == _KEEP:
+                    # Read with its resource entry
+                    continue
+                if stack:
+                    # Always the last child: later siblings have not started yet
+                    del stack[-1][0][-1]
+                else:
+                    el.clear()
+                continue
+            ctype = self.parser._strip_ns(el.tag)
+            if not stack:
+                self.root = self._node(ctype, el, self.name, self.resources)
+                stack.append([el, self.root, _NODE, self.resources])
+                continue
+            top = stack[-1]
+            kind, scope = top[2], top[3]
+            node = None
+            if kind == _NODE:
+                if ctype.endswith(".Resources"):
+                    # Resources apply to the owner and everything after them inside it
+                    scope = top[3] = ResourceScope(parent=scope)
+                    kind = _RESOURCES
+                elif "." in ctype or ctype in _SKIP_TYPES:
+                    # Property elements (Grid.RowDefinitions, Button.Content, ...) are not widgets
+                    kind = _SKIP
+                else:
+                    node = self._node(ctype, el, safe_name(el.attrib.get("x:Name") or el.attrib.get("Name") or ctype), scope)
+                    top[1].add_child(node)
+            elif kind == _RESOURCES:
+                if ctype == "ResourceDictionary":
+                    self.resources.merge_into(scope, el, self.base_dir)
+                elif ctype == "ResourceDictionary.MergedDictionaries":
+                    kind = _MERGED
+                else:
+                    kind = _ENTRY
+            elif kind == _MERGED:
+                if el.attrib.get("Source"):
+                    self.resources.merge_into(scope, el, self.base_dir)
+                    kind = _SKIP
+                else:
+                    # Inline dictionary: its entries go into a merged scope of their own
+                    merged = ResourceScope()
+                    scope.merged.append(merged)
+                    scope, kind = merged, _RESOURCES
+            elif kind in (_ENTRY, _KEEP):
+                kind = _KEEP
+            stack.append([el, node, kind, scope])
+
+    def _node(self, ctype: str, el: ET.Element, name: str, scope: ResourceScope) -> UiNode:
+        return UiNode(type=ctype, name=name, properties=scope.apply(ctype, self.parser._attrs(el)), children=[])
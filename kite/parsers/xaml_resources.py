@@ -0,0 +1,291 @@
+import hashlib
+import os
+import re
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.fs import DISK, FileIndex, FileSystem
+from ..utils.log import log
+
+# {StaticResource Key}, {DynamicResource ResourceKey=Key}, {StaticResource {x:Type Button}}
+_ref_pat = re.compile(r"\{\s*(?:StaticResource|DynamicResource)\s+(?:ResourceKey\s*=\s*)?(?P<key>\{\s*x:Type\s+[^{}]+\}|[^{}\s]+)\s*\}")
+_type_key_pat = re.compile(r"\{\s*x:Type\s+(?:\w+:)?(?P<name>[^{}\s]+)\s*\}")
+# pack://application:,,,/Assembly;component/Themes/Dark.xaml and /Assembly;component/... both name a project-relative path
+_component_pat = re.compile(r"^(?:pack://application:,,,)?/?[^/;]+;component/", re.I)
+_cycle = object()
+
+
+def _strip_ns(tag: str) -> str:
+    return tag.split('}', 1)[1] if '}' in tag else tag
+
+
+def _key(raw: str) -> str:
+    # Implicit styles are keyed by their target type
+    m = _type_key_pat.fullmatch(raw.strip())
+    return f"{{x:Type}}{m.group('name')}" if m else raw.strip()
+
+
+def type_key(type_name: str) -> str:
+    return f"{{x:Type}}{type_name}"
+
+
+class Style:
+    __slots__ = ("based_on", "setters")
+
+    def __init__(self, based_on: Optional[str], setters: Dict[str, str]) -> None:
+        self.based_on = based_on
+        self.setters = setters
+
+
+def root_tag(path: str, fs: FileSystem = DISK) -> str:
+    # Local name of the document element, from the first chunk only
+    parser = ET.XMLPullParser(events=("start",))
+    with fs.open_source(path) as src:
+        for chunk in src.iter_text():
+            parser.feed(chunk)
+            for _, el in parser.read_events():
+                return _strip_ns(el.tag)
+    return ""
+
+
+def _brush_color(el: ET.Element) -> Optional[str]:
+    # Solid brushes carry a Color; gradients are approximated by their first stop
+    color = el.attrib.get("Color")
+    if color:
+        return color
+    for stop in el.iter():
+        if _strip_ns(stop.tag) == "GradientStop" and stop.attrib.get("Color"):
+            return stop.attrib["Color"]
+    return (el.text or "").strip() or None
+
+
+def _entry_value(el: ET.Element) -> Any:
+    tag = _strip_ns(el.tag)
+    if tag == "Style":
+        setters: Dict[str, str] = {}
+        for child in el:
+            if _strip_ns(child.tag) != "Setter":
+                continue
+            prop = child.attrib.get("Property", "").rsplit(".", 1)[-1]
+            value = child.attrib.get("Value")
+            if value is None:
+                # <Setter.Value><SolidColorBrush .../></Setter.Value>
+                for holder in child:
+                    for inner in holder:
+                        value = _entry_value(inner)
+                        break
+            if prop and isinstance(value, str):
+                setters[prop] = value
+        return Style(el.attrib.get("BasedOn"), setters)
+    if tag.endswith("Brush"):
+        return _brush_color(el)
+    if len(el) == 0 and el.text and el.text.strip():
+        # Color, sys:Double, sys:String, Thickness, FontFamily, ...
+        return el.text.strip()
+    # Templates, converters and other objects have no property value
+    return None
+
+
+def entry(el: ET.Element) -> Optional[Tuple[str, Any]]:
+    key = None
+    for k, v in el.attrib.items():
+        if k == "x:Key" or k.endswith("}Key"):
+            key = _key(v)
+            break
+    if key is None:
+        target = el.attrib.get("TargetType")
+        if _strip_ns(el.tag) != "Style" or not target:
+            return None
+        key = type_key(_key(target).replace("{x:Type}", ""))
+    value = _entry_value(el)
+    return (key, value) if value is not None else None
+
+
+class ResourceScope:
+    # One resource dictionary: its own entries, the dictionaries it merges, then the enclosing scope
+    __slots__ = ("entries", "merged", "parent", "_styles", "_found")
+
+    def __init__(self, parent: Optional["ResourceScope"] = None) -> None:
+        self.entries: Dict[str, Any] = {}
+        self.merged: List["ResourceScope"] = []
+        self.parent = parent
+        self._styles: Dict[str, Any] = {}
+        # key -> (value, owning scope) of every lookup, misses included. A scope is complete before its first
+        # lookup: a *.Resources block closes before the elements it applies to start.
+        self._found: Dict[str, Tuple[Any, Optional[ResourceScope]]] = {}
+
+    def _find(self, key: str) -> Tuple[Any, Optional["ResourceScope"]]:
+        found = self._found.get(key)
+        if found is None:
+            found = self._found[key] = self._lookup(key)
+        return found
+
+    def _lookup(self, key: str) -> Tuple[Any, Optional["ResourceScope"]]:
+        if key in self.entries:
+            return self.entries[key], self
+        # Later merged dictionaries win over earlier ones
+        for merged in reversed(self.merged):
+            value, owner = merged._find(key)
+            if owner is not None:
+                return value, owner
+        return self.parent._find(key) if self.parent is not None else (None, None)
+
+    def resolve(self, value: Any) -> Any:
+        if not isinstance(value, str) or "Resource" not in value:
+            return value
+        m = _ref_pat.fullmatch(value.strip())
+        if not m:
+            return value
+        found, _ = self._find(_key(m.group("key")))
+        return found if isinstance(found, str) else value
+
+    def style(self, key: str) -> Optional[Dict[str, str]]:
+        # Setters with BasedOn chains flattened, memoized on the dictionary that defines the style
+        found, owner = self._find(key)
+        if not isinstance(found, Style):
+            return None
+        memo = owner._styles.get(key)
+        if memo is _cycle:
+            log.warn("Style BasedOn cycle", key=key)
+            return None
+        if memo is not None:
+            return memo
+        owner._styles[key] = _cycle
+        setters: Dict[str, str] = {}
+        if found.based_on:
+            m = _ref_pat.fullmatch(found.based_on.strip())
+            base = owner.style(_key(m.group("key"))) if m else None
+            if base:
+                setters.update(base)
+        for prop, value in found.setters.items():
+            setters[prop] = owner.resolve(value)
+        owner._styles[key] = setters
+        return setters
+
+    def apply(self, type_name: str, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        # Style setters first (explicit Style=, else the implicit style for the type), then the element's own values
+        style = attrs.get("Style")
+        if isinstance(style, str):
+            m = _ref_pat.fullmatch(style.strip())
+            setters = self.style(_key(m.group("key"))) if m else None
+        else:
+            setters = self.style(type_key(type_name))
+        if setters is None and not any(isinstance(v, str) and "Resource" in v for v in attrs.values()):
+            return attrs
+        props = dict(setters) if setters else {}
+        for k, v in attrs.items():
+            if k == "Style" and setters is not None:
+                continue
+            props[k] = self.resolve(v)
+        return props
+
+
+class ResourceIndex(ResourceScope):
+    # Application-level resources of a WPF project (App.xaml and what it merges), built once per conversion
+    __slots__ = ("root", "fs", "files", "fingerprint", "_dicts")
+
+    def __init__(self, root: str = "", fs: Optional[FileSystem] = None) -> None:
+        super().__init__()
+        self.root = root
+        self.fs = fs or DISK
+        self.files: List[str] = []
+        self.fingerprint = ""
+        self._dicts: Dict[str, Optional[ResourceScope]] = {}
+
+    @classmethod
+    def build(cls, root: str, index: FileIndex, fs: Optional[FileSystem] = None) -> "ResourceIndex":
+        res = cls(root, fs)
+        xamls = index.find(["*.xaml"])
+        for path in xamls:
+            if not os.path.basename(path).lower().startswith("app."):
+                continue
+            try:
+                el = ET.fromstring(res.fs.read_text(path))
+            except (OSError, ET.ParseError) as e:
+                log.warn("Skipped application resources", path=path, error=e)
+                continue
+            res._track(path)
+            for child in el:
+                if _strip_ns(child.tag).endswith(".Resources"):
+                    res.read(child, res, os.path.dirname(path))
+        # Load standalone dictionaries up front too: workers receive them with the index instead of re-reading
+        # them per window, and edits to any of them change the fingerprint
+        for path in xamls:
+            if os.path.basename(path).lower().startswith("app."):
+                continue
+            try:
+                is_dictionary = root_tag(path, res.fs) == "ResourceDictionary"
+            except (OSError, ET.ParseError):
+                continue
+            if is_dictionary:
+                res.dictionary(path, root)
+        if res.files:
+            h = hashlib.sha256()
+            for path in res.files:
+                h.update(res.fs.file_digest(path).encode("ascii"))
+            res.fingerprint = h.hexdigest()
+        return res
+
+    def _track(self, path: str) -> None:
+        if path not in self.files:
+            self.files.append(path)
+
+    def read(self, holder: ET.Element, scope: ResourceScope, base_dir: str) -> None:
+        # Entries of a *.Resources element or a ResourceDictionary into scope
+        for el in holder:
+            tag = _strip_ns(el.tag)
+            if tag == "ResourceDictionary":
+                self.merge_into(scope, el, base_dir)
+                self.read(el, scope, base_dir)
+            elif tag == "ResourceDictionary.MergedDictionaries":
+                for rd in el:
+                    self.merge_into(scope, rd, base_dir, inline=True)
+            else:
+                kv = entry(el)
+                if kv is not None:
+                    scope.entries[kv[0]] = kv[1]
+
+    def merge_into(self, scope: ResourceScope, rd: ET.Element, base_dir: str, inline: bool = False) -> None:
+        source = rd.attrib.get("Source")
+        if source:
+            merged = self.dictionary(source, base_dir)
+            if merged is not None:
+                scope.merged.append(merged)
+        elif inline:
+            merged = ResourceScope()
+            self.read(rd, merged, base_dir)
+            scope.merged.append(merged)
+
+    def _locate(self, source: str, base_dir: str) -> Optional[str]:
+        if os.path.isabs(source) and self.fs.isfile(source):
+            return os.path.normpath(source)
+        rel = _component_pat.sub("", source.strip()).replace("/", os.sep).replace("\\", os.sep)
+        if _component_pat.match(source.strip()) or rel.startswith(os.sep):
+            candidates = [os.path.join(self.root, rel.lstrip(os.sep))]
+        else:
+            candidates = [os.path.join(base_dir, rel), os.path.join(self.root, rel)]
+        for path in candidates:
+            if self.fs.isfile(path):
+                return os.path.normpath(path)
+        return None
+
+    def dictionary(self, source: str, base_dir: str) -> Optional[ResourceScope]:
+        # Each dictionary file is read once per process, however many windows merge it
+        path = self._locate(source, base_dir)
+        if path is None:
+            log.warn("Resource dictionary not found", source=source, base=base_dir)
+            return None
+        if path in self._dicts:
+            return self._dicts[path]
+        self._dicts[path] = None
+        try:
+            el = ET.fromstring(self.fs.read_text(path))
+        except (OSError, ET.ParseError) as e:
+            log.warn("Skipped resource dictionary", path=path, error=e)
+            return None
+        scope = ResourceScope()
+        self.merge_into(scope, el, os.path.dirname(path))
+        self.read(el, scope, os.path.dirname(path))
+        self._track(path)
+        self._dicts[path] = scope
+        return scope
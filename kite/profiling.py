@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, Iterable, List
+
+from .utils.fs import write_text
+
+
+class _Phase:
+    # One open phase; args is handed to the caller so it can add what it learns (bytes, counts) before exit
+    __slots__ = ("profiler", "name", "cat", "args", "wall", "cpu", "mem", "peak")
+
+    def __init__(self, profiler: "Profiler", name: str, cat: str, args: Dict[str, Any]) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self) -> Dict[str, Any]:
+        stack = self.profiler._stack
+        current, peak = tracemalloc.get_traced_memory()
+        # reset_peak is process-wide: fold the enclosing phase's peak so far into it first
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, peak)
+        tracemalloc.reset_peak()
+        self.mem = current
+        self.peak = current
+        stack.append(self)
+        self.cpu = time.thread_time()
+        self.wall = time.perf_counter()
+        return self.args
+
+    def __exit__(self, *exc: Any) -> None:
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        stack = self.profiler._stack
+        stack.pop()
+        args = self.args
+        args["cpu_ms"] = round(cpu * 1e3, 3)
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, self.peak)
+        args["peak_kb"] = round((self.peak - self.mem) / 1024, 1)
+        self.profiler.events.append({
+            "name": self.name, "cat": self.cat, "ph": "X",
+            "ts": round(self.wall * 1e6, 1), "dur": round(wall * 1e6, 1),
+            "pid": os.getpid(), "tid": threading.get_ident(), "args": args,
+        })
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> Dict[str, Any]:
+        # Callers may write into it; nobody reads it
+        return {}
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class Profiler:
+    # --profile: nested phases become Chrome trace events with wall/CPU time and tracemalloc peak above their start
+    enabled = True
+
+    def __init__(self) -> None:
+        self.events: List[Dict[str, Any]] = []
+        self._stack: List[_Phase] = []
+        self._tracing = not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+
+    def close(self) -> None:
+        # Stop tracemalloc if this profiler started it; later work runs at full speed again
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def phase(self, name: str, cat: str = "phase", **args: Any) -> _Phase:
+        return _Phase(self, name, cat, args)
+
+    def take(self) -> List[Dict[str, Any]]:
+        events, self.events = self.events, []
+        return events
+
+    def add(self, events: Iterable[Dict[str, Any]]) -> None:
+        self.events.extend(events)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        # Totals per phase name: count, wall/CPU milliseconds, largest peak
+        out: Dict[str, Dict[str, Any]] = {}
+        for e in self.events:
+            s = out.setdefault(e["name"], {"count": 0, "wall_ms": 0.0, "cpu_ms": 0.0, "peak_kb": 0.0})
+            s["count"] += 1
+            s["wall_ms"] += e["dur"] / 1e3
+            s["cpu_ms"] += e["args"].get("cpu_ms", 0.0)
+            s["peak_kb"] = max(s["peak_kb"], e["args"].get("peak_kb", 0.0))
+        for s in out.values():
+            s["wall_ms"] = round(s["wall_ms"], 3)
+            s["cpu_ms"] = round(s["cpu_ms"], 3)
+        return out
+
+    def files(self) -> List[Dict[str, Any]]:
+        # Per source file: input bytes, controls and output bytes with its parse/generate times
+        rows: Dict[str, Dict[str, Any]] = {}
+        for e in self.events:
+            source = e["args"].get("source")
+            if source is None or e["cat"] != "file":
+                continue
+            row = rows.setdefault(source, {"source": source})
+            row[e["name"] + "_ms"] = round(row.get(e["name"] + "_ms", 0.0) + e["dur"] / 1e3, 3)
+            for k in ("bytes_in", "controls", "bytes_out", "window"):
+                if k in e["args"]:
+                    row[k] = e["args"][k]
+        return list(rows.values())
+
+    def write(self, path: str) -> None:
+        # Chrome trace object format; viewers ignore the extra keys
+        events = sorted(self.events, key=lambda e: e["ts"])
+        names = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "kite" if pid == os.getpid() else f"kite worker {pid}"}} for pid in sorted({e["pid"] for e in events})]
+        trace = {"traceEvents": names + events, "displayTimeUnit": "ms", "summary": self.summary(), "files": self.files()}
+        write_text(path, json.dumps(trace, indent=1))
+
+
+class NullProfiler:
+    # Without --profile every phase is the same no-op context manager
+    enabled = False
+
+    def phase(self, name: str, cat: str = "phase", **args: Any) -> _NullPhase:
+        return _NULL_PHASE
+
+    def take(self) -> List[Dict[str, Any]]:
+        return []
+
+    def add(self, events: Iterable[Dict[str, Any]]) -> None:
+        pass
+
@@ -0,0 +1,412 @@
+# Widgets and builders used by Kite-generated apps: copied into each output as app/custom.py, or imported from
+# here by apps converted with --shared-runtime.
+import json
+import os
+import tkinter as tk
+from tkinter import ttk
+
+class HyperlinkLabel(ttk.Label):
+    def __init__(self, master=None, text='', command=None, **kwargs):
+        super().__init__(master, text=text, foreground='#0645AD', cursor='hand2', **kwargs)
+        self._command = command
+        self.bind('<Button-1>', lambda e: self._command() if self._command else None)
+        self.bind('<Enter>', lambda e: self.configure(foreground='#0B0080'))
+        self.bind('<Leave>', lambda e: self.configure(foreground='#0645AD'))
+
+class PlaceholderEntry(ttk.Entry):
+    def __init__(self, master=None, placeholder='', **kwargs):
+        super().__init__(master, **kwargs)
+        self.placeholder = placeholder
+        self._has_placeholder = False
+        self._show_placeholder()
+        self.bind('<FocusIn>', self._clear_placeholder)
+        self.bind('<FocusOut>', self._show_placeholder)
+
+    def _show_placeholder(self, *args):
+        if not self.get():
+            self.insert(0, self.placeholder)
+            self.configure(foreground='gray')
+            self._has_placeholder = True
+
+    def _clear_placeholder(self, *args):
+        if self._has_placeholder:
+            self.delete(0, 'end')
+            self.configure(foreground='black')
+            self._has_placeholder = False
+
+def _sort_key(value):
+    # Numbers before text, so mixed columns sort without TypeError
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value, '')
+    return (1, 0, str(value))
+
+class DataGrid(ttk.Treeview):
+    # Plain Treeview until set_source() is called. Then it is virtual: only the visible rows plus `overscan` exist
+    # as Tk items, refilled from the source as the view scrolls, so 1M rows cost what a screenful does.
+    def __init__(self, master=None, columns=None, rows=None, row_count=None, fetch=None, overscan=4, **kwargs):
+        columns = tuple(columns or ("col1", "col2"))
+        self._user_yscroll = kwargs.pop('yscrollcommand', None)
+        super().__init__(master, columns=columns, show='headings', yscrollcommand=self._tk_yscroll, **kwargs)
+        for col in columns:
+            self.heading(col, text=col, command=lambda c=col: self.sort(c))
+            self.column(col, width=120, anchor='w')
+        self._virtual = False
+        self._count = 0
+        self._fetch = None
+        # Display position -> row index while sorted
+        self._order = None
+        self._sorted = (None, False)
+        self._top = 0
+        # Recycled item ids, one per materialized row
+        self._pool = []
+        self._overscan = overscan
+        self._selected = set()
+        if rows is not None or fetch is not None:
+            self.set_source(rows=rows, row_count=row_count, fetch=fetch)
+
+    def set_source(self, rows=None, row_count=None, fetch=None):
+        # Bulk load: a sequence of row tuples, or row_count plus fetch(index) -> row tuple. Nothing is copied.
+        if fetch is None:
+            rows = rows if rows is not None else ()
+            row_count, fetch = len(rows), rows.__getitem__
+        if not self._virtual:
+            self.delete(*self.get_children())
+            self._virtual = True
+            self.bind('<Configure>', lambda e: self._render(), add='+')
+            self.bind('<<TreeviewSelect>>', self._on_select, add='+')
+            self.bind('<MouseWheel>', lambda e: self._scroll(-3 if e.delta > 0 else 3))
+            self.bind('<Button-4>', lambda e: self._scroll(-3))
+            self.bind('<Button-5>', lambda e: self._scroll(3))
+            self.bind('<Prior>', lambda e: self._scroll(-self._visible()))
+            self.bind('<Next>', lambda e: self._scroll(self._visible()))
+            self.bind('<Up>', lambda e: self._step(-1))
+            self.bind('<Down>', lambda e: self._step(1))
+            self.bind('<Home>', lambda e: self._scroll(-self._count))
+            self.bind('<End>', lambda e: self._scroll(self._count))
+        self._count, self._fetch = row_count, fetch
+        self._order = None
+        self._sorted = (None, False)
+        self._selected = set()
+        self._top = 0
+        self._render()
+
+    def row_count(self):
+        return self._count if self._virtual else len(self.get_children())
+
+    def selected_rows(self):
+        # Source row indexes, wherever they are scrolled to
+        if self._virtual:
+            return sorted(self._selected)
+        return [self.index(iid) for iid in self.selection()]
+
+    def see_row(self, index):
+        if not self._virtual:
+            self.see(self.get_children()[index])
+            return
+        pos = self._order.index(index) if self._order is not None else index
+        if not self._top <= pos < self._top + self._visible():
+            self._top = pos
+            self._render()
+
+    def sort(self, column, reverse=None):
+        # Clicking a heading sorts by it, again reverses. Virtual rows get a sorted index order (one fetch per
+        # row); plain items are moved in place. Neither re-inserts rows.
+        if reverse is None:
+            reverse = self._sorted == (column, False)
+        if self._virtual:
+            col = list(self['columns']).index(column)
+            keys = [_sort_key(self._fetch(i)[col]) for i in range(self._count)]
+            self._order = sorted(range(self._count), key=keys.__getitem__, reverse=reverse)
+            self._render()
+        else:
+            items = sorted(self.get_children(), key=lambda iid: _sort_key(self.set(iid, column)), reverse=reverse)
+            for pos, iid in enumerate(items):
+                self.move(iid, '', pos)
+        self._sorted = (column, reverse)
+
+    def configure(self, cnf=None, **kw):
+        # The scrollbar follows the virtual position, so yscrollcommand is kept on the Python side
+        if isinstance(cnf, str):
+            return super().configure(cnf)
+        kw = dict(cnf or {}, **kw)
+        if 'yscrollcommand' in kw:
+            self._user_yscroll = kw.pop('yscrollcommand')
+            if not kw:
+                return None
+        return super().configure(**kw)
+    config = configure
+
+    def yview(self, *args):
+        if not self._virtual:
+            return super().yview(*args)
+        if not args:
+            return self._fractions()
+        if args[0] == 'moveto':
+            self._top = int(float(args[1]) * self._count)
+        elif args[0] == 'scroll':
+            self._top += int(args[1]) * (self._visible() if args[2].startswith('page') else 1)
+        self._render()
+
+    def yview_moveto(self, fraction):
+        self.yview('moveto', fraction)
+
+    def yview_scroll(self, number, what):
+        self.yview('scroll', number, what)
+
+    def _tk_yscroll(self, first, last):
+        if not self._virtual and self._user_yscroll:
+            self._user_yscroll(first, last)
+
+    def _fractions(self):
+        if not self._count:
+            return (0.0, 1.0)
+        return (self._top / self._count, min(self._top + self._visible(), self._count) / self._count)
+
+    def _visible(self):
+        height = self.winfo_height()
+        if height <= 1:
+            # Not mapped yet
+            return int(self.cget('height'))
+        rowheight = ttk.Style(self).lookup('Treeview', 'rowheight') or 20
+        return max(1, height // int(rowheight))
+
+    def _scroll(self, rows):
+        self.yview('scroll', rows, 'units')
+        return 'break'
+
+    def _step(self, delta):
+        # Keyboard row movement past the materialized rows
+        if not self._count:
+            return 'break'
+        focus = self.focus()
+        pos = self._top + self._pool.index(focus) if focus in self._pool else self._top
+        pos = max(0, min(pos + delta, self._count - 1))
+        visible = self._visible()
+        if pos < self._top:
+            self._top = pos
+        elif pos >= self._top + visible:
+            self._top = pos - visible + 1
+        self._selected = {self._order[pos] if self._order is not None else pos}
+        self._render()
+        self.focus(self._pool[pos - self._top])
+        return 'break'
+
+    def _render(self):
+        visible = self._visible()
+        self._top = max(0, min(self._top, self._count - visible))
+        n = min(visible + self._overscan, self._count - self._top)
+        while len(self._pool) < n:
+            self._pool.append(self.insert('', 'end'))
+        while len(self._pool) > n:
+            self.delete(self._pool.pop())
+        order, fetch, top = self._order, self._fetch, self._top
+        selection = []
+        for k, iid in enumerate(self._pool):
+            i = order[top + k] if order is not None else top + k
+            self.item(iid, values=fetch(i))
+            if i in self._selected:
+                selection.append(iid)
+        self.selection_set(selection)
+        super().yview_moveto(0)
+        if self._user_yscroll:
+            self._user_yscroll(*self._fractions())
+
+    def _on_select(self, event):
+        # Track selection by source row, since items are reused for other rows on scroll
+        shown = {}
+        for k, iid in enumerate(self._pool):
+            shown[iid] = self._order[self._top + k] if self._order is not None else self._top + k
+        picked = set(self.selection())
+        rows = set(shown.values())
+        self._selected = {i for i in self._selected if i not in rows} | {i for iid, i in shown.items() if iid in picked}
+
+class NumericUpDown(tk.Spinbox):
+    def __init__(self, master=None, from_=0, to=100, increment=1, **kwargs):
+        super().__init__(master, from_=from_, to=to, increment=increment, **kwargs)
+
+class DatePicker(ttk.Entry):
+    def __init__(self, master=None, **kwargs):
+        super().__init__(master, **kwargs)
+        # Simple placeholder date picker; user can type date
+
+class Placeholder(ttk.Labelframe):
+    def __init__(self, master=None, title='Placeholder', **kwargs):
+        super().__init__(master, text=title, **kwargs)
+        ttk.Label(self, text='Auto-generated placeholder').pack(anchor='w', padx=6, pady=4)
+
+class MenuBar:
+    def __init__(self, master, spec=None):
+        self.menu = tk.Menu(master)
+        # Basic File->Exit placeholder if no spec
+        filem = tk.Menu(self.menu, tearoff=0)
+        filem.add_command(label='Exit', command=master.destroy)
+        self.menu.add_cascade(label='File', menu=filem)
+
+class StatusBar(ttk.Frame):
+    def __init__(self, master=None, text='', **kwargs):
+        super().__init__(master, **kwargs)
+        self._var = tk.StringVar(value=text)
+        lbl = ttk.Label(self, textvariable=self._var, anchor='w')
+        lbl.pack(fill='x')
+
+class ToolBar(ttk.Frame):
+    def __init__(self, master=None, **kwargs):
+        super().__init__(master, **kwargs)
+        # Placeholder toolbar with a button
+        ttk.Button(self, text='Action').pack(side='left')
+
+class CircleButton(tk.Canvas):
+    def __init__(self, master=None, color='#FF5F56', size=12, command=None, **kwargs):
+        super().__init__(master, width=size, height=size, highlightthickness=0, bg=kwargs.get('bg', self.master.cget('bg')))
+        self._command = command
+        r = size // 2
+        self._oval = self.create_oval(1, 1, size-1, size-1, fill=color, outline=color)
+        self.bind('<Button-1>', lambda e: self._command() if self._command else None)
+
+def build(window, shapes, spec, source=None):
+    # Instantiate a widget table from a window_*.py generated with --emit table. Returns {row: widget}; rows
+    # under a lazy tab page are added when the page is built. source: the window module's __file__, when some
+    # rows keep their items in its data file or show an image from assets/.
+    modules = {'tk': tk, 'ttk': ttk}
+    resolved = []
+    for path, keys, manager, geometry_keys in shapes:
+        mod, cls = path.split('.', 1)
+        resolved.append((getattr(modules[mod], cls) if mod in modules else globals()[cls], keys, manager, geometry_keys))
+    made = {}
+    # lazy page row -> rows created when it is first shown, and the reverse
+    groups = {}
+    owner = {}
+
+    def make(i):
+        row = spec[i]
+        parent, shape, values, geometry_values = row[:4]
+        factory, keys, manager, geometry_keys = resolved[shape]
+        master = window if parent < 0 else made[parent]
+        kwargs = dict(zip(keys, values))
+        items = row[4] if len(row) > 4 else None
+        if isinstance(items, str):
+            items = load_items(source, items)
+        if len(row) > 5:
+            kwargs['image'] = image(master, source, row[5])
+        if items is not None and issubclass(factory, ttk.Combobox):
+            kwargs['values'] = items
+            items = None
+        w = made[i] = factory(master, **kwargs)
+        if items is not None:
+            w.insert('end', *items)
+        geometry = dict(zip(geometry_keys, geometry_values))
+        if manager == 'place':
+            w.place(**geometry)
+        elif manager == 'pack':
+            w.pack(**geometry)
+        elif manager in ('tab', 'lazytab'):
+            master.add(w, **geometry)
+        elif manager == 'menu':
+            master.config(menu=w.menu)
+
+    def page_builder(page_row):
+        def build_page(page):
+            for r in groups[page_row]:
+                make(r)
+                if r in groups:
+                    lazy_tab(made[spec[r][0]], made[r], page_builder(r))
+        return build_page
+
+    pages = []
+    for i, (parent, shape, *_values) in enumerate(spec):
+        if resolved[shape][2] == 'lazytab':
+            groups[i] = []
+        group = parent if parent in groups else owner.get(parent)
+        if group is not None:
+            owner[i] = group
+            groups[group].append(i)
+        else:
+            make(i)
+            if i in groups:
+                pages.append(i)
+    # Registered once every row is grouped: the selected page is built straight away
+    for i in pages:
+        lazy_tab(made[spec[i][0]], made[i], page_builder(i))
+    return made
+
+# Data files already read, by path
+_item_files = {}
+
+def load_items(source, key):
+    # A control's items kept out of the window's source: data/<window module>.json beside the module (source is
+    # its __file__), read once
+    path = os.path.join(os.path.dirname(source), 'data', os.path.splitext(os.path.basename(source))[0] + '.json')
+    data = _item_files.get(path)
+    if data is None:
+        with open(path, encoding='utf-8') as f:
+            data = _item_files[path] = json.load(f)
+    return data[key]
+
+# PhotoImages by (Tk interpreter, asset name), shared by every widget of every window: each file is decoded once
+# per interpreter (an image belongs to the interpreter that created it and can't be shown in another)
+_images = {}
+
+def image(widget, source, name):
+    # The image in assets/ beside the window module (source is its __file__), loaded on first use for widget's
+    # interpreter. PNG and GIF need nothing but Tk; other formats use Pillow when it is installed and show no
+    # image otherwise.
+    key = (widget.tk, name)
+    img = _images.get(key)
+    if img is None:
+        path = os.path.join(os.path.dirname(source), 'assets', name)
+        try:
+            img = tk.PhotoImage(master=widget, file=path)
+        except tk.TclError:
+            try:
+                from PIL import Image, ImageTk
+                img = ImageTk.PhotoImage(Image.open(path), master=widget)
+            except Exception:
+                img = ''
+        _images[key] = img
+    return img
+
+def lazy_tab(notebook, page, build):
+    # Run build(page) when page is first selected (right away if it already is); materialize() forces it
+    pending = getattr(notebook, '_kite_pending', None)
+    if pending is None:
+        pending = notebook._kite_pending = {}
+        notebook.bind('<<NotebookTabChanged>>', _on_tab_changed, add='+')
+    if notebook.select() == str(page):
+        build(page)
+    else:
+        pending[str(page)] = (page, build)
+
+def _on_tab_changed(event):
+    pending = getattr(event.widget, '_kite_pending', None)
+    item = pending.pop(event.widget.select(), None) if pending else None
+    if item:
+        item[1](item[0])
+
+def materialize(widget):
+    # Build pending tab pages now: widget itself if it is one, and every pending page below it (nested ones too)
+    master = getattr(widget, 'master', None)
+    pending = getattr(master, '_kite_pending', None) if master is not None else None
+    item = pending.pop(str(widget), None) if pending else None
+    if item:
+        item[1](item[0])
+    stack = [widget]
+    while stack:
+        w = stack.pop()
+        pending = getattr(w, '_kite_pending', None)
+        while pending:
+            _, (page, build) = pending.popitem()
+            build(page)
+        stack.extend(w.winfo_children())
+
+class RoundedContextMenu:
+    def __init__(self, master=None):
+        self._menu = tk.Menu(master, tearoff=0)
+    def AddItem(self, label, command=None):
+        self._menu.add_command(label=label, command=command)
+    def AddSeparator(self):
+        self._menu.add_separator()
+    def Show(self, widget, x, y=None):
+        # widget: tk widget; x,y in widget coords; if only x is tuple, treat as event
+        if isinstance(x, tuple) and y is None:
+            x, y = x
+        self._menu.tk_popup(widget.winfo_rootx()+x, widget.winfo_rooty()+y)
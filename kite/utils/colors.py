@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Optional
 
 NAMED_COLORS = {
@@ -6,10 +7,27 @@ NAMED_COLORS = {
     'Transparent': '#FFFFFF', 'Window': '#FFFFFF',
 }
 
+# System.Drawing.SystemColors members, as the default Windows 10 theme draws them
+SYSTEM_COLORS = {
+    'Control': '#F0F0F0', 'ControlLight': '#E3E3E3', 'ControlLightLight': '#FFFFFF', 'ControlDark': '#A0A0A0',
+    'ControlDarkDark': '#696969', 'ControlText': '#000000', 'ButtonFace': '#F0F0F0', 'ButtonHighlight': '#FFFFFF',
+    'ButtonShadow': '#A0A0A0', 'Window': '#FFFFFF', 'WindowText': '#000000', 'WindowFrame': '#646464',
+    'Highlight': '#0078D7', 'HighlightText': '#FFFFFF', 'HotTrack': '#0066CC', 'GrayText': '#6D6D6D',
+    'Info': '#FFFFE1', 'InfoText': '#000000', 'Menu': '#F0F0F0', 'MenuText': '#000000', 'MenuBar': '#F0F0F0',
+    'AppWorkspace': '#ABABAB', 'Desktop': '#000000', 'ActiveCaption': '#99B4D1', 'InactiveCaption': '#BFCDDB',
+}
+
+# Forms repeat a handful of colors across thousands of controls
+@lru_cache(maxsize=1024)
 def color_to_hex(name_or_hex: Optional[str]) -> str:
     if not name_or_hex:
         return '#000000'
     s = str(name_or_hex).strip()
     if s.startswith('#') and (len(s) in (4, 7)):
         return s
+    # XAML writes alpha first (#AARRGGBB / #ARGB); Tk has no alpha
+    if s.startswith('#') and (len(s) in (5, 9)):
+        return '#' + (s[3:] if len(s) == 9 else s[2:])
+    if 'SystemColors.' in s:
+        return SYSTEM_COLORS.get(s.rsplit('.', 1)[-1], '#000000')
     return NAMED_COLORS.get(s, '#000000')
@@ -1,41 +1,633 @@
+import codecs
+import errno
+import hashlib
+import io
+import itertools
+import mmap
 import os
 import shutil
-from typing import List
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
 
+from .log import log
 
-def ensure_dir(path: str) -> None:
-    os.makedirs(path, exist_ok=True)
+# Build/output/vendor directories that never contain UI sources
+DEFAULT_PRUNE_DIRS: FrozenSet[str] = frozenset({"bin", "obj", ".git", "packages", "node_modules"})
 
+WRITE_BUFFER = 1 << 16
 
-def ensure_empty_dir(path: str) -> None:
-    if os.path.exists(path):
+
+# Sources at least this large are memory-mapped instead of read into a bytes copy
+MMAP_MIN_SIZE = 1 << 20
+
+# Longest BOM first: the UTF-32 LE mark starts with the UTF-16 LE one
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+
+# Pre-UTF-8 Visual Studio files are Windows-1252; the five bytes it leaves undefined decode as latin-1
+FALLBACK_ENCODING = "cp1252"
+_LATIN1_ERRORS = "kite-latin1"
+codecs.register_error(_LATIN1_ERRORS, lambda e: (e.object[e.start:e.end].decode("latin-1"), e.end))
+
+
+class ReadStats:
+    # Counters for source reads; worker processes hand theirs back with each result
+    __slots__ = ("files", "bytes_read", "bytes_mapped", "fallbacks")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.files = 0
+        self.bytes_read = 0
+        self.bytes_mapped = 0
+        self.fallbacks = 0
+
+    def take(self) -> Tuple[int, int, int, int]:
+        counts = (self.files, self.bytes_read, self.bytes_mapped, self.fallbacks)
+        self.reset()
+        return counts
+
+    def add(self, counts: Tuple[int, ...]) -> None:
+        if counts:
+            self.files += counts[0]
+            self.bytes_read += counts[1]
+            self.bytes_mapped += counts[2]
+            self.fallbacks += counts[3]
+
+    def as_dict(self) -> Dict[str, int]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+def sniff_encoding(head: bytes) -> Tuple[str, int]:
+    # (codec, BOM length) from the first bytes of a file
+    for bom, codec in _BOMS:
+        if head.startswith(bom):
+            return codec, len(bom)
+    # BOM-less UTF-16: ASCII markup/code leaves every other byte NUL
+    if len(head) >= 4:
+        if head[0] and not head[1] and head[2] and not head[3]:
+            return "utf-16-le", 0
+        if not head[0] and head[1] and not head[2] and head[3]:
+            return "utf-16-be", 0
+    return "utf-8", 0
+
+
+class SourceBytes:
+    # Raw contents of a source file (a bytes object, or an mmap for large files) plus its sniffed encoding
+    __slots__ = ("path", "data", "encoding", "bom", "stats")
+
+    def __init__(self, path: str, data: Union[bytes, mmap.mmap], encoding: str, bom: int, stats: ReadStats) -> None:
+        self.path = path
+        self.data = data
+        self.encoding = encoding
+        self.bom = bom
+        # The file system's counters, for decode fallbacks
+        self.stats = stats
+
+    @property
+    def ascii_compatible(self) -> bool:
+        # Bytes-level regexes over ASCII patterns only work when ASCII maps to itself
+        return self.encoding == "utf-8"
+
+    def contains(self, word: str) -> bool:
+        return self.data.find(word.encode(self.encoding), self.bom) >= 0
+
+    def _fallback(self, offset: int) -> None:
+        self.stats.fallbacks += 1
+        log.warn("Source failed to decode, used fallback encoding", path=self.path, sniffed=self.encoding, encoding=FALLBACK_ENCODING, offset=offset)
+
+    def text(self) -> str:
+        with memoryview(self.data) as whole, whole[self.bom:] as view:
+            try:
+                text = str(view, self.encoding)
+            except UnicodeDecodeError as e:
+                self._fallback(self.bom + e.start)
+                text = str(view, FALLBACK_ENCODING, _LATIN1_ERRORS)
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    def iter_text(self, chunk_size: int = 1 << 16) -> Iterator[str]:
+        # Incremental decode for streaming consumers; newlines are left as-is (XML parsers normalize them).
+        # A decode error switches the rest of the file, from the first undecoded byte, to the fallback.
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        data = self.data
+        pos, end = self.bom, len(data)
+        while pos < end:
+            chunk = data[pos:pos + chunk_size]
+            try:
+                out = decoder.decode(chunk, final=pos + chunk_size >= end)
+            except UnicodeDecodeError as e:
+                # Bytes held over from the previous chunk come first in e's positions
+                start = pos - len(decoder.getstate()[0])
+                pos = start + e.start
+                self._fallback(pos)
+                decoder = codecs.getincrementaldecoder(FALLBACK_ENCODING)(_LATIN1_ERRORS)
+                if e.start:
+                    yield str(data[start:pos], self.encoding)
+                continue
+            pos += chunk_size
+            if out:
+                yield out
+
+
+def _ext(filename: str) -> str:
+    dot = filename.rfind(".")
+    return filename[dot:] if dot >= 0 else ""
+
+
+# Files under a root, bucketed by their last extension and kept in os.walk order
+class FileIndex:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        # ext -> [(dir ordinal, path)]
+        self._buckets: Dict[str, List[Tuple[int, str]]] = {}
+        self._count = 0
+        # Directories visited, in scan order (their mtimes reveal added/removed files)
+        self.dirs: List[str] = []
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, dir_no: int, path: str) -> None:
+        self._buckets.setdefault(_ext(os.path.basename(path)), []).append((dir_no, path))
+        self._count += 1
+
+    def subset(self, root: str, exclude: Iterable[str] = ()) -> "FileIndex":
+        # Files under root, minus those under any excluded (nested) root; no filesystem access
+        prefix = os.path.join(root, "")
+        skip = tuple(os.path.join(e, "") for e in exclude)
+        sub = FileIndex(root)
+        for ext, bucket in self._buckets.items():
+            kept = [e for e in bucket if e[1].startswith(prefix) and not e[1].startswith(skip)]
+            if kept:
+                sub._buckets[ext] = kept
+                sub._count += len(kept)
+        sub.dirs = [d for d in self.dirs if (d == root or d.startswith(prefix)) and not os.path.join(d, "").startswith(skip)]
+        return sub
+
+    def _match(self, pat: str) -> List[Tuple[int, str]]:
+        if pat.startswith("*."):
+            suffix = pat[1:]
+            bucket = self._buckets.get(_ext(suffix), [])
+            if suffix.count(".") == 1:
+                return bucket
+            return [e for e in bucket if e[1].endswith(suffix)]
+        bucket = self._buckets.get(_ext(pat), [])
+        return [e for e in bucket if os.path.basename(e[1]) == pat]
+
+    def find(self, patterns: Iterable[str]) -> List[str]:
+        patterns = list(patterns)
+        if len(patterns) == 1:
+            return [p for _, p in self._match(patterns[0])]
+        # Same ordering as find_files: per directory, then per pattern
+        keyed = []
+        for pat_no, pat in enumerate(patterns):
+            for file_no, (dir_no, path) in enumerate(self._match(pat)):
+                keyed.append((dir_no, pat_no, file_no, path))
+        keyed.sort()
+        return [k[3] for k in keyed]
+
+
+class FileSystem(ABC):
+    # Where a conversion reads and writes: subclasses provide the primitives, the helpers below build on them.
+    # shared: other processes see the same files, so worker pools (and compileall) can be used
+    shared = True
+
+    def __init__(self) -> None:
+        self.stats = ReadStats()
+
+    # Primitives; missing files raise OSError (FileNotFoundError) like the os functions
+    @abstractmethod
+    def open_read(self, path: str) -> BinaryIO:
+        ...
+
+    @abstractmethod
+    def open_write(self, path: str) -> BinaryIO:
+        ...
+
+    @abstractmethod
+    def stat(self, path: str) -> Tuple[int, int]:
+        # (mtime_ns, size) of a file; directories have an mtime that changes when entries come and go
+        ...
+
+    @abstractmethod
+    def isfile(self, path: str) -> bool:
+        ...
+
+    @abstractmethod
+    def isdir(self, path: str) -> bool:
+        ...
+
+    @abstractmethod
+    def remove(self, path: str) -> None:
+        ...
+
+    @abstractmethod
+    def replace(self, src: str, dst: str) -> None:
+        ...
+
+    @abstractmethod
+    def makedirs(self, path: str) -> None:
+        ...
+
+    @abstractmethod
+    def rmtree(self, path: str) -> None:
+        ...
+
+    @abstractmethod
+    def listdir(self, path: str) -> List[str]:
+        ...
+
+    @abstractmethod
+    def scandir(self, path: str) -> List[Tuple[str, str, bool]]:
+        # (name, path, is_dir) of a directory's entries; symlinked directories are left out
+        ...
+
+    @abstractmethod
+    def load(self, path: str) -> Union[bytes, mmap.mmap]:
+        # Whole contents; an mmap (which the caller closes) where mapping beats copying
+        ...
+
+    # Helpers
+    def exists(self, path: str) -> bool:
+        return self.isfile(path) or self.isdir(path)
+
+    def getsize(self, path: str) -> int:
+        return self.stat(path)[1]
+
+    def ensure_dir(self, path: str) -> None:
+        self.makedirs(path)
+
+    def ensure_empty_dir(self, path: str) -> None:
+        if self.exists(path):
+            self.rmtree(path)
+        self.makedirs(path)
+
+    def write_text(self, path: str, content: str) -> None:
+        # Text mode newline translation, as open(path, "w") would do
+        if os.linesep != "\n":
+            content = content.replace("\n", os.linesep)
+        self.ensure_dir(os.path.dirname(path) or ".")
+        with self.open_write(path) as f:
+            f.write(content.encode("utf-8"))
+
+    def write_text_if_changed(self, path: str, content: str) -> bool:
+        # Same bytes write_text would produce (text mode newline translation)
+        if os.linesep != "\n":
+            content = content.replace("\n", os.linesep)
+        data = content.encode("utf-8")
+        try:
+            if self.getsize(path) == len(data):
+                with self.open_read(path) as f:
+                    if f.read() == data:
+                        return False
+        except OSError:
+            pass
+        self.ensure_dir(os.path.dirname(path) or ".")
+        with self.open_write(path) as f:
+            f.write(data)
+        return True
+
+    def _open_tmp(self, tmp: str, old, prefix: int):
+        self.ensure_dir(os.path.dirname(tmp) or ".")
+        out = self.open_write(tmp)
+        if old is not None:
+            old.seek(0)
+            while prefix:
+                block = old.read(min(prefix, 1 << 20))
+                out.write(block)
+                prefix -= len(block)
+        return out
+
+    def write_chunks_if_changed(self, path: str, chunks: Iterable[str]) -> bool:
+        # write_text_if_changed for output produced piece by piece: chunks are compared against the existing file
+        # as they arrive and nothing is held beyond the write buffer. The file is only opened for writing at the
+        # first difference (after copying the matching prefix), so unchanged outputs are never touched and changed
+        # ones start reaching disk before the producer has finished.
+        crlf = os.linesep != "\n"
+        try:
+            old = self.open_read(path)
+        except OSError:
+            old = None
+        out = None
+        tmp = path + ".kite-tmp"
+        same = 0
+        try:
+            for chunk in chunks:
+                if crlf:
+                    chunk = chunk.replace("\n", os.linesep)
+                data = chunk.encode("utf-8")
+                if out is None and old is not None:
+                    if old.read(len(data)) == data:
+                        same += len(data)
+                        continue
+                    out = self._open_tmp(tmp, old, same)
+                elif out is None:
+                    out = self._open_tmp(tmp, None, 0)
+                out.write(data)
+            if out is None:
+                if old is not None and old.read(1) == b"":
+                    return False
+                # Output is a strict prefix of the old file (or there was no file and no output)
+                out = self._open_tmp(tmp, old, same)
+            out.close()
+            if old is not None:
+                old.close()
+                old = None
+            self.replace(tmp, path)
+            return True
+        except BaseException:
+            if out is not None:
+                out.close()
+                try:
+                    self.remove(tmp)
+                except OSError:
+                    pass
+            raise
+        finally:
+            if old is not None:
+                old.close()
+
+    def file_digest(self, path: str) -> str:
+        h = hashlib.sha256()
+        with self.open_read(path) as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    @contextmanager
+    def open_source(self, path: str) -> Iterator[SourceBytes]:
+        # Only valid inside the with block: large files may be mapped and the mapping is closed on exit
+        data = self.load(path)
+        self.stats.files += 1
+        if isinstance(data, mmap.mmap):
+            self.stats.bytes_mapped += len(data)
+            with data:
+                yield SourceBytes(path, data, *sniff_encoding(data[:4]), self.stats)
+        else:
+            self.stats.bytes_read += len(data)
+            yield SourceBytes(path, data, *sniff_encoding(data[:4]), self.stats)
+
+    def read_text(self, path: str) -> str:
+        with self.open_source(path) as src:
+            return src.text()
+
+    def scan_tree(self, root: str, prune: Optional[Iterable[str]] = DEFAULT_PRUNE_DIRS) -> FileIndex:
+        pruned = frozenset(n.lower() for n in (prune or ()))
+        index = FileIndex(root)
+        stack = [root]
+        dir_no = 0
+        while stack:
+            top = stack.pop()
+            subdirs: List[str] = []
+            try:
+                entries = self.scandir(top)
+            except OSError:
+                continue
+            for name, path, is_dir in entries:
+                if not is_dir:
+                    index.add(dir_no, path)
+                elif name.lower() not in pruned:
+                    subdirs.append(path)
+            index.dirs.append(top)
+            dir_no += 1
+            # Reverse so the stack yields subdirectories in listing order (top-down like os.walk)
+            stack.extend(reversed(subdirs))
+        return index
+
+    def find_files(self, root: str, patterns: List[str], prune: Optional[Iterable[str]] = DEFAULT_PRUNE_DIRS) -> List[str]:
+        return self.scan_tree(root, prune=prune).find(patterns)
+
+
+class DiskFS(FileSystem):
+    def open_read(self, path: str) -> BinaryIO:
+        return open(path, "rb")
+
+    def open_write(self, path: str) -> BinaryIO:
+        return open(path, "wb", buffering=WRITE_BUFFER)
+
+    def stat(self, path: str) -> Tuple[int, int]:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def isfile(self, path: str) -> bool:
+        return os.path.isfile(path)
+
+    def isdir(self, path: str) -> bool:
+        return os.path.isdir(path)
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def remove(self, path: str) -> None:
+        os.remove(path)
+
+    def replace(self, src: str, dst: str) -> None:
+        os.replace(src, dst)
+
+    def makedirs(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+
+    def rmtree(self, path: str) -> None:
         shutil.rmtree(path)
-    os.makedirs(path, exist_ok=True)
-
-
-def write_text(path: str, content: str) -> None:
-    ensure_dir(os.path.dirname(path) or ".")
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
-
-
-def read_text(path: str) -> str:
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
-
-
-def find_files(root: str, patterns: List[str]) -> List[str]:
-    matches: List[str] = []
-    for dirpath, _, filenames in os.walk(root):
-        for pat in patterns:
-            # naive glob match
-            if pat.startswith("*."):
-                ext = pat[1:]
-                for fn in filenames:
-                    if fn.endswith(ext):
-                        matches.append(os.path.join(dirpath, fn))
-            else:
-                for fn in filenames:
-                    if fn == pat:
-                        matches.append(os.path.join(dirpath, fn))
-    return matches
+
+    def listdir(self, path: str) -> List[str]:
+        return os.listdir(path)
+
+    def scandir(self, path: str) -> List[Tuple[str, str, bool]]:
+        out = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir and entry.is_symlink():
+                    continue
+                out.append((entry.name, entry.path, is_dir))
+        return out
+
+    def load(self, path: str) -> Union[bytes, mmap.mmap]:
+        # Sources of MMAP_MIN_SIZE or more are mapped instead of read into a bytes copy
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < MMAP_MIN_SIZE:
+                return f.read()
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __reduce__(self):
+        # Unpickles (in worker processes) as that process's DISK
+        return _disk, ()
+
+
+class _MemoryFile(io.BytesIO):
+    # Lands in its MemoryFS when closed, as a file written to disk would
+    def __init__(self, fs: "MemoryFS", key: str) -> None:
+        super().__init__()
+        self.fs = fs
+        self.key = key
+
+    def close(self) -> None:
+        if not self.closed:
+            self.fs._store(self.key, self.getvalue())
+        super().close()
+
+
+class MemoryFS(FileSystem):
+    # Files in a dict, keyed by normalized absolute path; one instance per thread
+    shared = False
+
+    def __init__(self, files: Optional[Mapping[str, Union[str, bytes]]] = None) -> None:
+        super().__init__()
+        self.files: Dict[str, bytes] = {}
+        # Directory -> {child path: is a directory}, so listing one doesn't scan every stored path
+        self.dirs: Dict[str, Dict[str, bool]] = {}
+        self._mtimes: Dict[str, int] = {}
+        # Writes get increasing mtimes, so (mtime, size) stamps change when contents do; like on disk, a directory's
+        # changes when an entry is added or removed
+        self._clock = itertools.count(1)
+        for path, data in (files or {}).items():
+            self.put(path, data)
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normpath(os.path.abspath(path))
+
+    def _missing(self, path: str) -> OSError:
+        return FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+
+    def _store(self, key: str, data: bytes) -> None:
+        parent = os.path.dirname(key)
+        self._add_dirs(parent)
+        if key not in self.dirs[parent]:
+            self.dirs[parent][key] = False
+            self._mtimes[parent] = next(self._clock)
+        self.files[key] = data
+        self._mtimes[key] = next(self._clock)
+
+    def _add_dirs(self, key: str) -> None:
+        child = None
+        while True:
+            entries = self.dirs.get(key)
+            made = entries is None
+            if made:
+                entries = self.dirs[key] = {}
+            if made or child is not None:
+                self._mtimes[key] = next(self._clock)
+            if child is not None:
+                entries[child] = True
+            parent = os.path.dirname(key)
+            if not made or parent == key:
+                break
+            child, key = key, parent
+
+    def put(self, path: str, data: Union[str, bytes]) -> None:
+        self._store(self._key(path), data.encode("utf-8") if isinstance(data, str) else bytes(data))
+
+    def export(self, root: str) -> Dict[str, bytes]:
+        # Files under root as {"/"-separated relative path: contents}
+        prefix = os.path.join(self._key(root), "")
+        return {key[len(prefix):].replace(os.sep, "/"): data for key, data in sorted(self.files.items()) if key.startswith(prefix)}
+
+    def open_read(self, path: str) -> BinaryIO:
+        data = self.files.get(self._key(path))
+        if data is None:
+            raise self._missing(path)
+        return io.BytesIO(data)
+
+    def open_write(self, path: str) -> BinaryIO:
+        key = self._key(path)
+        if key in self.dirs:
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        return _MemoryFile(self, key)
+
+    def stat(self, path: str) -> Tuple[int, int]:
+        key = self._key(path)
+        if key in self.files:
+            return self._mtimes[key], len(self.files[key])
+        if key in self.dirs:
+            return self._mtimes[key], len(self.dirs[key])
+        raise self._missing(path)
+
+    def isfile(self, path: str) -> bool:
+        return self._key(path) in self.files
+
+    def isdir(self, path: str) -> bool:
+        return self._key(path) in self.dirs
+
+    def remove(self, path: str) -> None:
+        key = self._key(path)
+        if self.files.pop(key, None) is None:
+            raise self._missing(path)
+        del self._mtimes[key]
+        parent = os.path.dirname(key)
+        del self.dirs[parent][key]
+        self._mtimes[parent] = next(self._clock)
+
+    def replace(self, src: str, dst: str) -> None:
+        key = self._key(src)
+        data = self.files.get(key)
+        if data is None:
+            raise self._missing(src)
+        self.remove(src)
+        self._store(self._key(dst), data)
+
+    def makedirs(self, path: str) -> None:
+        self._add_dirs(self._key(path))
+
+    def rmtree(self, path: str) -> None:
+        key = self._key(path)
+        prefix = os.path.join(key, "")
+        for f in [f for f in self.files if f.startswith(prefix)]:
+            del self.files[f]
+            del self._mtimes[f]
+        for d in [d for d in self.dirs if d.startswith(prefix)]:
+            del self.dirs[d]
+            del self._mtimes[d]
+        if self.dirs.pop(key, None) is not None:
+            del self._mtimes[key]
+            parent = os.path.dirname(key)
+            if parent in self.dirs and self.dirs[parent].pop(key, None) is not None:
+                self._mtimes[parent] = next(self._clock)
+
+    def listdir(self, path: str) -> List[str]:
+        return [name for name, _path, _is_dir in self.scandir(path)]
+
+    def scandir(self, path: str) -> List[Tuple[str, str, bool]]:
+        children = self.dirs.get(self._key(path))
+        if children is None:
+            raise self._missing(path)
+        return sorted((os.path.basename(p), p, is_dir) for p, is_dir in children.items())
+
+    def load(self, path: str) -> bytes:
+        data = self.files.get(self._key(path))
+        if data is None:
+            raise self._missing(path)
+        return data
+
+
+def _disk() -> DiskFS:
+    return DISK
+
+
+# The disk, and shorthands for code that only ever works on it
+DISK = DiskFS()
+read_stats = DISK.stats
+ensure_dir = DISK.ensure_dir
+ensure_empty_dir = DISK.ensure_empty_dir
+write_text = DISK.write_text
+write_text_if_changed = DISK.write_text_if_changed
+write_chunks_if_changed = DISK.write_chunks_if_changed
+file_digest = DISK.file_digest
+open_source = DISK.open_source
+read_text = DISK.read_text
+scan_tree = DISK.scan_tree
+find_files = DISK.find_files
@@ -1,14 +1,54 @@
+import json
+import sys
+from typing import Any
+
+# Level name -> severity; messages below the configured level are dropped before any formatting
+LEVELS = {"debug": 10, "info": 20, "warn": 30, "error": 40}
+LOG_FORMATS = ("text", "json")
+
+_TAGS = {"debug": "[Kite:DEBUG] ", "info": "[Kite] ", "warn": "[Kite:WARN] ", "error": "[Kite:ERROR] "}
+
+
+def _dropped(msg: str, **kwargs: Any) -> None:
+    pass
+
+
 class _Log:
-    def info(self, msg: str, **kwargs):
-        parts = [msg] + [f"{k}={v}" for k, v in kwargs.items()]
-        print("[Kite] " + ", ".join(parts))
+    # debug/info/warn/error are bound per level by configure(): a disabled level is a no-op function, so
+    # leaving log calls in hot paths costs one call. Guard expensive arguments with enabled().
+    def __init__(self) -> None:
+        self.configure()
+
+    def configure(self, level: str = "info", fmt: str = "text") -> None:
+        self.level = level
+        self.fmt = fmt
+        for name, severity in LEVELS.items():
+            if severity < LEVELS[level]:
+                setattr(self, name, _dropped)
+            elif fmt == "json":
+                setattr(self, name, self._json_emitter(name))
+            else:
+                setattr(self, name, self._text_emitter(name))
+
+    def enabled(self, level: str) -> bool:
+        return LEVELS[level] >= LEVELS[self.level]
+
+    @staticmethod
+    def _text_emitter(name: str):
+        tag = _TAGS[name]
 
-    def warn(self, msg: str, **kwargs):
-        parts = [msg] + [f"{k}={v}" for k, v in kwargs.items()]
-        print("[Kite:WARN] " + ", ".join(parts))
+        def emit(msg: str, **kwargs: Any) -> None:
+            parts = [msg] + [f"{k}={v}" for k, v in kwargs.items()]
+            print(tag + ", ".join(parts))
+        return emit
 
-    def error(self, msg: str, **kwargs):
-        parts = [msg] + [f"{k}={v}" for k, v in kwargs.items()]
-        print("[Kite:ERROR] " + ", ".join(parts))
+    @staticmethod
+    def _json_emitter(name: str):
+        # One object per line: {"level", "msg", fields...}; values that aren't JSON types are written as str()
+        def emit(msg: str, **kwargs: Any) -> None:
+            record = {"level": name, "msg": msg}
+            record.update(kwargs)
+            sys.stdout.write(json.dumps(record, default=str) + "\n")
+        return emit
 
 log = _Log()
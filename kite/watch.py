@@ -0,0 +1,159 @@
+import os
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .converter import Converter, FormResult
+from .utils.log import log
+
+Stamp = Tuple[int, int]
+
+
+class Watcher:
+    # Polls the input tree and re-converts only the forms whose files changed
+    def __init__(self, converter: Converter, input_path: str, output_dir: str, main_window: Optional[str] = None, interval: float = 0.1, debounce: float = 0.2) -> None:
+        self.converter = converter
+        # Parsed trees of every form stay in memory, so a rebuild only re-parses what changed
+        converter.keep_nodes = True
+        self.fs = converter.fs
+        input_path = os.path.abspath(input_path)
+        self.input_root = input_path if self.fs.isdir(input_path) else os.path.dirname(input_path)
+        self.output_dir = os.path.abspath(output_dir)
+        self.app_pkg_dir = os.path.join(self.output_dir, "app")
+        self.main_window = main_window
+        self.interval = interval
+        self.debounce = debounce
+        self.kind = ""
+        self.sources: List[Tuple[str, str]] = []
+        self.results: Dict[str, FormResult] = {}
+        # Per source: its own stamp plus those of the .resx files its images come from
+        self.stamps: Dict[str, Tuple[Any, ...]] = {}
+        self.dir_stamps: Dict[str, Optional[Stamp]] = {}
+        # App.xaml and the dictionaries the ResourceIndex read that aren't window sources themselves
+        self.resource_files: List[str] = []
+
+    def _stamp(self, path: str) -> Optional[Stamp]:
+        try:
+            return self.fs.stat(path)
+        except OSError:
+            return None
+
+    def _stamps(self, path: str) -> Tuple[Any, ...]:
+        companions = self.converter.resx_files(path) if path.endswith(".cs") else []
+        return (self._stamp(path),) + tuple((f, self._stamp(f)) for f in companions)
+
+    def _rescan(self) -> None:
+        index = self.fs.scan_tree(self.input_root, prune=self.converter.prune_dirs)
+        self.dir_stamps = {d: self._stamp(d) for d in index.dirs}
+        self.kind = self.converter._detect_kind(index)
+        self.sources = self.converter._sources(index, self.kind)
+        designers = [self.results[p] for _, p in self.sources if p in self.results]
+        if self.converter.needs_code_fallback(self.kind, designers):
+            self.sources += self.converter._code_sources(index)
+        files = [p for p in index.find(["*.xaml"]) if os.path.basename(p).lower().startswith("app.")] if self.kind == "wpf" else []
+        res = self.converter.resources.get(self.app_pkg_dir)
+        if res is not None:
+            files += res.files
+        known = {p for _, p in self.sources}
+        self.resource_files = [p for p in dict.fromkeys(files) if p not in known]
+
+    def _tracked(self) -> List[str]:
+        return [p for _, p in self.sources] + self.resource_files
+
+    def load(self) -> None:
+        # Stamp before converting so edits made during the cold run are picked up by the first poll
+        self._rescan()
+        self.stamps = {p: self._stamps(p) for p in self._tracked()}
+        results = self.converter.convert(self.input_root, self.output_dir, self.main_window)
+        self.results = {r.source: r for r in results}
+        self._rescan()
+        # Dictionaries only found by reading App.xaml
+        for p in self.resource_files:
+            if p not in self.stamps:
+                self.stamps[p] = self._stamps(p)
+
+    def poll(self) -> Set[str]:
+        changed: Set[str] = set()
+        if any(self._stamp(d) != st for d, st in self.dir_stamps.items()):
+            before = {p for _, p in self.sources}
+            self._rescan()
+            changed |= before ^ {p for _, p in self.sources}
+        for p in self._tracked():
+            st = self._stamps(p)
+            if st != self.stamps.get(p):
+                self.stamps[p] = st
+                changed.add(p)
+        return changed
+
+    def rebuild(self, paths: Set[str]) -> None:
+        started = time.perf_counter()
+        kinds = {p: pk for pk, p in self.sources}
+        stale = {r.fname for r in self.results.values() if r.fname}
+        fallback = self.converter.needs_code_fallback(self.kind, [r for r in self.results.values() if r.parse_kind != "code"])
+        res = self.converter.resources.get(self.app_pkg_dir)
+        if paths & set(self.resource_files) or res is not None and paths & set(res.files):
+            # App.xaml or a theme dictionary changed: load() re-reads the ResourceIndex, and its new fingerprint
+            # changes the digest of, and so regenerates, every window
+            self.load()
+            return
+        removed = [p for p in self.results if p not in kinds]
+        for p in removed:
+            del self.results[p]
+        touched: Set[str] = set()
+        for p in sorted(paths):
+            if p not in kinds:
+                continue
+            try:
+                digest = self.converter.source_digest(p, self.app_pkg_dir)
+            except OSError:
+                continue
+            old = self.results.get(p)
+            if old is not None and old.digest == digest and not old.error:
+                continue
+            res = self.converter.convert_file(kinds[p], p, self.app_pkg_dir, digest, keep_node=True)
+            self.results[p] = res
+            touched.add(p)
+        designers = [r for r in self.results.values() if r.parse_kind != "code"]
+        if self.converter.needs_code_fallback(self.kind, designers) != fallback:
+            # The code-behind fallback switched on or off; the set of windows changes wholesale
+            self.load()
+            return
+        ordered = [self.results[p] for _, p in self.sources if p in self.results]
+        # A changed form may share its window file with another one; serial order says the last one wins
+        producers: Dict[str, List[FormResult]] = {}
+        for r in ordered:
+            if r.fname:
+                producers.setdefault(r.fname, []).append(r)
+        for rs in producers.values():
+            if len(rs) > 1 and any(r.source in touched for r in rs) and rs[-1].source not in touched:
+                last = rs[-1]
+                if last.node is not None:
+                    self.converter.generate_result(last, last.node, self.app_pkg_dir)
+                else:
+                    self.results[last.source] = self.converter.convert_file(last.parse_kind, last.source, self.app_pkg_dir, last.digest, keep_node=True)
+                ordered = [self.results[p] for _, p in self.sources if p in self.results]
+        if not touched and not removed:
+            return
+        for r in ordered:
+            r.reused = r.source not in touched
+        try:
+            self.converter.finish(self.input_root, self.output_dir, self.kind, ordered, self.main_window, stale)
+        except RuntimeError as e:
+            log.warn("Nothing to convert", error=e)
+            return
+        log.info("Rebuilt", changed=len(touched), ms=round((time.perf_counter() - started) * 1000, 1))
+
+    def run(self) -> None:
+        self.load()
+        log.info("Watching for changes", input=self.input_root, output=self.output_dir)
+        pending: Set[str] = set()
+        last_change = 0.0
+        while True:
+            changed = self.poll()
+            now = time.monotonic()
+            if changed:
+                pending |= changed
+                last_change = now
+            elif pending and now - last_change >= self.debounce:
+                self.rebuild(pending)
+                pending = set()
+            time.sleep(self.interval)
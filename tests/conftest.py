@@ -0,0 +1,10 @@
+import pytest
+
+from .helpers import designer, write_files
+
+
+@pytest.fixture
+def winforms_src(tmp_path):
+    src = str(tmp_path / "src")
+    write_files(src, {"Form1.Designer.cs": designer("Form1"), "Form2.Designer.cs": designer("Form2")})
+    return src
@@ -0,0 +1,37 @@
+import os
+from typing import Dict
+
+DESIGNER = """namespace Demo
+{{
+    partial class {name}
+    {{
+        private void InitializeComponent()
+        {{
+            this.button1 = new System.Windows.Forms.Button();
+            this.button1.Location = new System.Drawing.Point(10, 20);
+            this.button1.Size = new System.Drawing.Size(75, 23);
+            this.button1.Name = "button1";
+            this.button1.Text = "{text}";
+            this.Controls.Add(this.button1);
+            this.Text = "{name}";
+        }}
+    }}
+}}
+"""
+
+
+def designer(name: str, text: str = "OK") -> str:
+    return DESIGNER.format(name=name, text=text)
+
+
+def write_files(root: str, files: Dict[str, str]) -> None:
+    for rel, text in files.items():
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+
+
+def read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
@@ -0,0 +1,96 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import kite
+from kite.batch import convert_batch
+from kite.converter import Converter
+from kite.utils.fs import MemoryFS
+
+from .helpers import designer, write_files
+
+
+def _disk_tree(root):
+    out = {}
+    for dirpath, _dirs, files in os.walk(root):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as f:
+                out[os.path.relpath(path, root).replace(os.sep, "/")] = f.read()
+    return out
+
+
+def test_matches_disk_conversion(tmp_path):
+    # One form: with several, window order follows discovery, and the disk lists directories in no set order
+    src, out = str(tmp_path / "src"), str(tmp_path / "out")
+    write_files(src, {"Form1.Designer.cs": designer("Form1")})
+    Converter(jobs=1).convert(src, out)
+    disk = _disk_tree(out)
+    memory = kite.convert({"Form1.Designer.cs": designer("Form1").encode("utf-8")})
+    assert sorted(memory) == sorted(disk)
+    for rel in disk:
+        # The manifest records source paths, which differ
+        if rel != ".kite.xom":
+            assert memory[rel] == disk[rel], rel
+
+
+def test_nested_and_backslash_paths():
+    out = kite.convert({"Forms\\Main.Designer.cs": designer("Main"), "Forms/Other.Designer.cs": designer("Other")})
+    assert {"main.py", "app/window_Main.py", "app/window_Other.py"} <= set(out)
+
+
+def test_options_are_passed_on():
+    out = kite.convert({"Form1.Designer.cs": designer("Form1")}, emit="table", epat="indexed")
+    assert b"SPEC = json.loads(" in out["app/window_Form1.py"]
+    assert out["serial.epat"].startswith(b"KITE-EPAT 1")
+
+
+def test_path_outside_the_project():
+    with pytest.raises(ValueError):
+        kite.convert({"../Form1.Designer.cs": designer("Form1")})
+
+
+def test_no_forms():
+    with pytest.raises(RuntimeError):
+        kite.convert({"README.txt": "nothing here"})
+
+
+def test_concurrent_calls():
+    def run(i):
+        return kite.convert({"Form1.Designer.cs": designer("Form1", text=f"Call {i}")})
+    with ThreadPoolExecutor(8) as pool:
+        outs = list(pool.map(run, range(16)))
+    for i, out in enumerate(outs):
+        assert f"Call {i}".encode("ascii") in out["app/window_Form1.py"]
+
+
+def test_compile_needs_a_shared_fs():
+    with pytest.raises(ValueError):
+        Converter(compile=True, fs=MemoryFS())
+
+
+def test_batch_solution_in_memory():
+    fs = MemoryFS({
+        "/w/App.sln": 'Project("{FAE04EC0}") = "One", "One\\One.csproj", "{1}"\nProject("{FAE04EC0}") = "Two", "Two\\Two.csproj", "{2}"\n',
+        "/w/One/One.csproj": "<Project/>",
+        "/w/One/Form1.Designer.cs": designer("Form1"),
+        "/w/Two/Two.csproj": "<Project/>",
+        "/w/Two/Form2.Designer.cs": designer("Form2"),
+    })
+    convert_batch(Converter(fs=fs), "/w/App.sln", "/out")
+    out = fs.export("/out")
+    assert "One/app/window_Form1.py" in out and "Two/app/window_Form2.py" in out
+
+
+def test_memory_fs_directories():
+    fs = MemoryFS({"/p/a/x.cs": b"1", "/p/a/b/y.cs": b"2", "/p/z.cs": b"3"})
+    assert fs.scandir("/p") == [("a", "/p/a", True), ("z.cs", "/p/z.cs", False)]
+    assert fs.listdir("/p/a") == ["b", "x.cs"]
+    assert sorted(fs.scan_tree("/p").find(["*.cs"])) == ["/p/a/b/y.cs", "/p/a/x.cs", "/p/z.cs"]
+    fs.remove("/p/a/x.cs")
+    assert fs.listdir("/p/a") == ["b"]
+    fs.rmtree("/p/a")
+    assert fs.listdir("/p") == ["z.cs"] and not fs.isdir("/p/a/b")
+    with pytest.raises(FileNotFoundError):
+        fs.scandir("/p/a")
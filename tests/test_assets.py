@@ -0,0 +1,160 @@
+import base64
+import hashlib
+import os
+import tkinter as tk
+
+import pytest
+
+import kite
+from kite import runtime
+from kite.assets import AssetStore
+from kite.parsers.resx import extract_images
+from kite.utils.fs import MemoryFS
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(64))
+GIF = b"GIF89a" + bytes(range(32))
+BITMAP = "System.Drawing.Bitmap, System.Drawing, Version=4.0.0.0, Culture=neutral, PublicKeyToken=b03f5f7f11d50a3a"
+
+
+def _embedded(name, data, width=76):
+    text = base64.b64encode(data).decode("ascii")
+    lines = "\n        ".join(text[i:i + width] for i in range(0, len(text), width))
+    return (f'  <data name="{name}" type="{BITMAP}" mimetype="application/x-microsoft.net.object.bytearray.base64">\n'
+            f'    <value>\n        {lines}\n    </value>\n  </data>\n')
+
+
+def _resx(*entries):
+    return '<?xml version="1.0" encoding="utf-8"?>\n<root>\n' + "".join(entries) + "</root>\n"
+
+
+def _asset_name(data, ext):
+    return hashlib.sha256(data).hexdigest()[:AssetStore.HASH_CHARS] + ext
+
+
+def test_extract_images():
+    fs = MemoryFS({
+        "/src/Form1.resx": _resx(
+            _embedded("pictureBox1.Image", PNG),
+            _embedded("button1.Image", GIF),
+            _embedded("unwanted.Image", b"BM" + bytes(10)),
+            f'  <data name="logo" type="System.Resources.ResXFileRef, System.Windows.Forms">\n'
+            f'    <value>..\\Resources\\logo.png;{BITMAP}</value>\n  </data>\n',
+            '  <data name="label1.Text"><value>Hello</value></data>\n',
+            f'  <data name="broken.Image" type="{BITMAP}" mimetype="application/x-microsoft.net.object.bytearray.base64"><value>a</value></data>\n',
+        ).encode("utf-8"),
+        "/Resources/logo.png": PNG,
+    })
+    store = AssetStore("/out/app/assets", fs)
+    found = extract_images("/src/Form1.resx", {"pictureBox1.Image", "button1.Image", "logo", "label1.Text", "broken.Image", "missing"}, store)
+    # The embedded PNG and the file it also exists as share one asset
+    assert found == {"pictureBox1.Image": _asset_name(PNG, ".png"), "button1.Image": _asset_name(GIF, ".gif"), "logo": _asset_name(PNG, ".png")}
+    assert sorted(fs.listdir("/out/app/assets")) == sorted([_asset_name(PNG, ".png"), _asset_name(GIF, ".gif")])
+    assert fs.load("/out/app/assets/" + _asset_name(PNG, ".png")) == PNG
+
+
+@pytest.mark.parametrize("width", [1, 3, 76])
+def test_base64_split_anywhere(width):
+    fs = MemoryFS({"/src/Form1.resx": _resx(_embedded("a", PNG, width)).encode("utf-8")})
+    assert extract_images("/src/Form1.resx", {"a"}, AssetStore("/assets", fs)) == {"a": _asset_name(PNG, ".png")}
+
+
+def test_asset_store_names_by_content():
+    fs = MemoryFS()
+    store = AssetStore("/assets", fs)
+    names = []
+    for data in (PNG, PNG, b"\xff\xd8\xff" + bytes(4), b"plain"):
+        w = store.writer()
+        # Written in pieces, as a decoder would
+        for i in range(0, len(data), 5):
+            w.write(data[i:i + 5])
+        names.append(w.commit())
+    assert names == [_asset_name(PNG, ".png"), _asset_name(PNG, ".png"), _asset_name(b"\xff\xd8\xff" + bytes(4), ".jpg"), _asset_name(b"plain", ".bin")]
+    assert store.writer().commit() is None
+    # No temporary files left behind
+    assert sorted(fs.listdir("/assets")) == sorted(set(names))
+    assert store.prune({names[0]}) == 2
+    assert fs.listdir("/assets") == [names[0]]
+
+
+def test_conversion_writes_shared_assets():
+    designer = """namespace Demo
+{{
+    partial class {name}
+    {{
+        private void InitializeComponent()
+        {{
+            System.ComponentModel.ComponentResourceManager resources = new System.ComponentModel.ComponentResourceManager(typeof({name}));
+            this.pictureBox1 = new System.Windows.Forms.PictureBox();
+            this.pictureBox1.Image = ((System.Drawing.Image)(resources.GetObject("pictureBox1.Image")));
+            this.pictureBox1.Location = new System.Drawing.Point(10, 10);
+            this.pictureBox1.Name = "pictureBox1";
+            this.Controls.Add(this.pictureBox1);
+            this.Text = "{name}";
+        }}
+    }}
+}}
+"""
+    out = kite.convert({
+        "Form1.Designer.cs": designer.format(name="Form1"),
+        "Form1.resx": _resx(_embedded("pictureBox1.Image", PNG)),
+        "Form2.Designer.cs": designer.format(name="Form2"),
+        "Form2.resx": _resx(_embedded("pictureBox1.Image", PNG)),
+    })
+    name = _asset_name(PNG, ".png")
+    assert [p for p in out if p.startswith("app/assets/")] == ["app/assets/" + name]
+    for window in ("app/window_Form1.py", "app/window_Form2.py"):
+        assert f"widgets.image(self, __file__, {name!r})".encode("ascii") in out[window]
+
+
+class _Interp:
+    pass
+
+
+class _Widget:
+    def __init__(self, interp):
+        self.tk = interp
+
+
+def test_image_cache_per_interpreter(tmp_path, monkeypatch):
+    made = []
+
+    def photo_image(master=None, file=None):
+        made.append((master, file))
+        return ("image", master.tk, file)
+
+    monkeypatch.setattr(runtime.tk, "PhotoImage", photo_image)
+    monkeypatch.setattr(runtime, "_images", {})
+    source = str(tmp_path / "app" / "window_Form1.py")
+    first, second = _Interp(), _Interp()
+    a, b, c = _Widget(first), _Widget(first), _Widget(second)
+    assert runtime.image(a, source, "x.png") is runtime.image(b, source, "x.png")
+    assert runtime.image(c, source, "x.png") != runtime.image(a, source, "x.png")
+    path = os.path.join(str(tmp_path / "app"), "assets", "x.png")
+    # Loaded once per interpreter, each time for a widget of that interpreter
+    assert made == [(a, path), (c, path)]
+
+
+def _display():
+    try:
+        tk.Tk().destroy()
+        return True
+    except tk.TclError:
+        return False
+
+
+@pytest.mark.skipif(not _display(), reason="needs a display")
+def test_image_in_two_interpreters(tmp_path, monkeypatch):
+    monkeypatch.setattr(runtime, "_images", {})
+    os.makedirs(str(tmp_path / "assets"))
+    with open(str(tmp_path / "assets" / "dot.gif"), "wb") as f:
+        f.write(base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"))
+    source = str(tmp_path / "window_Form1.py")
+    roots = [tk.Tk(), tk.Tk()]
+    try:
+        images = [runtime.image(root, source, "dot.gif") for root in roots]
+        assert images[0] is not images[1]
+        for root, img in zip(roots, images):
+            tk.Label(root, image=img).pack()
+    finally:
+        for root in roots:
+            root.destroy()
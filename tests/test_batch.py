@@ -0,0 +1,43 @@
+import ntpath
+import os
+import posixpath
+
+from kite import batch
+from kite.batch import convert_batch
+from kite.converter import Converter
+from kite.utils.fs import DiskFS
+
+from .helpers import designer, write_files
+
+CSPROJ = '<Project Sdk="Microsoft.NET.Sdk"></Project>'
+
+
+def test_directory_input_is_crawled_once(tmp_path, monkeypatch):
+    src, out = str(tmp_path / "src"), str(tmp_path / "out")
+    write_files(src, {
+        "A/A.csproj": CSPROJ,
+        "A/Form1.Designer.cs": designer("Form1"),
+        "B/B.csproj": CSPROJ,
+        "B/Form2.Designer.cs": designer("Form2"),
+    })
+    crawled = []
+    scan_tree = DiskFS.scan_tree
+
+    def counting(self, root, *args, **kwargs):
+        crawled.append(root)
+        return scan_tree(self, root, *args, **kwargs)
+
+    monkeypatch.setattr(DiskFS, "scan_tree", counting)
+    projects = convert_batch(Converter(jobs=1), src, out)
+    assert crawled == [src]
+    assert sorted(r.fname for p in projects for r in p.results) == ["window_Form1.py", "window_Form2.py"]
+    assert os.path.isfile(os.path.join(out, "A", "app", "window_Form1.py"))
+    assert os.path.isfile(os.path.join(out, "B", "app", "window_Form2.py"))
+
+
+def test_roots_grouped_by_drive(monkeypatch):
+    # os.path.commonpath raises ValueError for roots on different drives
+    monkeypatch.setattr(posixpath, "splitdrive", ntpath.splitdrive)
+    groups = batch._group_by_drive(["C:\\src\\A", "D:\\work\\B", "c:\\src\\C"])
+    assert groups == {"c:": ["C:\\src\\A", "c:\\src\\C"], "d:": ["D:\\work\\B"]}
+    assert [ntpath.commonpath(g) for g in groups.values()] == ["C:\\src", "D:\\work\\B"]
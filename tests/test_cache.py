@@ -0,0 +1,80 @@
+import os
+
+from kite import cache as cache_mod
+from kite.cache import ParseCache, decode_tree, encode_tree
+from kite.converter import Converter
+from kite.model import walk
+from kite.parsers.winforms import WinFormsParser
+
+from .helpers import designer, write_files
+
+
+def _convert(src, out, cache):
+    # full: skip the manifest so every form goes through the parse cache
+    results = Converter(jobs=1, full=True, cache=cache).convert(src, out)
+    return {os.path.basename(r.source): r for r in results}
+
+
+def _rows(root):
+    return [(n.type, n.name, dict(n.properties), depth) for n, depth in walk(root)]
+
+
+def test_tree_round_trip():
+    root = WinFormsParser().parse_designer_text(designer("Form1"), "Form1")
+    back = decode_tree(encode_tree(root))
+    assert (back.type, back.name, dict(back.properties)) == (root.type, root.name, dict(root.properties))
+    assert _rows(back) == _rows(root)
+
+
+def test_second_run_hits(winforms_src, tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    first = _convert(winforms_src, str(tmp_path / "out"), cache)
+    assert not any(r.cached for r in first.values())
+    second = _convert(winforms_src, str(tmp_path / "out"), cache)
+    assert all(r.cached for r in second.values())
+    assert cache.stats()["entries"] == 2
+
+
+def test_edited_source_misses(winforms_src, tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    _convert(winforms_src, str(tmp_path / "out"), cache)
+    write_files(winforms_src, {"Form1.Designer.cs": designer("Form1", text="Edited")})
+    results = _convert(winforms_src, str(tmp_path / "out"), cache)
+    assert not results["Form1.Designer.cs"].cached
+    assert results["Form2.Designer.cs"].cached
+
+
+def test_parser_change_misses(winforms_src, tmp_path, monkeypatch):
+    cache = ParseCache(str(tmp_path / "cache"))
+    _convert(winforms_src, str(tmp_path / "out"), cache)
+    monkeypatch.setattr(cache_mod, "_parser_hash", "other parser code")
+    results = _convert(winforms_src, str(tmp_path / "out"), cache)
+    assert not any(r.cached for r in results.values())
+
+
+def test_negative_and_error_entries(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    assert cache.get("ab" * 32) is None
+    cache.put("ab" * 32, None)
+    cache.put("cd" * 32, None, "parse: ValueError: bad")
+    assert cache.get("ab" * 32) == (None, None)
+    assert cache.get("cd" * 32) == (None, "parse: ValueError: bad")
+
+
+def test_unreadable_entry_is_dropped(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    key = "ef" * 32
+    cache.put(key, None)
+    with open(cache._path(key), "wb") as f:
+        f.write(b"?garbage")
+    assert cache.get(key) is None
+    assert not os.path.exists(cache._path(key))
+
+
+def test_trim_keeps_under_the_cap(winforms_src, tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"))
+    _convert(winforms_src, str(tmp_path / "out"), cache)
+    size = cache.stats()["bytes"]
+    cache.max_bytes = size - 1
+    assert cache.trim() >= 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
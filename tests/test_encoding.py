@@ -0,0 +1,29 @@
+import pytest
+
+from kite.utils.fs import MemoryFS
+
+PATH = "/src/Form1.Designer.cs"
+
+
+def _decode(data, chunk_size=0):
+    # (text, fallbacks); chunk_size streams through iter_text
+    fs = MemoryFS({PATH: data})
+    with fs.open_source(PATH) as src:
+        text = "".join(src.iter_text(chunk_size)) if chunk_size else src.text()
+    return text, fs.stats.fallbacks
+
+
+def test_utf8_with_bom():
+    assert _decode("\ufeffthis.Text = \"Café\";\r\n".encode("utf-8")) == ("this.Text = \"Café\";\n", 0)
+
+
+def test_cp1252_falls_back():
+    text = "this.Text = \"Café – “quoted”\";"
+    assert _decode(text.encode("cp1252")) == (text, 1)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1 << 16])
+def test_iter_text_keeps_utf8_before_the_bad_byte(chunk_size):
+    # The fallback starts at the first byte that isn't UTF-8, not at the start of its chunk
+    data = ("é" * 5000).encode("utf-8") + "“café”".encode("cp1252")
+    assert _decode(data, chunk_size) == ("é" * 5000 + "“café”", 1)
@@ -0,0 +1,138 @@
+import os
+
+import pytest
+
+from kite.converter import Converter
+from kite.epat import EPAT_FORMATS, EpatFile, EpatWriter, iter_epat, window_line
+from kite.utils.fs import MemoryFS, write_chunks_if_changed
+
+WINDOWS = [
+    ("MainForm", [{"name": "button1", "x": 10, "y": 20}, {"name": "label1", "x": 5, "y": 5}]),
+    ("Settings", [{"name": "button1", "x": 1, "y": 2}, {"name": "checké", "x": 3, "y": 4}]),
+    ("Empty", []),
+]
+
+
+def _write(tmp_path, fmt):
+    path = str(tmp_path / f"serial-{fmt}.epat")
+    write_chunks_if_changed(path, iter_epat(fmt, iter(WINDOWS)))
+    return path
+
+
+@pytest.mark.parametrize("fmt", EPAT_FORMATS)
+def test_round_trip(tmp_path, fmt):
+    with EpatFile(_write(tmp_path, fmt)) as epat:
+        assert epat.indexed == (fmt == "indexed")
+        assert epat.windows() == [name for name, _ in WINDOWS]
+        for name, records in WINDOWS:
+            assert name in epat
+            assert epat.records(name) == records
+        assert epat.get("Missing") is None
+        with pytest.raises(KeyError):
+            epat.records("Missing")
+
+
+@pytest.mark.parametrize("fmt", EPAT_FORMATS)
+def test_element_lookup(tmp_path, fmt):
+    with EpatFile(_write(tmp_path, fmt)) as epat:
+        assert epat.element("button1") == [("MainForm", WINDOWS[0][1][0]), ("Settings", WINDOWS[1][1][0])]
+        assert epat.element("checké") == [("Settings", WINDOWS[1][1][1])]
+        assert epat.element("x") == []
+
+
+def test_indexed_from_memory():
+    fs = MemoryFS()
+    fs.write_chunks_if_changed("/out/serial.epat", iter_epat("indexed", iter(WINDOWS)))
+    with EpatFile("/out/serial.epat", fs) as epat:
+        assert epat.records("Settings") == WINDOWS[1][1]
+
+
+def test_damaged_index(tmp_path):
+    path = _write(tmp_path, "indexed")
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:-25])
+    with pytest.raises(ValueError):
+        EpatFile(path)
+
+
+def test_not_an_epat_file(tmp_path):
+    path = str(tmp_path / "list.epat")
+    with open(path, "w") as f:
+        f.write("[1, 2, 3]")
+    with pytest.raises(ValueError):
+        EpatFile(path)
+
+
+def test_conversion_formats_agree(winforms_src, tmp_path):
+    records = {}
+    for fmt in EPAT_FORMATS:
+        out = str(tmp_path / fmt)
+        Converter(jobs=1, epat=fmt).convert(winforms_src, out)
+        with EpatFile(os.path.join(out, "serial.epat")) as serial, EpatFile(os.path.join(out, "pie.epat")) as pie:
+            assert serial.indexed == (fmt == "indexed")
+            records[fmt] = ({w: serial.records(w) for w in serial.windows()}, {w: pie.records(w) for w in pie.windows()})
+    assert records["json"] == records["indexed"]
+    assert records["json"][0]
+
+
+def test_writer_matches_iter_indexed(tmp_path):
+    path = str(tmp_path / "serial.epat")
+    writer = EpatWriter(path)
+    for name, records in WINDOWS:
+        writer.add(name, window_line(name, records))
+    assert writer.close([name for name, _ in WINDOWS])
+    with open(path, "rb") as f:
+        assert f.read() == "".join(iter_epat("indexed", iter(WINDOWS))).replace("\n", os.linesep).encode("ascii")
+    assert os.listdir(str(tmp_path)) == ["serial.epat"]
+
+
+@pytest.mark.parametrize("fmt", EPAT_FORMATS)
+def test_writer_carries_over_windows(tmp_path, fmt):
+    path = _write(tmp_path, "indexed")
+    writer = EpatWriter(path, fmt)
+    # Arrival order differs from the final order, and MainForm was not regenerated
+    writer.add("Settings", window_line("Settings", [{"name": "ok", "x": 0, "y": 0}]))
+    writer.add("New", window_line("New", []))
+    assert writer.close(["MainForm", "Lost", "New", "Settings"])
+    with EpatFile(path) as epat:
+        assert epat.indexed == (fmt == "indexed")
+        assert epat.windows() == ["MainForm", "Lost", "New", "Settings"]
+        assert epat.records("MainForm") == WINDOWS[0][1]
+        assert epat.records("Lost") == []
+        assert epat.records("Settings") == [{"name": "ok", "x": 0, "y": 0}]
+    assert not os.path.exists(path + ".kite-spool")
+
+
+def test_unchanged_file_is_left_alone(tmp_path):
+    path = _write(tmp_path, "indexed")
+    before = os.stat(path).st_mtime_ns
+    assert not EpatWriter(path).close([name for name, _ in WINDOWS])
+    assert os.stat(path).st_mtime_ns == before
+
+
+def test_reused_windows_are_copied_undecoded(winforms_src, tmp_path, monkeypatch):
+    out = str(tmp_path / "out")
+    Converter(jobs=1, epat="indexed").convert(winforms_src, out)
+    with open(os.path.join(out, "serial.epat"), "rb") as f:
+        first = f.read()
+
+    def no_decoding(self, window):
+        raise AssertionError("records decoded")
+
+    monkeypatch.setattr(EpatFile, "records", no_decoding)
+    results = Converter(jobs=1, epat="indexed").convert(winforms_src, out)
+    assert all(r.reused for r in results)
+    with open(os.path.join(out, "serial.epat"), "rb") as f:
+        assert f.read() == first
+
+
+def test_worker_lines_match_serial(winforms_src, tmp_path):
+    data = {}
+    for jobs in (1, 2):
+        out = str(tmp_path / str(jobs))
+        Converter(jobs=jobs, epat="indexed").convert(winforms_src, out)
+        with open(os.path.join(out, "serial.epat"), "rb") as f, open(os.path.join(out, "pie.epat"), "rb") as g:
+            data[jobs] = (f.read(), g.read())
+    assert data[1] == data[2]
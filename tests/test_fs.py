@@ -0,0 +1,87 @@
+import os
+from typing import List
+
+import pytest
+
+from kite.utils.fs import DEFAULT_PRUNE_DIRS, FileSystem, MemoryFS, scan_tree
+
+from .helpers import write_files
+
+FILES = [
+    "App.sln",
+    "App/App.csproj",
+    "App/App.xaml",
+    "App/MainWindow.xaml",
+    "App/Form1.cs",
+    "App/Form1.Designer.cs",
+    "App/Views/Settings.xaml",
+    "App/Views/Deep/Form2.Designer.cs",
+    "App/Views/Deep/Form2.cs",
+    "Lib/Helper.cs",
+    "Lib/app.config",
+    "App/bin/Debug/Form1.Designer.cs",
+    "App/obj/Generated.xaml",
+    "Lib/.git/hooks/x.cs",
+    "Packages/Third.Designer.cs",
+]
+
+PATTERNS = [["*.Designer.cs"], ["*.cs"], ["*.xaml"], ["app.config"], ["*.xaml", "*.Designer.cs", "*.csproj"]]
+
+
+def walk_find(root: str, patterns: List[str], prune=()) -> List[str]:
+    # find_files as it was: os.walk, then per directory and per pattern
+    pruned = {p.lower() for p in prune}
+    matches: List[str] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d.lower() not in pruned]
+        for pat in patterns:
+            if pat.startswith("*."):
+                matches += [os.path.join(dirpath, fn) for fn in filenames if fn.endswith(pat[1:])]
+            else:
+                matches += [os.path.join(dirpath, fn) for fn in filenames if fn == pat]
+    return matches
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = str(tmp_path / "tree")
+    write_files(root, {rel: "x" for rel in FILES})
+    return root
+
+
+@pytest.mark.parametrize("patterns", PATTERNS)
+def test_same_files_and_order_as_os_walk(tree, patterns):
+    assert scan_tree(tree, prune=None).find(patterns) == walk_find(tree, patterns)
+
+
+@pytest.mark.parametrize("patterns", PATTERNS)
+def test_pruned_directories_are_skipped(tree, patterns):
+    found = scan_tree(tree).find(patterns)
+    assert found == walk_find(tree, patterns, DEFAULT_PRUNE_DIRS)
+    for path in found:
+        parts = {p.lower() for p in os.path.relpath(path, tree).split(os.sep)[:-1]}
+        assert not parts & DEFAULT_PRUNE_DIRS
+
+
+def test_prune_is_case_insensitive(tree):
+    # "Packages" is pruned like "packages"
+    assert not [p for p in scan_tree(tree).find(["*.cs"]) if "Packages" in p]
+    assert [p for p in scan_tree(tree, prune=None).find(["*.cs"]) if "Packages" in p]
+
+
+def test_subset_matches_a_fresh_scan(tree):
+    index = scan_tree(tree)
+    app = os.path.join(tree, "App")
+    for patterns in PATTERNS:
+        assert index.subset(app).find(patterns) == scan_tree(app).find(patterns)
+
+
+def test_primitives_are_abstract():
+    with pytest.raises(TypeError):
+        FileSystem()
+
+    class NoLoad(MemoryFS):
+        load = FileSystem.load
+
+    with pytest.raises(TypeError, match="load"):
+        NoLoad()
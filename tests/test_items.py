@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+import kite
+from kite import runtime
+from kite.converter import Converter
+from kite.generator.tk_generator import SIDECAR_MIN_ITEMS
+from kite.parsers.winforms import _items_pat, _parse_items, _scan_statements, _stmt_items_pat
+
+from .helpers import write_files
+
+ITEMS = r'''"One", "Semi;colon", "Brace }", "Tab\tquote\"", @"C:\dir ""q""", 'x', 42, -7, 1.5F, ItemKind.Other'''
+PARSED = ("One", "Semi;colon", "Brace }", "Tab\tquote\"", 'C:\\dir "q"', "x", 42, -7, 1.5, "ItemKind.Other")
+
+DESIGNER = """namespace Demo
+{{
+    partial class Form1
+    {{
+        private void InitializeComponent()
+        {{
+            this.listBox1 = new System.Windows.Forms.ListBox();
+            this.listBox1.Location = new System.Drawing.Point(10, 20);
+            this.listBox1.Size = new System.Drawing.Size(120, 95);
+            this.listBox1.Name = "listBox1";
+            this.listBox1.Items.AddRange(new object[] {{
+            {items}}});
+            this.listBox1.Items.Add("Last");
+            this.Controls.Add(this.listBox1);
+            this.Text = "Form1";
+        }}
+    }}
+}}
+"""
+
+
+def test_parse_items():
+    assert _parse_items(ITEMS) == PARSED
+    assert _parse_items('"Solo"') == ("Solo",)
+    assert _parse_items("") == ()
+
+
+def test_items_pat():
+    text = DESIGNER.format(items=ITEMS)
+    found = [(m.group("name"), _parse_items(m.group("item") if m.group("list") is None else m.group("list"))) for m in _items_pat.finditer(text)]
+    assert found == [("listBox1", PARSED), ("listBox1", ("Last",))]
+    # A string item containing ';' or braces doesn't end the statement early
+    assert _items_pat.search('list1.Items.Add("a;b}");').group("item") == '"a;b}"'
+
+
+def test_stmt_items_pat():
+    m = _stmt_items_pat.fullmatch('this.panel1.listBox1.Items.AddRange(new object[] { "a", "b" })')
+    assert m.group("target") == "this.panel1.listBox1" and _parse_items(m.group("list")) == ("a", "b")
+    m = _stmt_items_pat.fullmatch('combo.Items.Add(3)')
+    assert m.group("item") == "3" and m.group("list") is None
+    st = _scan_statements(DESIGNER.format(items=ITEMS))
+    assert [(name, _parse_items(src)) for name, src in st.items] == [("listBox1", PARSED), ("listBox1", ("Last",))]
+
+
+def test_small_lists_stay_inline():
+    out = kite.convert({"Form1.Designer.cs": DESIGNER.format(items=ITEMS)})
+    assert "app/data/window_Form1.json" not in out
+    assert repr(PARSED + ("Last",)).encode("utf-8") in out["app/window_Form1.py"]
+
+
+@pytest.mark.parametrize("emit", ["code", "table"])
+def test_long_lists_go_to_the_sidecar(tmp_path, emit):
+    items = [f"Item {i}" for i in range(SIDECAR_MIN_ITEMS)]
+    src, out = str(tmp_path / "src"), str(tmp_path / "out")
+    write_files(src, {"Form1.Designer.cs": DESIGNER.format(items=", ".join(json.dumps(i) for i in items))})
+    Converter(jobs=1, emit=emit).convert(src, out)
+    window = os.path.join(out, "app", "window_Form1.py")
+    sidecar = os.path.join(out, "app", "data", "window_Form1.json")
+    with open(sidecar, encoding="utf-8") as f:
+        data = json.load(f)
+    assert list(data) == ["listBox1"] and data["listBox1"] == items + ["Last"]
+    with open(window, encoding="utf-8") as f:
+        assert "Item 1" not in f.read()
+
+    runtime._item_files.clear()
+    assert runtime.load_items(window, "listBox1") == items + ["Last"]
+    # Read once per process
+    write_files(out, {"app/data/window_Form1.json": '{"listBox1": []}'})
+    assert runtime.load_items(window, "listBox1")[0] == "Item 0"
+    runtime._item_files.clear()
+
+    # Back under the threshold: the stale sidecar goes away
+    write_files(src, {"Form1.Designer.cs": DESIGNER.format(items='"Only"')})
+    Converter(jobs=1, emit=emit).convert(src, out)
+    assert not os.path.exists(sidecar)
@@ -0,0 +1,63 @@
+import os
+
+from kite.converter import Converter
+from kite.manifest import XOM_NAME, Manifest
+
+from .helpers import designer, read, write_files
+
+
+def _convert(src, out, **options):
+    results = Converter(jobs=1, **options).convert(src, out)
+    return {os.path.basename(r.source): r for r in results}
+
+
+def test_unchanged_forms_are_reused(winforms_src, tmp_path):
+    out = str(tmp_path / "out")
+    first = _convert(winforms_src, out)
+    assert not any(r.reused for r in first.values())
+    assert os.path.isfile(os.path.join(out, XOM_NAME))
+
+    second = _convert(winforms_src, out)
+    assert all(r.reused for r in second.values())
+    assert {r.fname for r in second.values()} == {r.fname for r in first.values()}
+
+
+def test_edited_form_is_regenerated(winforms_src, tmp_path):
+    out = str(tmp_path / "out")
+    _convert(winforms_src, out)
+    write_files(winforms_src, {"Form1.Designer.cs": designer("Form1", text="Changed")})
+
+    results = _convert(winforms_src, out)
+    assert not results["Form1.Designer.cs"].reused
+    assert results["Form2.Designer.cs"].reused
+    assert "Changed" in read(os.path.join(out, "app", "window_Form1.py"))
+
+
+def test_removed_form_window_is_pruned(winforms_src, tmp_path):
+    out = str(tmp_path / "out")
+    _convert(winforms_src, out)
+    stale = os.path.join(out, "app", "window_Form2.py")
+    assert os.path.isfile(stale)
+    os.remove(os.path.join(winforms_src, "Form2.Designer.cs"))
+
+    _convert(winforms_src, out)
+    assert not os.path.exists(stale)
+    assert os.path.isfile(os.path.join(out, "app", "window_Form1.py"))
+
+
+def test_other_generator_options_regenerate_everything(winforms_src, tmp_path):
+    out = str(tmp_path / "out")
+    _convert(winforms_src, out)
+    results = _convert(winforms_src, out, emit="table")
+    assert not any(r.reused for r in results.values())
+
+    prev = Manifest.load(out, "winforms", {"emit": "code", "lazy_tabs": False, "shared_runtime": False})
+    assert prev is not None
+    assert not prev.reusable
+
+
+def test_full_ignores_the_manifest(winforms_src, tmp_path):
+    out = str(tmp_path / "out")
+    _convert(winforms_src, out)
+    results = _convert(winforms_src, out, full=True)
+    assert not any(r.reused for r in results.values())
@@ -0,0 +1,40 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from kite import converter as converter_mod
+from kite.converter import Converter
+
+from .helpers import designer, write_files
+
+_run_task = converter_mod._run_task
+
+
+def _crashing_task(task):
+    # Runs in a worker: the form named Crash takes the whole process down
+    if os.path.basename(task[1]).startswith("Crash."):
+        os._exit(1)
+    return _run_task(task)
+
+
+def test_dead_worker_falls_back_to_serial(tmp_path, monkeypatch):
+    src = str(tmp_path / "src")
+    names = ["Form1", "Form2", "Crash", "Form3"]
+    write_files(src, {f"{n}.Designer.cs": designer(n) for n in names})
+    monkeypatch.setattr(converter_mod, "_run_task", _crashing_task)
+    shutdowns = []
+    real_shutdown = ProcessPoolExecutor.shutdown
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        shutdowns.append((wait, cancel_futures))
+        real_shutdown(self, wait=wait, cancel_futures=cancel_futures)
+    monkeypatch.setattr(ProcessPoolExecutor, "shutdown", shutdown)
+
+    conv = Converter(jobs=2)
+    results = conv.convert(src, str(tmp_path / "out"))
+    assert sorted(os.path.basename(r.source) for r in results) == sorted(f"{n}.Designer.cs" for n in names)
+    assert all(r.fname and not r.error for r in results)
+    assert conv._pool is None
+    # The broken pool was shut down without waiting on its dead worker
+    assert (False, True) in shutdowns
+    for n in names:
+        assert os.path.isfile(os.path.join(str(tmp_path / "out"), "app", f"window_{n}.py"))
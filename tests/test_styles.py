@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+
+import kite
+from kite.generator.tk_generator import _style
+
+DESIGNER = """namespace Demo
+{{
+    partial class {name}
+    {{
+        private void InitializeComponent()
+        {{
+            this.label1 = new System.Windows.Forms.Label();
+            this.label1.BackColor = System.Drawing.Color.{back};
+            this.label1.ForeColor = System.Drawing.Color.White;
+            this.label1.Location = new System.Drawing.Point(10, 20);
+            this.label1.Text = "Hi";
+            this.Controls.Add(this.label1);
+            this.label2 = new System.Windows.Forms.Label();
+            this.label2.BackColor = System.Drawing.Color.{back};
+            this.label2.ForeColor = System.Drawing.Color.White;
+            this.label2.Location = new System.Drawing.Point(10, 50);
+            this.label2.Text = "There";
+            this.Controls.Add(this.label2);
+            this.Text = "{name}";
+        }}
+    }}
+}}
+"""
+
+_style_pat = re.compile(rb"style='([^']+)'")
+# Where the kite package can be imported from
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(kite.__file__)))
+
+
+def _convert(**backs):
+    return kite.convert({f"{name}.Designer.cs": DESIGNER.format(name=name, back=back) for name, back in backs.items()})
+
+
+def _theme(out):
+    ns = {}
+    exec(out["app/theme.py"].decode("utf-8"), ns)
+    return ns
+
+
+def test_identical_styles_share_a_name():
+    out = _convert(Form1="Red", Form2="Red", Form3="Blue")
+    used = {w: _style_pat.findall(out[f"app/window_{w}.py"]) for w in ("Form1", "Form2", "Form3")}
+    assert len(set(used["Form1"])) == 1
+    assert used["Form1"] == used["Form2"] != used["Form3"]
+    styles = _theme(out)["STYLES"]
+    assert sorted(styles) == sorted({used["Form1"][0].decode(), used["Form3"][0].decode()})
+    assert styles[used["Form1"][0].decode()] == ("TLabel", {"background": "#FF0000", "foreground": "#FFFFFF"})
+
+
+def test_names_are_stable_across_runs():
+    name, options = _style("TLabel", "background", "#FF0000", "#FFFFFF", ("Segoe UI", 10, "bold"))
+    digest = hashlib.sha1(json.dumps(["TLabel", options], sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    assert name == f"K{digest}.TLabel"
+    # Another interpreter, with its own string hash seed, derives the same name
+    code = "from kite.generator.tk_generator import _style; print(_style('TLabel', 'background', '#FF0000', '#FFFFFF', ('Segoe UI', 10, 'bold'))[0])"
+    for seed in ("1", "2"):
+        run = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env={"PYTHONHASHSEED": seed}, cwd=ROOT)
+        assert run.stdout.strip() == name
+    assert _convert(Form1="Red")["app/theme.py"] == _convert(Form1="Red")["app/theme.py"]
+
+
+class _Style:
+    configured = []
+
+    def __init__(self, master):
+        self.master = master
+
+    def configure(self, name, **options):
+        self.configured.append((self.master.tk, name))
+
+
+class _Master:
+    def __init__(self, interp):
+        self.tk = interp
+
+
+def test_theme_applies_once_per_interpreter():
+    theme = _theme(_convert(Form1="Red", Form2="Blue"))
+    theme["ttk"] = type("ttk", (), {"Style": _Style})
+    _Style.configured = []
+    first, second = object(), object()
+    for master in (_Master(first), _Master(first), _Master(second), _Master(second)):
+        theme["apply"](master)
+    assert len(theme["STYLES"]) == 2
+    assert _Style.configured == [(first, n) for n in theme["STYLES"]] + [(second, n) for n in theme["STYLES"]]
@@ -0,0 +1,95 @@
+import os
+
+from kite.converter import Converter
+from kite.epat import EpatFile
+from kite.utils.fs import MemoryFS
+from kite.watch import Watcher
+
+from .helpers import designer, read, write_files
+
+
+def _watcher(src, tmp_path):
+    w = Watcher(Converter(jobs=1), src, str(tmp_path / "out"))
+    w.load()
+    return w
+
+
+def test_nothing_changed(winforms_src, tmp_path):
+    w = _watcher(winforms_src, tmp_path)
+    assert w.poll() == set()
+
+
+def test_initial_trees_are_kept(winforms_src, tmp_path):
+    w = _watcher(winforms_src, tmp_path)
+    assert w.results and all(r.node is not None for r in w.results.values())
+
+
+def test_edited_source_is_rebuilt(winforms_src, tmp_path):
+    w = _watcher(winforms_src, tmp_path)
+    form1 = os.path.join(winforms_src, "Form1.Designer.cs")
+    write_files(winforms_src, {"Form1.Designer.cs": designer("Form1", text="Edited")})
+
+    changed = w.poll()
+    assert changed == {form1}
+    with EpatFile(os.path.join(w.output_dir, "serial.epat")) as epat:
+        before = {name: epat.records(name) for name in epat.windows()}
+    w.rebuild(changed)
+    assert "Edited" in read(os.path.join(w.output_dir, "app", "window_Form1.py"))
+    assert w.poll() == set()
+    # Form2's records are carried over from the previous file
+    with EpatFile(os.path.join(w.output_dir, "serial.epat")) as epat:
+        assert {name: epat.records(name) for name in epat.windows()} == before
+
+
+def test_added_source_is_converted(winforms_src, tmp_path):
+    w = _watcher(winforms_src, tmp_path)
+    write_files(winforms_src, {"Form3.Designer.cs": designer("Form3")})
+
+    changed = w.poll()
+    assert os.path.join(winforms_src, "Form3.Designer.cs") in changed
+    w.rebuild(changed)
+    assert os.path.isfile(os.path.join(w.output_dir, "app", "window_Form3.py"))
+
+
+APP_XAML = """<Application xmlns="http://schemas.microsoft.com/winfx/2006/xaml/presentation" xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">
+  <Application.Resources>
+    <SolidColorBrush x:Key="Accent" Color="{color}"/>
+  </Application.Resources>
+</Application>
+"""
+
+WINDOW_XAML = """<Window xmlns="http://schemas.microsoft.com/winfx/2006/xaml/presentation" xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml" x:Class="Demo.MainWindow" Title="Main" Width="300" Height="200">
+  <Grid>
+    <Button x:Name="ok" Content="OK" Background="{StaticResource Accent}" Width="80" Height="30"/>
+  </Grid>
+</Window>
+"""
+
+
+def test_app_xaml_change_rebuilds_windows(tmp_path):
+    src = str(tmp_path / "src")
+    write_files(src, {"App.xaml": APP_XAML.format(color="#FF0000"), "MainWindow.xaml": WINDOW_XAML})
+    w = _watcher(src, tmp_path)
+    assert w.poll() == set()
+    write_files(src, {"App.xaml": APP_XAML.format(color="#00FF00")})
+
+    changed = w.poll()
+    assert changed == {os.path.join(src, "App.xaml")}
+    w.rebuild(changed)
+    theme = read(os.path.join(w.output_dir, "app", "theme.py"))
+    assert "#00FF00" in theme and "#FF0000" not in theme
+
+
+def test_watch_in_memory():
+    fs = MemoryFS({"/src/Form1.Designer.cs": designer("Form1")})
+    w = Watcher(Converter(fs=fs), "/src", "/out")
+    w.load()
+    assert w.poll() == set()
+
+    fs.put("/src/Form1.Designer.cs", designer("Form1", text="Edited"))
+    fs.put("/src/Form2.Designer.cs", designer("Form2"))
+    changed = w.poll()
+    assert changed == {"/src/Form1.Designer.cs", "/src/Form2.Designer.cs"}
+    w.rebuild(changed)
+    assert b"Edited" in fs.load("/out/app/window_Form1.py")
+    assert fs.isfile("/out/app/window_Form2.py")
@@ -0,0 +1,29 @@
+import time
+
+from kite.parsers.winforms import _object_creations
+
+
+def _names(text):
+    return [(m.group("name"), m.group("type"), init) for m, init in _object_creations(text)]
+
+
+def test_object_creations():
+    text = "this.button1 = new Button();\nvar tip = new ToolTip(this.components) { ShowAlways = true, Tag = \"}\" };\n"
+    assert _names(text) == [("button1", "Button", None), ("tip", "ToolTip", ' ShowAlways = true, Tag = "}" ')]
+
+
+def _elapsed(text):
+    started = time.perf_counter()
+    _names(text)
+    return time.perf_counter() - started
+
+
+def test_long_identifier_run_is_linear():
+    # Without the lookbehind every suffix of the run was retried as a name: minutes at this size
+    assert _elapsed("a" * 100000 + " = 1;") < 1.0
+
+
+def test_unterminated_initializers_are_linear():
+    assert _elapsed("x = new T { " * 20000) < 1.0
+    assert _elapsed("x = new T( " * 20000) < 1.0
+    assert _elapsed("x = new T() { A = 1, " * 20000) < 1.0
@@ -0,0 +1,69 @@
+import xml.etree.ElementTree as ET
+
+from kite.model import UiNode
+from kite.parsers.wpf import WpfParser
+from kite.utils.fs import MemoryFS
+from kite.utils.naming import safe_name
+
+NS = 'xmlns="http://schemas.microsoft.com/winfx/2006/xaml/presentation" xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml"'
+
+WINDOW = f"""<Window {NS} x:Class="App.MainWindow" Title="Main" Width="400" Height="300">
+  <Grid Margin="4">
+    <Grid.RowDefinitions>
+      <RowDefinition Height="Auto"/>
+      <RowDefinition/>
+    </Grid.RowDefinitions>
+    <TextBlock x:Name="title" Text="Hello" Grid.Row="0"/>
+    <StackPanel Grid.Row="1" Orientation="Horizontal">
+      <Button Name="ok" Content="OK" Width="80"/>
+      <Button Name="cancel" Width="80">
+        <Button.Content>Cancel</Button.Content>
+      </Button>
+    </StackPanel>
+  </Grid>
+</Window>
+"""
+
+
+def _parse(text, name="MainWindow.xaml"):
+    path = "/src/" + name
+    return WpfParser(MemoryFS({path: text.encode("utf-8")})).parse_xaml(path)
+
+
+def _dom_parse(text, name):
+    # The DOM parser this streaming one replaced, minus the property elements it turned into widgets
+    parser = WpfParser()
+
+    def walk(el, node):
+        for child in el:
+            ctype = parser._strip_ns(child.tag)
+            if "." in ctype or ctype == "ResourceDictionary":
+                continue
+            cnode = UiNode(type=ctype, name=safe_name(child.attrib.get("x:Name") or child.attrib.get("Name") or ctype), properties=parser._attrs(child), children=[])
+            node.add_child(cnode)
+            walk(child, cnode)
+
+    root_el = ET.fromstring(text)
+    root = UiNode(type=parser._strip_ns(root_el.tag), name=name, properties=parser._attrs(root_el), children=[])
+    walk(root_el, root)
+    return root
+
+
+def _shape(node):
+    return (node.type, node.name, dict(node.properties), [_shape(c) for c in node.children])
+
+
+def test_property_elements_are_not_widgets():
+    root = _parse(WINDOW)
+    grid, = root.children
+    assert [c.type for c in grid.children] == ["TextBlock", "StackPanel"]
+    assert [(c.type, c.name, len(c.children)) for c in grid.children[1].children] == [("Button", "ok", 0), ("Button", "cancel", 0)]
+
+
+def test_resource_dictionary_root_is_not_a_window():
+    text = f'<ResourceDictionary {NS}><SolidColorBrush x:Key="Accent" Color="#FF0000"/></ResourceDictionary>'
+    assert _parse(text, "Theme.xaml") is None
+
+
+def test_matches_dom_parser():
+    assert _shape(_parse(WINDOW)) == _shape(_dom_parse(WINDOW, "MainWindow"))
@@ -0,0 +1,42 @@
+from kite.parsers.xaml_resources import ResourceScope, Style, type_key
+
+
+def _scope(entries, parent=None, merged=()):
+    scope = ResourceScope(parent)
+    scope.entries.update(entries)
+    scope.merged.extend(merged)
+    return scope
+
+
+def test_lookup_order():
+    app = _scope({"Accent": "#111111", "Fore": "#222222"})
+    early = _scope({"Accent": "#333333", "Back": "#444444"})
+    late = _scope({"Accent": "#555555"})
+    window = _scope({"Own": "#666666"}, parent=app, merged=[early, late])
+    assert window.resolve("{StaticResource Own}") == "#666666"
+    # Later merged dictionaries win, and any merged dictionary wins over the enclosing scope
+    assert window.resolve("{StaticResource Accent}") == "#555555"
+    assert window.resolve("{DynamicResource ResourceKey=Back}") == "#444444"
+    assert window.resolve("{StaticResource Fore}") == "#222222"
+    assert window.resolve("{StaticResource Missing}") == "{StaticResource Missing}"
+
+
+def test_lookups_are_memoized():
+    app = _scope({"Accent": "#111111"})
+    window = _scope({}, parent=_scope({}, parent=app))
+    assert window.resolve("{StaticResource Accent}") == "#111111"
+    window.resolve("{StaticResource Missing}")
+    assert window._found == {"Accent": ("#111111", app), "Missing": (None, None)}
+    # Scopes up the chain answer from their own memo
+    assert "Missing" in window.parent._found and "Missing" in app._found
+
+
+def test_apply_implicit_style():
+    base = _scope({
+        "Accent": "#FF0000",
+        type_key("Button"): Style(None, {"Background": "{StaticResource Accent}", "Width": "80"}),
+    })
+    window = _scope({}, parent=base)
+    props = window.apply("Button", {"Width": "100", "Content": "OK"})
+    assert props == {"Background": "#FF0000", "Width": "100", "Content": "OK"}
+    assert window.apply("Label", {"Content": "Hi"}) == {"Content": "Hi"}